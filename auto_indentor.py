@@ -1,6 +1,11 @@
 import os
 import tkinter as tk
 from tkinter import filedialog
+from manifest import Manifest
+
+# bump when the formatting changes, every file is then reformatted again
+TOOL_VERSION = 1
+INDENT_CHAR = "\t"
 
 def reformat_file(file_path, create_backup=True, indent_char="\t"):
     with open(file_path, "r", encoding="utf-8") as f:
@@ -94,12 +99,21 @@ def main():
 
     multiple = len(file_paths) > 1
 
+    # files already formatted and not edited since are left alone
+    manifest = Manifest("auto_indentor", config=INDENT_CHAR, version=TOOL_VERSION)
+
     for path in file_paths:
+        if not manifest.changed(path):
+            print(f"Unchanged since last run, skipped: {path}")
+            continue
         reformat_file(
             path,
             create_backup=not multiple,      # Only back up if one file
-            indent_char="\t"
+            indent_char=INDENT_CHAR
         )
+        manifest.record(path)
+
+    manifest.save()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,189 @@
+import os
+from collections import namedtuple, OrderedDict
+from source_file import read_source, append_before_close
+from country_registry import country_registry
+
+# Bulk import for character_creator.txt. Rows are grouped by tag and every
+# block is built in memory first, so each tag's characters, history and
+# localisation files are read at most once and written exactly once however
+# many characters it gets.
+#
+# Line format, ';' separated:
+#   TAG;NAME;IDEOLOGY                      country leader (IDEOLOGY as in mode 1, or a sub-ideology)
+#   TAG;NAME;IDEOLOGY;leader
+#   TAG;NAME;TRAIT;advisor;SLOT            SLOT defaults to political_advisor, TRAIT may be empty
+#   TAG;NAME;TRAITS;general;SKILL          TRAITS space separated, SKILL defaults to 1
+#   TAG;NAME;TRAITS;field_marshal;SKILL
+#   TAG;NAME;TRAITS;admiral;SKILL
+
+LEADER = "leader"
+ADVISOR = "advisor"
+GENERAL = "general"
+FIELD_MARSHAL = "field_marshal"
+ADMIRAL = "admiral"
+ROLES = (LEADER, ADVISOR, GENERAL, FIELD_MARSHAL, ADMIRAL)
+
+DEFAULT_SLOT = "political_advisor"
+DEFAULT_SKILL = "1"
+
+Character = namedtuple("Character", ["tag", "name", "detail", "role", "extra"])
+
+
+def character_id(tag, name):
+    return tag + '_' + name.replace(' ', '_').lower()
+
+
+def parse_character_line(line):
+    """Character from one ';' separated line, or raises ValueError."""
+    parts = [part.strip() for part in line.rstrip('\n').split(';')]
+    if len(parts) < 3:
+        raise ValueError("expected at least TAG;NAME;IDEOLOGY")
+    tag, name, detail = parts[0].upper(), parts[1], parts[2]
+    role = parts[3].lower() if len(parts) > 3 and parts[3] else LEADER
+    extra = parts[4] if len(parts) > 4 else ''
+    if len(tag) != 3 or not tag[0].isalpha():
+        raise ValueError(f"invalid tag '{tag}'")
+    if not name:
+        raise ValueError("missing name")
+    if role not in ROLES:
+        raise ValueError(f"unknown role '{role}', expected one of {', '.join(ROLES)}")
+    if role == LEADER and not detail:
+        raise ValueError("a leader needs an ideology")
+    if role in (GENERAL, FIELD_MARSHAL, ADMIRAL) and extra and not extra.isdigit():
+        raise ValueError(f"skill must be a number, got '{extra}'")
+    return Character(tag, name, detail, role, extra)
+
+
+def read_character_file(file_path):
+    """Characters from a character_creator.txt, '#' lines skipped, bad lines reported and skipped."""
+    characters = []
+    for line_num, line in enumerate(read_source(file_path).lines, 1):
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        try:
+            characters.append(parse_character_line(line))
+        except ValueError as e:
+            print(f"Line {line_num}: {e}, skipped")
+    return characters
+
+
+def leader_ideology(ideology, ideologies, ideologies_full, ideologies_sub):
+    """Sub-ideology for a leader, d/c/f/n and full names mapped like mode 1."""
+    if ideology in ideologies:
+        return ideologies_sub[ideologies.index(ideology)]
+    if ideology in ideologies_full:
+        return ideologies_sub[ideologies_full.index(ideology)]
+    return ideology
+
+
+def render_character(character, ideology_sub=None):
+    """The '\tID = { ... }' block for one character, without a trailing newline."""
+    char_id = character_id(character.tag, character.name)
+    if character.role == LEADER:
+        return ('\t'+char_id+' = { \n\t\tname = '+char_id+'\n\t\tportraits = {\n\t\t\tcivilian = {\n'
+                '\t\t\t\tlarge = GFX_portrait_'+char_id+'\n\t\t\t}\n\t\t}\n\t\tcountry_leader = {\n'
+                '\t\t\tideology = '+(ideology_sub or character.detail)+'\n\t\t\texpire = "1960.1.1.1"\n\t\t\tid = -1\n\t\t}\n\t}')
+    if character.role == ADVISOR:
+        traits = ' '.join(character.detail.split())
+        return ('\t'+char_id+' = { \n\t\tname = '+char_id+'\n\t\tportraits = {\n\t\t\tcivilian = {\n'
+                '\t\t\t\tlarge = GFX_portrait_'+char_id+'\n\t\t\t}\n\t\t}\n\t\tadvisor = {\n'
+                '\t\t\tslot = '+(character.extra or DEFAULT_SLOT)+'\n\t\t\tidea_token = '+char_id+'\n'
+                '\t\t\tallowed = {\n\t\t\t\toriginal_tag = '+character.tag+'\n\t\t\t}\n'
+                '\t\t\ttraits = { '+traits+(' ' if traits else '')+'}\n\t\t\tcost = 150\n'
+                '\t\t\tai_will_do = {\n\t\t\t\tfactor = 1\n\t\t\t}\n\t\t}\n\t}')
+    skill = character.extra or DEFAULT_SKILL
+    traits = ' '.join(character.detail.split())
+    if character.role == ADMIRAL:
+        portrait, block = 'navy', 'navy_leader'
+        skills = ('attack_skill', 'defense_skill', 'maneuvering_skill', 'coordination_skill')
+    else:
+        portrait, block = 'army', 'corps_commander' if character.role == GENERAL else 'field_marshal'
+        skills = ('attack_skill', 'defense_skill', 'planning_skill', 'logistics_skill')
+    return ('\t'+char_id+' = { \n\t\tname = '+char_id+'\n\t\tportraits = {\n\t\t\t'+portrait+' = {\n'
+            '\t\t\t\tlarge = GFX_portrait_'+char_id+'\n\t\t\t}\n\t\t}\n\t\t'+block+' = {\n'
+            '\t\t\ttraits = { '+traits+(' ' if traits else '')+'}\n\t\t\tskill = '+skill+'\n'
+            + ''.join('\t\t\t'+name+' = '+skill+'\n' for name in skills)
+            + '\t\t\tlegacy_id = -1\n\t\t}\n\t}')
+
+
+def render_localisation(character):
+    char_id = character_id(character.tag, character.name)
+    return '\n '+char_id+': "'+character.name+'"\n '+char_id+'_desc: "'+character.name+' Description"'
+
+
+def add_to_characters_file(file_path, blocks):
+    """Insert blocks before the characters file's closing brace, or create it. One write."""
+    if os.path.exists(file_path) and read_source(file_path).text.strip():
+        append_before_close(file_path, '\n'.join(blocks) + '\n')
+    else:
+        with open(file_path, "w", encoding="utf-8") as character_file:
+            character_file.write('characters = {\n' + '\n'.join(blocks) + '\n}')
+
+
+def add_recruits(history_path, char_ids):
+    """recruit_character lines before set_politics, or at the end if it has none. One write."""
+    source = read_source(history_path)
+    recruits = ''.join('recruit_character = '+char_id+'\n' for char_id in char_ids)
+    text = source.text
+    if 'set_politics' in text:
+        text = text.replace('set_politics', recruits+'set_politics', 1)
+    else:
+        text = text.rstrip('\n') + '\n' + recruits
+    source.write(text)
+
+
+def import_characters(mod_folder, characters, ideologies, ideologies_full, ideologies_sub):
+    """Add every character, writing each tag's characters, history and loc file once."""
+    by_tag = OrderedDict()
+    for character in characters:
+        by_tag.setdefault(character.tag, []).append(character)
+
+    characters_folder = mod_folder+'/common/characters'
+    loc_folder = mod_folder+'/localisation/english'
+    os.makedirs(characters_folder, exist_ok=True)
+    os.makedirs(loc_folder, exist_ok=True)
+    registry = country_registry(mod_folder)
+
+    added = 0
+    for tag, tag_characters in by_tag.items():
+        characters_path = registry.characters_file(tag) or characters_folder+'/'+tag+'_characters.txt'
+        existing = read_source(characters_path).text if os.path.exists(characters_path) else ''
+
+        new = []
+        seen = set()
+        for character in tag_characters:
+            char_id = character_id(tag, character.name)
+            if char_id in seen or '\t'+char_id+' = {' in existing:
+                print(f"{char_id} already exists, skipped")
+                continue
+            seen.add(char_id)
+            new.append(character)
+        if not new:
+            continue
+
+        blocks = []
+        for character in new:
+            ideology_sub = None
+            if character.role == LEADER:
+                ideology_sub = leader_ideology(character.detail, ideologies, ideologies_full, ideologies_sub)
+            blocks.append(render_character(character, ideology_sub))
+        add_to_characters_file(characters_path, blocks)
+
+        history_path = registry.history_file(tag)
+        if history_path is not None:
+            add_recruits(history_path, [character_id(tag, c.name) for c in new])
+        else:
+            print(f"No history/countries file for {tag}, recruit_character lines not added")
+
+        loc_path = registry.localisation_file(tag) or loc_folder+'/'+tag+'_l_english.yml'
+        loc = ''.join(render_localisation(c) for c in new)
+        if os.path.exists(loc_path):
+            with open(loc_path, "a", encoding="utf-8") as loc_file:
+                loc_file.write(loc)
+        else:
+            with open(loc_path, "w", encoding="utf-8-sig") as loc_file:
+                loc_file.write('l_english:' + loc)
+        registry.update(tag, characters_file=characters_path, localisation_file=loc_path)
+        added += len(new)
+
+    print(f"Added {added} character(s) for {len(by_tag)} tag(s)")
@@ -0,0 +1,320 @@
+from clausewitz_tokenizer import tokenize, KEY, OP, OPEN, CLOSE, unquote
+from source_file import read_source
+
+# Concrete syntax tree over a Clausewitz script file.
+# The tree only records offsets into the original text, so whitespace and
+# comments are kept simply by never touching them. Edits are collected as
+# (start, end, replacement) spans and spliced into the original text when
+# serialising, so nothing outside the edited spans is rebuilt.
+
+
+class Block:
+    """A { ... } block, or the whole file for the root block (open is None)."""
+
+    def __init__(self, open_tok=None):
+        self.open = open_tok
+        self.close = None
+        self.end = None  # after the closing brace, or end of file when unclosed
+        self.children = []  # Entry, bare value Token, or anonymous Block
+
+    @property
+    def start(self):
+        return self.open.start if self.open else 0
+
+    def entries(self, key=None):
+        for child in self.children:
+            if isinstance(child, Entry) and (key is None or child.key == key):
+                yield child
+
+    def get(self, key):
+        """First direct child entry with this key, or None."""
+        return next(self.entries(key), None)
+
+    def values(self):
+        """Bare values directly inside this block, e.g. provinces = { 1 2 3 }."""
+        return [child.value for child in self.children if not isinstance(child, (Entry, Block))]
+
+    def walk(self):
+        """Every entry in this block and all nested blocks, in file order."""
+        stack = [iter(self.children)]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                continue
+            if isinstance(child, Entry):
+                yield child
+                if isinstance(child.value, Block):
+                    stack.append(iter(child.value.children))
+            elif isinstance(child, Block):
+                stack.append(iter(child.children))
+
+
+class Entry:
+    """key op value, where value is a Token or a Block."""
+
+    def __init__(self, key_tok, op_tok, value, parent):
+        self.key_tok = key_tok
+        self.op_tok = op_tok
+        self.value = value
+        self.parent = parent
+
+    @property
+    def key(self):
+        return unquote(self.key_tok.value)
+
+    @property
+    def op(self):
+        return self.op_tok.value
+
+    @property
+    def start(self):
+        return self.key_tok.start
+
+    @property
+    def end(self):
+        return self.value.end
+
+    def text(self):
+        """Value as a plain string (quotes removed), or None for blocks."""
+        if isinstance(self.value, Block):
+            return None
+        return unquote(self.value.value)
+
+
+class Document:
+    """Parsed file plus the pending edits against it."""
+
+    def __init__(self, text):
+        self.text = text
+        self.root = Block()
+        self.edits = []
+        # SourceFile it was read from, write() keeps its encoding, BOM and line endings
+        self.source = None
+        self._parse()
+
+    def _parse(self):
+        text = self.text
+        stack = [self.root]
+        key_tok = None
+        op_tok = None
+        for tok in tokenize(text):
+            kind = tok.kind
+            if kind == KEY:
+                key_tok = tok
+                continue
+            if kind == OP:
+                op_tok = tok
+                continue
+            block = stack[-1]
+            if kind == OPEN:
+                new_block = Block(tok)
+                if key_tok is not None and op_tok is not None:
+                    block.children.append(Entry(key_tok, op_tok, new_block, block))
+                else:
+                    block.children.append(new_block)
+                stack.append(new_block)
+            elif kind == CLOSE:
+                if len(stack) > 1:
+                    closed = stack.pop()
+                    closed.close = tok
+                    closed.end = tok.end
+            elif key_tok is not None and op_tok is not None:
+                block.children.append(Entry(key_tok, op_tok, tok, block))
+            else:
+                block.children.append(tok)
+            key_tok = None
+            op_tok = None
+        # unclosed blocks run to the end of the file
+        for block in stack:
+            block.end = len(text)
+
+    def find(self, path, block=None):
+        """Follow a dotted key path such as 'state.resources.coal', first match at each step."""
+        entry = None
+        block = block or self.root
+        for part in path.split("."):
+            if block is None:
+                return None
+            entry = block.get(part)
+            if entry is None:
+                return None
+            block = entry.value if isinstance(entry.value, Block) else None
+        return entry
+
+    def find_all(self, key, block=None):
+        """Every entry with this key at any depth."""
+        return [entry for entry in (block or self.root).walk() if entry.key == key]
+
+    # --------------------------
+    # Edits, applied on serialise
+    # --------------------------
+
+    def replace(self, start, end, new_text):
+        self.edits.append((start, end, len(self.edits), new_text))
+
+    def insert(self, offset, new_text):
+        self.replace(offset, offset, new_text)
+
+    def set_value(self, entry, value):
+        """Replace an entry's value (token or whole block) with value."""
+        self.replace(entry.value.start, entry.value.end, str(value))
+
+    def set(self, path, value, block=None):
+        """
+        Set a dotted key path to value, e.g. set('state.resources.coal', 12).
+        Missing blocks along the path are created inside the deepest one found.
+        """
+        parts = path.split(".")
+        block = block or self.root
+        for i, part in enumerate(parts):
+            entry = block.get(part)
+            if entry is None:
+                indent = self._child_indent(block)
+                self.append(block, render_entry(parts[i:], value, indent), indent)
+                return
+            if i == len(parts) - 1:
+                if entry.text() != str(value):
+                    self.set_value(entry, value)
+                return
+            if not isinstance(entry.value, Block):
+                raise ValueError(f"{'.'.join(parts[:i + 1])} is not a block")
+            block = entry.value
+
+    def append(self, block, entry_text, indent=None):
+        """Add entry_text as the last entry of block, keeping the closing brace on its own line."""
+        text = self.text
+        if block.close is None:
+            offset = len(text)
+            prefix = "" if not text or text.endswith("\n") else "\n"
+            self.insert(offset, prefix + entry_text + "\n")
+            return
+        offset = block.close.start
+        line_start = text.rfind("\n", 0, offset) + 1
+        if text[line_start:offset].strip():
+            # closing brace shares its line, e.g. resources = { oil = 1 } or state={id=5}
+            lead = "" if text[offset - 1] in " \t" else " "
+            self.insert(offset, lead + entry_text + " ")
+        else:
+            if indent is None:
+                indent = self._child_indent(block)
+            self.insert(line_start, indent + entry_text + "\n")
+
+    def comment_out(self, node):
+        """
+        Prefix every line of node with '# '. If the node shares a line with
+        other entries it is moved onto lines of its own first.
+        """
+        text = self.text
+        start = node.start
+        end = node.end
+        line_start = text.rfind("\n", 0, start) + 1
+        line_end = text.find("\n", end)
+        if line_end == -1:
+            line_end = len(text)
+        indent = _indent_of(text, line_start)
+        if text[line_start:start].strip():
+            edit_start = start
+            lead = "\n" + indent
+        else:
+            edit_start = line_start
+            lead = ""
+        body = "\n".join("# " + line for line in text[edit_start:end].split("\n"))
+        after = text[end:line_end]
+        tail = ""
+        if after.strip() and not after.lstrip().startswith("#"):
+            tail = "\n" + indent
+            end += len(after) - len(after.lstrip())
+        self.replace(edit_start, end, lead + body + tail)
+
+    def remove(self, node):
+        """Remove node, taking its whole line with it when nothing else is on that line."""
+        text = self.text
+        start = node.start
+        end = node.end
+        line_start = text.rfind("\n", 0, start) + 1
+        line_end = text.find("\n", end)
+        if line_end == -1:
+            line_end = len(text)
+        after = text[end:line_end]
+        if not text[line_start:start].strip() and not after.strip():
+            self.replace(line_start, min(line_end + 1, len(text)), "")
+        else:
+            self.replace(start, end + len(after) - len(after.lstrip()), "")
+
+    @property
+    def changed(self):
+        return bool(self.edits)
+
+    def serialize(self):
+        """Original text with every edit spliced in, untouched spans are copied as-is."""
+        if not self.edits:
+            return self.text
+        text = self.text
+        pieces = []
+        pos = 0
+        for start, end, _, new_text in sorted(self.edits):
+            if start < pos:
+                raise ValueError(f"Overlapping edits at offset {start}")
+            pieces.append(text[pos:start])
+            pieces.append(new_text)
+            pos = end
+        pieces.append(text[pos:])
+        return "".join(pieces)
+
+    def write(self, file_path, encoding=None):
+        """
+        Write the file back only if there are edits. Returns True if written.
+        A file read by parse_file keeps its encoding and BOM unless encoding is given.
+        """
+        if not self.edits:
+            return False
+        if self.source is not None and encoding is None:
+            self.source.write(self.serialize(), file_path)
+        else:
+            with open(file_path, "w", encoding=encoding or "utf-8", newline="") as f:
+                f.write(self.serialize())
+        return True
+
+    def _child_indent(self, block):
+        text = self.text
+        for child in block.children:
+            line_start = text.rfind("\n", 0, child.start) + 1
+            if not text[line_start:child.start].strip():
+                return text[line_start:child.start]
+        if block.open is None:
+            return ""
+        return _indent_of(text, text.rfind("\n", 0, block.open.start) + 1) + "\t"
+
+
+def _indent_of(text, line_start):
+    i = line_start
+    while i < len(text) and text[i] in " \t":
+        i += 1
+    return text[line_start:i]
+
+
+def render_entry(parts, value, indent):
+    """Render a.b.c = value as nested blocks, one entry per line."""
+    if len(parts) == 1:
+        return f"{parts[0]} = {value}"
+    inner = render_entry(parts[1:], value, indent + "\t")
+    return f"{parts[0]} = {{\n{indent}\t{inner}\n{indent}}}"
+
+
+def parse(text):
+    return Document(text)
+
+
+def parse_file(file_path, encoding=None, errors="strict"):
+    """
+    Document of a file. Its encoding and BOM are detected by source_file, the
+    same way the other readers see it, unless encoding (and errors) is given.
+    """
+    if encoding is None:
+        source = read_source(file_path)
+        doc = Document(source.text)
+        doc.source = source
+        return doc
+    with open(file_path, "r", encoding=encoding, errors=errors, newline="") as f:
+        return Document(f.read())
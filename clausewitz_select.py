@@ -0,0 +1,183 @@
+from collections import namedtuple
+from clausewitz_tokenizer import tokenize, KEY, OP, OPEN, CLOSE, unquote
+
+# Key-path queries over Clausewitz script, e.g.
+#     select(path, "state.history.owner")
+#     select(path, "state.id", "state.resources", "state.history.**.victory_points")
+# Every path given is matched in the same single pass over the token stream,
+# so asking for ten fields still reads and tokenizes the file once. Blocks no
+# path can reach are skipped without building anything.
+#
+# Path parts are keys separated by dots. "*" matches any one key, "**" any
+# number of nested keys (including none).
+
+Match = namedtuple("Match", ["path", "value", "start"])
+
+
+class Section:
+    """A selected { ... } block: its key = value entries and its bare values, in order."""
+
+    __slots__ = ("entries", "values")
+
+    def __init__(self):
+        self.entries = []  # (key, value), value is a str or a nested Section
+        self.values = []   # bare values, e.g. provinces = { 1 2 3 }
+
+    def get(self, key, default=None):
+        """Value of the first entry with this key."""
+        for k, v in self.entries:
+            if k == key:
+                return v
+        return default
+
+    def get_all(self, key):
+        return [v for k, v in self.entries if k == key]
+
+    def __repr__(self):
+        return f"Section(entries={self.entries!r}, values={self.values!r})"
+
+
+class Selector:
+    """Several key paths compiled once, then run over any number of files."""
+
+    def __init__(self, *paths):
+        self.paths = paths
+        self.parts = [tuple(path.split(".")) for path in paths]
+        self.root_states = frozenset((i, 0) for i in range(len(paths)))
+
+    def _advance(self, states, key):
+        """(states to carry into key's block, path indexes that end at key)."""
+        carry = set()
+        done = []
+        todo = list(states)
+        seen = set()
+        while todo:
+            i, pos = todo.pop()
+            if (i, pos) in seen:
+                continue
+            seen.add((i, pos))
+            parts = self.parts[i]
+            part = parts[pos]
+            if part == "**":
+                carry.add((i, pos))  # ** swallows this key too
+                if pos + 1 < len(parts):
+                    todo.append((i, pos + 1))
+                continue
+            if part == "*" or part == key:
+                if pos + 1 == len(parts):
+                    done.append(i)
+                else:
+                    carry.add((i, pos + 1))
+        return frozenset(carry), sorted(set(done))
+
+    def matches(self, text):
+        """{ path: [Match, ...] } for every path, matches in file order."""
+        results = {path: [] for path in self.paths}
+        # frame: (active states, Section being captured or None, key path)
+        stack = [(self.root_states, None, ())]
+        skip = 0
+        key_tok = None
+        op_seen = False
+
+        for tok in tokenize(text):
+            kind = tok.kind
+            if skip:
+                if kind == OPEN:
+                    skip += 1
+                elif kind == CLOSE:
+                    skip -= 1
+                continue
+            if kind == KEY:
+                key_tok = tok
+                continue
+            if kind == OP:
+                op_seen = True
+                continue
+
+            states, section, keys = stack[-1]
+            if kind == CLOSE:
+                if len(stack) > 1:
+                    stack.pop()
+                key_tok = None
+                op_seen = False
+                continue
+
+            if key_tok is None or not op_seen:
+                # bare value or anonymous block
+                if kind == OPEN:
+                    child = Section() if section is not None else None
+                    if section is not None:
+                        section.entries.append(("", child))
+                    if states or child is not None:
+                        stack.append((states, child, keys))
+                    else:
+                        skip = 1
+                elif section is not None:
+                    section.values.append(unquote(tok.value))
+                key_tok = None
+                op_seen = False
+                continue
+
+            key = unquote(key_tok.value)
+            start = key_tok.start
+            key_tok = None
+            op_seen = False
+            carry, done = self._advance(states, key) if states else (frozenset(), [])
+            path = keys + (key,)
+
+            if kind == OPEN:
+                child = Section() if (section is not None or done) else None
+                if section is not None:
+                    section.entries.append((key, child))
+                for i in done:
+                    results[self.paths[i]].append(Match(path, child, start))
+                if carry or child is not None:
+                    stack.append((carry, child, path))
+                else:
+                    skip = 1
+            else:
+                value = unquote(tok.value)
+                if section is not None:
+                    section.entries.append((key, value))
+                for i in done:
+                    results[self.paths[i]].append(Match(path, value, start))
+
+        return results
+
+    def matches_file(self, file_path, encoding="utf-8-sig", errors="ignore"):
+        with open(file_path, "r", encoding=encoding, errors=errors) as f:
+            return self.matches(f.read())
+
+    def values(self, text):
+        """{ path: [value, ...] }, value being a str or a Section."""
+        return {path: [m.value for m in found] for path, found in self.matches(text).items()}
+
+    def values_file(self, file_path, encoding="utf-8-sig", errors="ignore"):
+        with open(file_path, "r", encoding=encoding, errors=errors) as f:
+            return self.values(f.read())
+
+
+_compiled = {}
+
+
+def compile_paths(*paths):
+    """Selector for these paths, reused across calls."""
+    selector = _compiled.get(paths)
+    if selector is None:
+        selector = _compiled[paths] = Selector(*paths)
+    return selector
+
+
+def select(file_path, *paths):
+    """
+    Values at the given key paths in one read of file_path. With a single path
+    returns its list of values, otherwise { path: [values] }.
+    """
+    found = compile_paths(*paths).values_file(file_path)
+    return found[paths[0]] if len(paths) == 1 else found
+
+
+def select_text(text, *paths):
+    """select() over text already in memory."""
+    found = compile_paths(*paths).values(text)
+    return found[paths[0]] if len(paths) == 1 else found
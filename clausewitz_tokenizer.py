@@ -0,0 +1,206 @@
+import os
+import re
+import time
+from collections import namedtuple
+
+# Token kinds
+KEY = "key"
+OP = "op"
+VALUE = "value"
+OPEN = "open"
+CLOSE = "close"
+
+Token = namedtuple("Token", ["kind", "value", "start", "end"])
+
+# One alternation for the whole grammar, whitespace and comments are matched
+# so they can be skipped, but never produce tokens. Braces inside quoted
+# strings or after a '#' are therefore never counted.
+TOKEN_RE = re.compile(r'''
+    (?P<skip>\s+|\#[^\n]*)
+  | (?P<open>\{)
+  | (?P<close>\})
+  | (?P<op><=|>=|!=|\?=|==|=|<|>)
+  | (?P<string>"(?:[^"\\\n]|\\.)*"?)
+  | (?P<word>[^\s{}=<>!?\#"]+|[!?])
+''', re.VERBOSE)
+
+# Only what matters for block boundaries, everything else is stepped over
+# by finditer without producing a match.
+BRACE_RE = re.compile(r'"(?:[^"\\\n]|\\.)*"?|\#[^\n]*|[{}]')
+
+
+def tokenize(text):
+    """
+    Single pass over text, yields Token(kind, value, start, end).
+    start/end are offsets into text. Strings keep their quotes.
+    A word or string directly followed by an operator is emitted as a KEY,
+    anything else is a VALUE.
+    """
+    pending = None
+    for m in TOKEN_RE.finditer(text):
+        kind = m.lastgroup
+        if kind == "skip":
+            continue
+        if kind == "op":
+            if pending is not None:
+                yield pending._replace(kind=KEY)
+                pending = None
+            yield Token(OP, m.group(), m.start(), m.end())
+            continue
+        if pending is not None:
+            yield pending
+            pending = None
+        if kind == "open":
+            yield Token(OPEN, "{", m.start(), m.end())
+        elif kind == "close":
+            yield Token(CLOSE, "}", m.start(), m.end())
+        else:
+            pending = Token(VALUE, m.group(), m.start(), m.end())
+    if pending is not None:
+        yield pending
+
+
+def brace_map(text, tokens=None):
+    """
+    Return { offset of '{': offset after its matching '}' } for every block in
+    text, computed in one pass. Unclosed blocks map to len(text).
+    Stray closing braces are ignored.
+    """
+    pairs = {}
+    stack = []
+    if tokens is None:
+        for m in BRACE_RE.finditer(text):
+            c = m.group()
+            if c == '{':
+                stack.append(m.start())
+            elif c == '}' and stack:
+                pairs[stack.pop()] = m.end()
+    else:
+        for tok in tokens:
+            if tok.kind == OPEN:
+                stack.append(tok.start)
+            elif tok.kind == CLOSE and stack:
+                pairs[stack.pop()] = tok.end
+    for start in stack:
+        pairs[start] = len(text)
+    return pairs
+
+
+def legacy_find_matching_brace(text, start_index):
+    """Per-character matcher, kept for braces the tokenizer skipped and for benchmarking."""
+    n = len(text)
+    if start_index >= n or text[start_index] != '{':
+        return start_index
+    depth = 0
+    i = start_index
+    while i < n:
+        c = text[i]
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return n
+
+
+def find_matching_brace(text, start_index, braces=None):
+    """
+    Given text[start_index] == '{', return index after the matching '}', or
+    len(text). Pass the brace_map of text when calling this more than once on
+    the same text, otherwise the whole text is tokenized again.
+    A brace inside a comment or string is not in the map, so it falls back to
+    plain brace counting from that point.
+    """
+    if start_index >= len(text) or text[start_index] != '{':
+        return start_index
+    if braces is None:
+        braces = brace_map(text)
+    if start_index in braces:
+        return braces[start_index]
+    return legacy_find_matching_brace(text, start_index)
+
+
+def top_level_offsets(text, tokens=None):
+    """Return the set of start offsets of tokens that are outside any block."""
+    if tokens is None:
+        tokens = tokenize(text)
+    offsets = set()
+    depth = 0
+    for tok in tokens:
+        if tok.kind == OPEN:
+            depth += 1
+        elif tok.kind == CLOSE:
+            depth = max(depth - 1, 0)
+        elif depth == 0:
+            offsets.add(tok.start)
+    return offsets
+
+
+def unquote(value):
+    if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+        return value[1:-1]
+    return value
+
+
+# --------------------------
+# Benchmark against the old per-character matcher
+# --------------------------
+
+def benchmark(common_folder):
+    """
+    Time finding the end of every block in every .txt under common_folder,
+    once with the legacy matcher (one call per '{') and once with brace_map.
+    """
+    texts = []
+    for root_dir, _, files in os.walk(common_folder):
+        for file in files:
+            if file.endswith(".txt"):
+                with open(os.path.join(root_dir, file), "r", encoding="utf-8-sig", errors="ignore") as f:
+                    texts.append(f.read())
+
+    total_chars = sum(len(t) for t in texts)
+    print(f"Loaded {len(texts)} files ({total_chars / 1_000_000:.1f}M characters)")
+
+    start = time.perf_counter()
+    legacy_blocks = 0
+    for text in texts:
+        i = text.find('{')
+        while i != -1:
+            legacy_find_matching_brace(text, i)
+            legacy_blocks += 1
+            i = text.find('{', i + 1)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new_blocks = 0
+    for text in texts:
+        new_blocks += len(brace_map(text))
+    new_time = time.perf_counter() - start
+
+    print(f"Legacy matcher: {legacy_blocks} blocks in {legacy_time:.2f}s")
+    print(f"Tokenizer:      {new_blocks} blocks in {new_time:.2f}s")
+    if new_time > 0:
+        print(f"Speed-up: {legacy_time / new_time:.1f}x")
+    if legacy_blocks != new_blocks:
+        print("Note: block counts differ because the tokenizer skips braces in strings and comments.")
+    return legacy_time, new_time
+
+
+def main():
+    import tkinter as tk
+    from tkinter import filedialog
+
+    root = tk.Tk()
+    root.withdraw()
+    print("Select the base game's common folder...")
+    common_folder = filedialog.askdirectory(title="Select the base game's common folder")
+    if not common_folder:
+        print("No folder selected. Exiting.")
+        return
+    benchmark(common_folder)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,16 @@
 import os
-import re
 import tkinter as tk
 from tkinter import filedialog
+from clausewitz_cst import parse_file, Block
+from clausewitz_select import Selector, Section
+from parse_cache import cached_parse
+from manifest import Manifest
 
-# Regex patterns
-STATE_ID_PATTERN = re.compile(r"id\s*=\s*(\d+)")
-COAL_PATTERN = re.compile(r"coal\s*=\s*(\d+)", re.IGNORECASE)
-RESOURCES_BLOCK_PATTERN = re.compile(r"resources\s*=\s*\{", re.IGNORECASE)
+# bump when the merge changes, every mod state is then processed again
+TOOL_VERSION = 1
+
+STATE_RESOURCES_SELECTOR = Selector("state.id", "state.resources")
+STATE_ID_SELECTOR = Selector("state.id")
 
 
 def select_folder(title):
@@ -15,82 +19,61 @@ def select_folder(title):
     return filedialog.askdirectory(title=title)
 
 
-def parse_base_states(base_folder):
+def extract_state_resources(fpath):
     """
-    Reads base-game state files and extracts:
+    Reads one state file and extracts:
       - state ID
-      - total coal amount
-    Returns dict: { state_id: coal_amount }
+      - resource totals across its resources blocks
+    Returns (state_id, { resource: amount }), or None if the file has no id.
     """
-    state_coal = {}
-
-    for fname in os.listdir(base_folder):
-        if not fname.endswith(".txt"):
-            continue
+    found = STATE_RESOURCES_SELECTOR.values_file(fpath)
 
-        fpath = os.path.join(base_folder, fname)
-        with open(fpath, "r", encoding="utf-8", errors="ignore") as f:
-            content = f.read()
+    # Find state id
+    sid = next((int(v) for v in found["state.id"] if isinstance(v, str) and v.isdigit()), None)
+    if sid is None:
+        return None
 
-        # Find state id
-        id_match = STATE_ID_PATTERN.search(content)
-        if not id_match:
+    # Total all resources blocks, nested braces and comments included
+    resources = {}
+    for block in found["state.resources"]:
+        if not isinstance(block, Section):
             continue
-        sid = int(id_match.group(1))
+        for name, amount in block.entries:
+            if isinstance(amount, str) and amount.isdigit():
+                name = name.lower()
+                resources[name] = resources.get(name, 0) + int(amount)
 
-        # Extract all resources blocks
-        blocks = re.findall(r"resources\s*=\s*\{([^}]*)\}", content,
-                            flags=re.IGNORECASE | re.DOTALL)
+    return sid, resources
 
-        coal_total = 0
-        for block in blocks:
-            m = COAL_PATTERN.search(block)
-            if m:
-                coal_total += int(m.group(1))
 
-        if coal_total > 0:
-            state_coal[sid] = coal_total
-
-    return state_coal
+def extract_state_id(fpath):
+    ids = STATE_ID_SELECTOR.values_file(fpath)["state.id"]
+    return next((int(v) for v in ids if isinstance(v, str) and v.isdigit()), None)
 
 
-def find_state_block_end(lines, state_start_idx):
+def parse_base_states(base_folder):
     """
-    Given the index where 'state = {' occurs,
-    return the index of the correct matching closing brace.
-    Uses brace-depth tracking to avoid nested block mistakes.
+    Reads base-game state files and extracts:
+      - state ID
+      - total coal amount
+    Returns dict: { state_id: coal_amount }
+    Per-file results are cached between runs, so only files changed by a
+    game patch are read again.
     """
-    brace_depth = 0
-    found_open = False
-
-    for idx in range(state_start_idx, len(lines)):
-        line = lines[idx]
+    state_coal = {}
 
-        # Count braces
-        brace_depth += line.count("{")
-        brace_depth -= line.count("}")
+    file_paths = [os.path.join(base_folder, fname) for fname in os.listdir(base_folder) if fname.endswith(".txt")]
+    parsed = cached_parse("coalifier_states", base_folder, file_paths, extract_state_resources, version=2)
 
-        # First time we see a '{' after "state ="
-        if not found_open and "{" in line:
-            found_open = True
+    for result in parsed.values():
+        if result is None:
             continue
+        sid, resources = result
+        coal_total = resources.get("coal", 0)
+        if coal_total > 0:
+            state_coal[sid] = coal_total
 
-        # When brace depth returns to zero, block closes
-        if found_open and brace_depth == 0:
-            return idx
-
-    return None
-
-
-def find_state_block_start(lines):
-    """
-    Find the line index where the state block begins.
-    Returns the index of the line containing "state = {".
-    """
-    for i, line in enumerate(lines):
-        if "state" in line and "=" in line and "{" in line:
-            return i
-    return None
+    return state_coal
 
 
 def apply_to_mod_states(mod_folder, base_coal_dict, log):
@@ -99,107 +82,66 @@ def apply_to_mod_states(mod_folder, base_coal_dict, log):
       - match by state ID
       - insert or update coal inside resources block
       - ensure insertion occurs ONLY inside the correct state block
+    Only the coal value (or the new resources block) is spliced into the file,
+    the rest of the text is written back untouched.
+    Mod states unchanged since the last run with the same base-game coal
+    values are skipped.
     """
 
     # Build index of mod state files by state ID
     mod_index = {}
 
-    for fname in os.listdir(mod_folder):
-        if not fname.endswith(".txt"):
-            continue
-        fpath = os.path.join(mod_folder, fname)
-        with open(fpath, "r", encoding="utf-8", errors="ignore") as f:
-            content = f.read()
-        m = STATE_ID_PATTERN.search(content)
-        if m:
-            sid = int(m.group(1))
+    file_paths = [os.path.join(mod_folder, fname) for fname in os.listdir(mod_folder) if fname.endswith(".txt")]
+    for fpath, sid in cached_parse("coalifier_mod_ids", mod_folder, file_paths, extract_state_id).items():
+        if sid is not None:
             mod_index[sid] = fpath
 
+    manifest = Manifest("coalifier", mod_folder, sorted(base_coal_dict.items()), TOOL_VERSION)
     total_modified = 0
+    skipped = 0
 
     for sid, coal in base_coal_dict.items():
         if sid not in mod_index:
             continue
 
         path = mod_index[sid]
+        if not manifest.changed(path):
+            skipped += 1
+            continue
+        doc = parse_file(path)
 
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            lines = f.readlines()
-
-        state_start_idx = find_state_block_start(lines)
-        if state_start_idx is None:
+        state = doc.find("state")
+        if state is None or not isinstance(state.value, Block):
             log.write(f"WARNING: State {sid} in {path} has no state block.\n")
             continue
 
-        state_end_idx = find_state_block_end(lines, state_start_idx)
-        if state_end_idx is None:
+        if state.value.close is None:
             log.write(f"WARNING: Could not find end of state block for state {sid} in {path}.\n")
             continue
 
-        # Determine if resources block exists in this state
-        resources_start = None
-        resources_end = None
-        inside = False
-        brace_depth = 0
-
-        for i in range(state_start_idx, state_end_idx + 1):
-            line = lines[i]
-
-            if RESOURCES_BLOCK_PATTERN.search(line):
-                resources_start = i
-                # Find the end of this block
-                brace_depth = line.count("{") - line.count("}")
-                for j in range(i + 1, len(lines)):
-                    brace_depth += lines[j].count("{")
-                    brace_depth -= lines[j].count("}")
-                    if brace_depth == 0:
-                        resources_end = j
-                        break
-                break
+        resources = state.value.get("resources")
+        try:
+            doc.set("resources.coal", coal, block=state.value)
+        except ValueError:
+            log.write(f"WARNING: resources in state {sid} ({path}) is not a block.\n")
+            continue
 
         # Case 1: No resources block — insert one just before end of state block
-        if resources_start is None:
-            new_block = [
-                "    resources = {\n",
-                f"        coal = {coal}\n",
-                "    }\n"
-            ]
-
-            new_lines = (
-                lines[:state_end_idx] +
-                new_block +
-                lines[state_end_idx:]
-            )
-
-            with open(path, "w", encoding="utf-8") as f:
-                f.writelines(new_lines)
-
-            total_modified += 1
+        if resources is None:
             log.write(f"Added new resources block with coal={coal} to state {sid} in {path}\n")
-
+        # Case 2: Resources block exists — update or insert coal
+        elif resources.value.get("coal") is not None:
+            log.write(f"Updated coal in state {sid} to {coal} in {path}\n")
         else:
-            # Case 2: Resources block exists — update or insert coal
-            block_content = "".join(lines[resources_start:resources_end + 1])
-
-            if COAL_PATTERN.search(block_content):
-                updated_block = COAL_PATTERN.sub(f"coal = {coal}", block_content)
-                log.write(f"Updated coal in state {sid} to {coal} in {path}\n")
-            else:
-                # Insert coal before closing brace
-                updated_block = block_content.replace("}", f"    coal = {coal}\n}}")
-                log.write(f"Inserted coal={coal} into existing resources block in state {sid} ({path})\n")
-
-            new_lines = (
-                lines[:resources_start] +
-                updated_block.splitlines(keepends=True) +
-                lines[resources_end + 1:]
-            )
-
-            with open(path, "w", encoding="utf-8") as f:
-                f.writelines(new_lines)
+            log.write(f"Inserted coal={coal} into existing resources block in state {sid} ({path})\n")
 
+        if doc.write(path):
             total_modified += 1
+        manifest.record(path)
 
+    manifest.save()
+    if skipped:
+        log.write(f"Skipped {skipped} state(s) unchanged since the last run.\n")
     return total_modified
 
 
@@ -0,0 +1,202 @@
+import re
+import math
+import colorsys
+from source_file import read_text
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Map colours from common/countries/colors.txt compared the way the eye sees
+# them: every colour goes to CIE Lab, where straight-line distance (delta E)
+# roughly matches how different two colours look. Used to warn about a new
+# country's colour being too close to an existing one and to pick colours
+# that are as far as possible from everything already on the map.
+# NumPy does the distance maths in bulk when installed, otherwise the same
+# search runs in plain Python over a coarser grid of candidate colours.
+
+COLOUR_PATTERN = re.compile(
+    r"^[ \t]*([A-Za-z][A-Za-z0-9]{2})[ \t]*=[ \t]*\{[^{}]*?\bcolor[ \t]*=[ \t]*(rgb|hsv|HSV|RGB)?[ \t]*"
+    r"\{[ \t]*([\d.]+)[ \t]+([\d.]+)[ \t]+([\d.]+)[ \t]*\}",
+    re.MULTILINE)
+
+# below this delta E two countries are hard to tell apart on the map
+MIN_DISTANCE = 12.0
+
+# suggested colours stay in this L* range and above this chroma, the far
+# corners of the RGB cube (near black, near white, greys) make poor map colours
+LIGHTNESS_RANGE = (30.0, 85.0)
+MIN_CHROMA = 20.0
+
+# candidate colours are every STEP-th value on each channel
+CANDIDATE_STEP = 8 if np is not None else 32
+# candidates compared per block, keeps the distance matrix around 32MB
+CHUNK = 4096
+
+# D65 white point
+WHITE = (0.95047, 1.0, 1.08883)
+
+
+def parse_rgb(value):
+    """(r, g, b) from "10,20,30" or "10 20 30", or None if it isn't three numbers 0-255."""
+    parts = value.replace(",", " ").split()
+    if len(parts) != 3 or not all(p.isdigit() and int(p) <= 255 for p in parts):
+        return None
+    return tuple(int(p) for p in parts)
+
+
+def read_palette(colours_path):
+    """[(tag, (r, g, b))] for every country in a colors.txt, hsv colours converted."""
+    palette = []
+    for tag, space, a, b, c in COLOUR_PATTERN.findall(read_text(colours_path)):
+        a, b, c = float(a), float(b), float(c)
+        if space.lower() == "hsv":
+            a, b, c = (round(x * 255) for x in colorsys.hsv_to_rgb(a, b, c))
+        palette.append((tag.upper(), (int(a), int(b), int(c))))
+    return palette
+
+
+def _linear(channel):
+    channel /= 255.0
+    return channel / 12.92 if channel <= 0.04045 else ((channel + 0.055) / 1.055) ** 2.4
+
+
+def _f(t):
+    return t ** (1 / 3) if t > 0.008856 else 7.787 * t + 16 / 116
+
+
+def rgb_to_lab(rgb):
+    """Lab of one (r, g, b)."""
+    r, g, b = (_linear(float(c)) for c in rgb)
+    x = (0.4124 * r + 0.3576 * g + 0.1805 * b) / WHITE[0]
+    y = (0.2126 * r + 0.7152 * g + 0.0722 * b) / WHITE[1]
+    z = (0.0193 * r + 0.1192 * g + 0.9505 * b) / WHITE[2]
+    fx, fy, fz = _f(x), _f(y), _f(z)
+    return 116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)
+
+
+def rgb_to_lab_array(rgb):
+    """Lab of an (N, 3) array of rgb values, needs NumPy."""
+    c = np.asarray(rgb, dtype=np.float64) / 255.0
+    c = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    xyz = c @ np.array([[0.4124, 0.2126, 0.0193],
+                        [0.3576, 0.7152, 0.1192],
+                        [0.1805, 0.0722, 0.9505]]) / np.array(WHITE)
+    f = np.where(xyz > 0.008856, np.cbrt(xyz), 7.787 * xyz + 16 / 116)
+    return np.stack((116 * f[:, 1] - 16, 500 * (f[:, 0] - f[:, 1]), 200 * (f[:, 1] - f[:, 2])), axis=1)
+
+
+def min_sq_distances(points, others):
+    """Squared distance from each Lab point to its nearest in others, NumPy arrays."""
+    if len(others) == 0:
+        return np.full(len(points), np.inf)
+    others_sq = (others ** 2).sum(axis=1)
+    result = np.empty(len(points))
+    for start in range(0, len(points), CHUNK):
+        block = points[start:start + CHUNK]
+        # |a - b|^2 = |a|^2 + |b|^2 - 2 a.b, one matrix product per block
+        d = (block ** 2).sum(axis=1)[:, None] + others_sq[None, :] - 2 * block @ others.T
+        result[start:start + CHUNK] = d.min(axis=1)
+    return np.maximum(result, 0)
+
+
+def candidate_colours():
+    values = range(0, 256, CANDIDATE_STEP)
+    return [(r, g, b) for r in values for g in values for b in values]
+
+
+def is_usable(lab):
+    """Light and saturated enough to read as a country on the map."""
+    lightness, a, b = lab
+    return LIGHTNESS_RANGE[0] <= lightness <= LIGHTNESS_RANGE[1] and math.hypot(a, b) >= MIN_CHROMA
+
+
+def usable_mask(lab):
+    """is_usable for an (N, 3) Lab array, needs NumPy."""
+    lightness = lab[:, 0]
+    return ((lightness >= LIGHTNESS_RANGE[0]) & (lightness <= LIGHTNESS_RANGE[1])
+            & (np.hypot(lab[:, 1], lab[:, 2]) >= MIN_CHROMA))
+
+
+class Palette:
+    """
+    Country colours in Lab, for nearest-colour checks and picking new colours.
+    lab is an (N, 3) array with NumPy, a list of tuples without.
+    """
+
+    def __init__(self, entries=()):
+        entries = list(entries)
+        self.tags = [tag for tag, _ in entries]
+        self.rgb = [tuple(rgb) for _, rgb in entries]
+        if np is not None:
+            self.lab = rgb_to_lab_array(self.rgb) if self.rgb else np.empty((0, 3))
+        else:
+            self.lab = [rgb_to_lab(rgb) for rgb in self.rgb]
+
+    @classmethod
+    def from_file(cls, colours_path):
+        return cls(read_palette(colours_path))
+
+    def __len__(self):
+        return len(self.tags)
+
+    def add(self, tag, rgb):
+        self.tags.append(tag)
+        self.rgb.append(tuple(rgb))
+        if np is not None:
+            self.lab = np.vstack((self.lab, rgb_to_lab_array([rgb])))
+        else:
+            self.lab.append(rgb_to_lab(rgb))
+
+    def nearest(self, rgb):
+        """(tag, delta E) of the closest existing colour, (None, inf) if there are none."""
+        if not self.tags:
+            return None, math.inf
+        lab = rgb_to_lab(rgb)
+        if np is not None:
+            sq = ((self.lab - np.array(lab)) ** 2).sum(axis=1)
+            i = int(sq.argmin())
+            return self.tags[i], math.sqrt(sq[i])
+
+        best_tag, best = None, math.inf
+        for tag, other in zip(self.tags, self.lab):
+            d = math.dist(lab, other)
+            if d < best:
+                best_tag, best = tag, d
+        return best_tag, best
+
+    def is_distinct(self, rgb, min_distance=MIN_DISTANCE):
+        return self.nearest(rgb)[1] >= min_distance
+
+    def suggest(self, count=1):
+        """
+        count colours, each as far as possible from every existing colour and
+        from the ones picked before it (greedy farthest-point search over a
+        grid of usable candidates). The picks are not added to the palette.
+        """
+        candidates = candidate_colours()
+        if np is not None:
+            cand_lab = rgb_to_lab_array(candidates)
+            keep = usable_mask(cand_lab)
+            candidates = [c for c, usable in zip(candidates, keep) if usable]
+            cand_lab = cand_lab[keep]
+            nearest = min_sq_distances(cand_lab, self.lab)
+            picks = []
+            for _ in range(count):
+                i = int(nearest.argmax())
+                picks.append(candidates[i])
+                nearest = np.minimum(nearest, ((cand_lab - cand_lab[i]) ** 2).sum(axis=1))
+            return picks
+
+        cand_lab = [rgb_to_lab(c) for c in candidates]
+        candidates = [c for c, lab in zip(candidates, cand_lab) if is_usable(lab)]
+        cand_lab = [lab for lab in cand_lab if is_usable(lab)]
+        nearest = [min((math.dist(c, o) for o in self.lab), default=math.inf) for c in cand_lab]
+        picks = []
+        for _ in range(count):
+            i = max(range(len(candidates)), key=nearest.__getitem__)
+            picks.append(candidates[i])
+            picked = cand_lab[i]
+            nearest = [min(d, math.dist(c, picked)) for d, c in zip(nearest, cand_lab)]
+        return picks
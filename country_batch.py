@@ -0,0 +1,239 @@
+import os
+import csv
+import json
+import time
+import shutil
+from itertools import islice
+from collections import namedtuple
+from state_transfer import transfer_states
+from colour_palette import Palette, MIN_DISTANCE
+from character_importer import Character, LEADER, character_id, render_character
+from templates import load_template, history_values, HISTORY_PLACEHOLDERS
+from flag_pipeline import convert_flag
+
+# Headless version of countrycreation mode 1 for many countries at once.
+# Rows come from a CSV or JSON manifest; files shared by every country
+# (02_countries.txt, colors.txt) get one append for the whole batch and each
+# per-tag file is written once with everything that goes in it.
+#
+# CSV header: tag,name,ideology,leader,flag,states,rgb
+#   tag:    left empty, a free tag based on the name is picked
+#   states: ids separated by spaces, ';' or ',' (quote the cell for commas), first is the capital
+#   rgb:    "10 20 30" or "10,20,30", left empty a colour distinct from the rest of the map is picked, 'n' for none
+# JSON: a list of objects with the same keys, states and rgb may be lists.
+
+Country = namedtuple("Country", ["tag", "name", "ideology_num", "leader", "flag", "states", "rgb"])
+
+
+def split_values(value):
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return value.replace(",", " ").replace(";", " ").split()
+
+
+def read_manifest(manifest_path):
+    """Rows of a .csv or .json manifest as dicts with lower-case keys."""
+    if manifest_path.lower().endswith(".json"):
+        with open(manifest_path, "r", encoding="utf-8-sig") as f:
+            rows = json.load(f)
+    else:
+        with open(manifest_path, "r", encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.DictReader(f))
+    return [{str(k).strip().lower(): v for k, v in row.items() if k is not None} for row in rows]
+
+
+def parse_row(row, ideologies, ideologies_full, base_folder):
+    """Country from a manifest row, or raises ValueError saying what is wrong."""
+    tag = str(row.get("tag") or "").strip().upper()
+    if tag and (len(tag) != 3 or not tag[0].isalpha()):
+        raise ValueError(f"invalid tag '{tag}'")
+    name = str(row.get("name") or "").strip()
+    if not name:
+        raise ValueError("missing name")
+
+    ideology = str(row.get("ideology") or "").strip().lower()
+    if ideology in ideologies:
+        ideology_num = ideologies.index(ideology)
+    elif ideology in ideologies_full:
+        ideology_num = ideologies_full.index(ideology)
+    else:
+        raise ValueError(f"unknown ideology '{ideology}'")
+
+    leader = str(row.get("leader") or "").strip()
+    if leader.lower() == "n":
+        leader = ""
+
+    flag = str(row.get("flag") or "").strip()
+    if flag and not os.path.isabs(flag):
+        flag = os.path.join(base_folder, flag)
+    if flag and not os.path.isfile(flag):
+        raise ValueError(f"flag not found: {flag}")
+
+    states = split_values(row.get("states"))
+    if not all(s.isdigit() for s in states):
+        raise ValueError(f"state ids must be numbers: {states}")
+
+    rgb = split_values(row.get("rgb"))
+    if [c.lower() for c in rgb] == ["n"]:
+        rgb = None
+    elif rgb and (len(rgb) != 3 or not all(c.isdigit() and int(c) <= 255 for c in rgb)):
+        raise ValueError(f"rgb must be three numbers 0-255: {rgb}")
+
+    return Country(tag, name, ideology_num, leader, flag, [int(s) for s in states],
+                   None if rgb is None else [int(c) for c in rgb])
+
+
+def load_countries(manifest_path, ideologies, ideologies_full, tag_index=None):
+    """
+    Valid countries from the manifest; bad rows and repeated tags are reported
+    and skipped. With a TagIndex, tags already in the game or mod are skipped
+    too and rows without a tag are given a free one.
+    """
+    countries = []
+    seen = set()
+    manifest_folder = os.path.dirname(os.path.abspath(manifest_path))
+    for row_num, row in enumerate(read_manifest(manifest_path), 2):
+        try:
+            country = parse_row(row, ideologies, ideologies_full, manifest_folder)
+        except ValueError as e:
+            print(f"Row {row_num}: {e}, skipped")
+            continue
+        if not country.tag:
+            if tag_index is None:
+                print(f"Row {row_num}: no tag given, skipped")
+                continue
+            country = country._replace(tag=tag_index.suggest(country.name, 1)[0])
+            print(f"Row {row_num}: {country.name} given tag {country.tag}")
+        elif country.tag in seen:
+            print(f"Row {row_num}: tag {country.tag} appears more than once, skipped")
+            continue
+        elif tag_index is not None and country.tag in tag_index:
+            free = ", ".join(islice(tag_index.free_tags(country.tag[0]), 5))
+            print(f"Row {row_num}: tag {country.tag} is already used by {tag_index.where(country.tag) or 'the game'}, "
+                  f"skipped (free: {free})")
+            continue
+        seen.add(country.tag)
+        if tag_index is not None:
+            tag_index.reserve(country.tag)
+        countries.append(country)
+    return countries
+
+
+def character_tag(country):
+    return character_id(country.tag, country.leader)
+
+
+def render_characters(country, ideologies_sub):
+    if not country.leader:
+        return 'characters={\n}'
+    leader = Character(country.tag, country.leader, ideologies_sub[country.ideology_num], LEADER, '')
+    return 'characters={\n'+render_character(leader)+'\n}'
+
+
+def render_history(country, history_template, ideologies_full):
+    capital = country.states[0] if country.states else 1
+    data = history_template.render(history_values(country.tag, capital, country.ideology_num, ideologies_full))
+    if country.leader:
+        data = data.replace('#recruit_character =', 'recruit_character = '+character_tag(country))
+    return data
+
+
+def render_localisation(country):
+    tag = country.tag
+    loc = 'l_english:\n '+tag+': "'+country.name+'"\n '+tag+'_DEF: "'+country.name+'"\n '+tag+'_ADJ: "'+country.name+'"'
+    if country.leader:
+        leader_tag = character_tag(country)
+        loc += '\n '+leader_tag+': "'+country.leader+'"\n '+leader_tag+'_desc: "'+country.leader+' Description"'
+    return loc
+
+
+def render_colour(country):
+    colour = ' '.join(str(c) for c in country.rgb)
+    return '\n'+country.tag+' = {\n\tcolor = rgb { '+colour+' }\n\tcolor_ui = rgb { '+colour+' }\n}'
+
+
+def assign_colours(colours_path, countries):
+    """
+    Fill in the colour of every country that has none with the most distinct
+    colours left on the map, and warn about given colours close to an existing one.
+    """
+    palette = Palette.from_file(colours_path) if os.path.exists(colours_path) else Palette()
+    wanted = []
+    for country in countries:
+        if country.rgb is None:
+            continue
+        if not country.rgb:
+            wanted.append(country)
+            continue
+        near_tag, distance = palette.nearest(country.rgb)
+        if distance < MIN_DISTANCE:
+            print(f"{country.tag}'s colour is hard to tell apart from {near_tag} (delta E {distance:.1f})")
+        palette.add(country.tag, country.rgb)
+    for country, rgb in zip(wanted, palette.suggest(len(wanted))):
+        country.rgb.extend(rgb)
+        print(f"{country.tag} given colour {' '.join(str(c) for c in rgb)}")
+
+
+def assign_states(mod_folder, base_folder, countries):
+    """
+    Give every listed state to its country: owner and first core set to the
+    tag, state copied over from the base game first if the mod lacks it.
+    Each state file is edited once, the last country listing a state wins.
+    """
+    owners = {}
+    for country in countries:
+        for state_id in country.states:
+            if state_id in owners and owners[state_id] != country.tag:
+                print(f"State {state_id} listed for {owners[state_id]} and {country.tag}, giving it to {country.tag}")
+            owners[state_id] = country.tag
+    transfer_states(mod_folder, owners, base_folder)
+
+
+def create_countries(mod_folder, countries, ideologies_full, ideologies_sub, base_folder=None):
+    """Write every file mode 1 would for each country, batching the shared ones."""
+    start = time.perf_counter()
+    paths = {name: mod_folder+'/'+name for name in ("common/country_tags", "common/countries", "common/characters",
+                                                   "history/countries", "history/units", "localisation/english",
+                                                   "gfx/flags/medium", "gfx/flags/small", "history/states")}
+    for folder in paths.values():
+        os.makedirs(folder, exist_ok=True)
+
+    history_template = load_template('base_history.txt', HISTORY_PLACEHOLDERS)
+
+    for country in countries:
+        tag = country.tag
+        with open(paths["common/countries"]+'/'+country.name+'.txt', "w", encoding="utf-8") as country_file:
+            country_file.write('graphical_culture = eastern_european_gfx \ngraphical_culture_2d = eastern_european_2d\n\ncolor = { 0 0 0 }')
+        with open(paths["common/characters"]+'/'+tag+'_characters.txt', "w", encoding="utf-8") as character_file:
+            character_file.write(render_characters(country, ideologies_sub))
+        with open(paths["history/countries"]+'/'+tag+' - '+country.name+'.txt', "w", encoding="utf-8") as history_file:
+            history_file.write(render_history(country, history_template, ideologies_full))
+        with open(paths["history/units"]+'/'+tag+'_1936.txt', "w", encoding="utf-8") as oob_file:
+            oob_file.write('division_template={\n}\nunits = {\n}')
+        with open(paths["localisation/english"]+'/'+tag+'_l_english.yml', "w", encoding="utf-8-sig") as loc_file:
+            loc_file.write(render_localisation(country))
+        if country.flag:
+            convert_flag(country.flag, mod_folder+'/gfx/flags', tag)
+
+    # one append each for the files every country shares
+    with open(paths["common/country_tags"]+'/02_countries.txt', "a", encoding="utf-8") as tag_file:
+        tag_file.write(''.join(c.tag+' = "countries/'+c.name+'.txt"\n' for c in countries))
+
+    coloured = [c for c in countries if c.rgb is not None]
+    if coloured:
+        colours_path = paths["common/countries"]+'/colors.txt'
+        if not os.path.exists(colours_path):
+            base_colours = base_folder+'/common/countries/colors.txt' if base_folder else None
+            if base_colours and os.path.exists(base_colours):
+                shutil.copyfile(base_colours, colours_path)
+            else:
+                print("No colors.txt in the mod and no base game given, the new file only has the new countries")
+        assign_colours(colours_path, coloured)
+        with open(colours_path, "a", encoding="utf-8") as colours_file:
+            colours_file.write(''.join(render_colour(c) for c in coloured))
+
+    assign_states(mod_folder, base_folder, countries)
+
+    print(f"Created {len(countries)} countries in {time.perf_counter() - start:.2f}s")
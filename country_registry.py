@@ -0,0 +1,154 @@
+import os
+import re
+from collections import namedtuple
+from parse_cache import cached_parse
+from tag_index import tag_files, is_valid_tag
+
+# Where each country of a mod keeps its files. Every folder is listed once
+# and the history files are read once (in parallel, unchanged ones come from
+# the cache), so tools ask the registry for a tag's history file, OOB or
+# ruling party instead of listing history/countries again for every tag.
+#
+#   registry = country_registry(mod_folder)
+#   registry.history_file("ABC"), registry.get("ABC").ruling_party
+
+Country = namedtuple("Country", ["tag", "country_file", "history_file", "oob", "characters_file",
+                                 "localisation_file", "colour", "ruling_party"])
+
+COUNTRY_FILE_PATTERN = re.compile(r'^[ \t]*([A-Za-z][A-Za-z0-9]{2})[ \t]*=[ \t]*"([^"]+)"', re.MULTILINE)
+RULING_PARTY_PATTERN = re.compile(r'ruling_party\s*=\s*([a-zA-Z_]+)', re.IGNORECASE)
+OOB_PATTERN = re.compile(r'^[ \t]*oob[ \t]*=[ \t]*"?([^"\s#]+)', re.MULTILINE)
+
+# bump when extract_history changes
+EXTRACT_VERSION = 1
+
+_registries = {}
+
+
+def file_tag(file_name):
+    """Tag a per-country file is named after (ABC - Name.txt, ABC_characters.txt, ...), or None."""
+    tag = file_name[:3].upper()
+    if len(file_name) > 3 and file_name[3] in " -_." and is_valid_tag(tag):
+        return tag
+    return None
+
+
+def extract_history(file_path):
+    """(ruling party, oob name) of one history/countries file."""
+    with open(file_path, "r", encoding="utf-8-sig", errors="ignore") as f:
+        text = f.read()
+    party = RULING_PARTY_PATTERN.search(text)
+    oob = OOB_PATTERN.search(text)
+    return (party.group(1).lower() if party else None), (oob.group(1) if oob else None)
+
+
+def list_folder(folder):
+    return sorted(os.listdir(folder)) if os.path.isdir(folder) else []
+
+
+class CountryRegistry:
+    """Files of every country in one mod, indexed by tag."""
+
+    def __init__(self, mod_folder):
+        self.mod_folder = mod_folder
+        self.countries = {}
+        self._build()
+
+    def _folder(self, *parts):
+        return os.path.join(self.mod_folder, *parts)
+
+    def _tag_files(self, folder, preferred_suffix, suffix=""):
+        """{ tag: file } for folder, TAG + preferred_suffix wins over other files named after the tag."""
+        found = {}
+        for fn in list_folder(folder):
+            tag = file_tag(fn)
+            if tag is None or not fn.lower().endswith(suffix):
+                continue
+            if fn.lower() == (tag + preferred_suffix).lower() or tag not in found:
+                found[tag] = os.path.join(folder, fn)
+        return found
+
+    def _build(self):
+        fields = {}
+
+        def entry(tag):
+            return fields.setdefault(tag, dict.fromkeys(Country._fields, None))
+
+        for path in tag_files(self.mod_folder):
+            with open(path, "r", encoding="utf-8-sig", errors="ignore") as f:
+                for tag, country_path in COUNTRY_FILE_PATTERN.findall(f.read()):
+                    entry(tag.upper())["country_file"] = self._folder("common", country_path)
+
+        history_folder = self._folder("history", "countries")
+        histories = {}
+        for fn in list_folder(history_folder):
+            tag = file_tag(fn)
+            if tag is not None and tag not in histories:
+                histories[tag] = os.path.join(history_folder, fn)
+        parsed = cached_parse("country_registry_history", history_folder, list(histories.values()),
+                              extract_history, version=EXTRACT_VERSION, parallel=True)
+
+        units_folder = self._folder("history", "units")
+        units = set(list_folder(units_folder))
+        for tag, path in histories.items():
+            party, oob = parsed.get(path, (None, None))
+            country = entry(tag)
+            country["history_file"] = path
+            country["ruling_party"] = party
+            oob_file = (oob or tag + "_1936") + ".txt"
+            if oob_file in units:
+                country["oob"] = os.path.join(units_folder, oob_file)
+
+        for tag, path in self._tag_files(self._folder("common", "characters"), "_characters.txt").items():
+            entry(tag)["characters_file"] = path
+        for tag, path in self._tag_files(self._folder("localisation", "english"), "_l_english.yml", "l_english.yml").items():
+            entry(tag)["localisation_file"] = path
+
+        colours_path = self._folder("common", "countries", "colors.txt")
+        if os.path.exists(colours_path):
+            from colour_palette import read_palette
+            for tag, rgb in read_palette(colours_path):
+                entry(tag)["colour"] = rgb
+
+        for tag, values in fields.items():
+            values["tag"] = tag
+            self.countries[tag] = Country(**values)
+
+    def __contains__(self, tag):
+        return tag.upper() in self.countries
+
+    def __iter__(self):
+        return iter(sorted(self.countries))
+
+    def get(self, tag):
+        return self.countries.get(tag.upper())
+
+    def _field(self, tag, field):
+        country = self.get(tag)
+        return getattr(country, field) if country else None
+
+    def history_file(self, tag):
+        return self._field(tag, "history_file")
+
+    def characters_file(self, tag):
+        return self._field(tag, "characters_file")
+
+    def localisation_file(self, tag):
+        return self._field(tag, "localisation_file")
+
+    def ruling_party(self, tag):
+        return self._field(tag, "ruling_party")
+
+    def update(self, tag, **values):
+        """Record files a tool has just created, e.g. update("ABC", localisation_file=path)."""
+        tag = tag.upper()
+        country = self.countries.get(tag) or Country(tag, *([None] * (len(Country._fields) - 1)))
+        self.countries[tag] = country._replace(**values)
+
+
+def country_registry(mod_folder, refresh=False):
+    """The registry for mod_folder, built the first time it's asked for in this run."""
+    key = os.path.abspath(mod_folder)
+    if refresh or key not in _registries:
+        _registries[key] = CountryRegistry(mod_folder)
+    return _registries[key]
@@ -2,12 +2,21 @@ import pathlib
 import os
 #import system
 #import codecs
-import tkinter as tk
-from tkinter import filedialog
-from PIL import Image
-import shutil
 import re
-import subprocess
+import argparse
+from itertools import islice
+from source_file import read_source, read_lines, is_empty, append_before_close
+from mmap_scan import matching_lines, line_numbers, drop_lines
+
+#tkinter, Pillow and the bigger tools are imported by the modes that use them, so the text-only modes start quickly
+#and importing this file has no side effects
+
+#ideology set up
+ideologies = ['d','c','f','n']
+ideologies_full = ['democratic', 'communism', 'fascism', 'neutrality']
+ideologies_sub = ['conservatism', 'marxism', 'gen_nazism', 'despotism']
+
+base_path = pathlib.Path(__file__).parent.resolve()
 
 #makes sure the sort is in state number order
 def sort_nicely(l):
@@ -15,44 +24,32 @@ def sort_nicely(l):
     alphanum_key = lambda key: [ convert(c) for c in re.split('([0-9]+)', key) ]
     l.sort( key=alphanum_key )
 
-def remove_last_line(file):
-    with open(file, "r") as edit_file:
-        lines = edit_file.readlines()
-    with open(file, "w") as edit_file:   
-        for line in lines[:-1]:
-            edit_file.writelines(line)
-
 def substring_after(string, delimiter):
     return (string.partition(delimiter)[-1]).replace(' ','').replace('\n','')
 
 def find_mod_folder():
-    global mod_folder_location, base_path
+    import tkinter as tk
+    from tkinter import filedialog
+    global mod_folder_location
     if not os.path.exists(str(base_path)+"/common"):
         tk.Tk().withdraw()
         mod_folder_location = os.path.dirname(filedialog.askdirectory(initialdir = "/",title = "Select the common folder from your mod"))
     else:
         mod_folder_location = base_path
 
-def find_mod_file(file_path, initial_text, delete_last_num=False):
-    
+def find_mod_file(file_path, initial_text, inside_block=False):
+    #inside_block files get their entries through append_before_close, so they're left as they are once they have content
     os.makedirs(os.path.dirname(str(mod_folder_location)+file_path),exist_ok=True)
-    if os.path.exists(str(mod_folder_location)+file_path):
-        with open(str(mod_folder_location)+file_path, "r") as file:
-            first = file.read(1)
-        
+    #size check instead of reading the first character, so the file is only opened to append
+    if is_empty(str(mod_folder_location)+file_path):
         with open(str(mod_folder_location)+file_path, "a") as file:
-            if not first:
-                file.write(initial_text)
-            else:
-                file.write("\n")
-                if not delete_last_num == False:
-                    for x in range(0,delete_last_num):
-                        remove_last_line(str(mod_folder_location)+file_path)
+            file.write(initial_text)
+    elif not inside_block:
+        with open(str(mod_folder_location)+file_path, "a") as file:
+            file.write("\n")
 
 def read_without_comments(file, comments=0):
-    with open(file,'r') as file_read:
-        array = file_read.readlines()
-    array = array[comments:]
+    array = read_lines(file)[comments:]
     #print(array)
     return array
             
@@ -64,10 +61,56 @@ def folder_up(folder, num=1, new_path=''):
 def remove_duplicates(x):
   return list(dict.fromkeys(x))
 
+def find_missing_symbols(common_folder_location, kind):
+    #reads the whole mod for references to things it never defines, no game launch needed
+    from tkinter import filedialog
+    from symbol_table import build_symbol_table, TRIGGER
+    base_game_folder = None
+    if input("Also load the base game so its definitions count (y/n)? ").lower() == 'y':
+        base_game_folder = filedialog.askdirectory(initialdir = "/",title = "Select the base game folder")
+    elif kind == TRIGGER:
+        print('Without the base game, built-in triggers cannot be told apart from missing ones, so none are reported')
+    table = build_symbol_table(os.path.dirname(common_folder_location), base_game_folder)
+    missing = table.missing(kind)
+    #without the base game only names under the mod's own tags are known to be missing, the rest may be vanilla
+    unverified = table.missing_unverified(kind)
+    if unverified:
+        print(str(len(unverified))+' '+kind+'(s) not defined in the mod may come from the base game, load it to check them. Not stubbed: '+', '.join(unverified))
+    print(str(len(missing))+' missing '+kind+'(s) found')
+    return missing
+
+def load_tag_index(mod_folder):
+    #tags already in use, so a new country can't clash with the mod or the base game
+    from tkinter import filedialog
+    from tag_index import build_tag_index
+    base_game_folder = None
+    if input("Check tags against the base game as well (y/n)? ").lower() == 'y':
+        base_game_folder = filedialog.askdirectory(initialdir = "/",title = "Select the base game folder")
+    return build_tag_index(mod_folder, base_game_folder)
+
+def pick_colour(colour_input, colours_path):
+    #checks the colour against colors.txt, 'a' or a colour too close to another country's gets the most distinct one offered instead
+    from colour_palette import Palette, parse_rgb, MIN_DISTANCE
+    palette = Palette.from_file(colours_path) if colours_path and os.path.exists(colours_path) else Palette()
+    suggested = ' '.join(str(c) for c in palette.suggest()[0])
+    while True:
+        if colour_input.lower() == 'a':
+            return suggested
+        rgb = parse_rgb(colour_input)
+        if rgb is None:
+            colour_input = input("Enter three numbers from 0 to 255 separated by commas, or 'a' for "+suggested+": ")
+            continue
+        near_tag, distance = palette.nearest(rgb)
+        if distance >= MIN_DISTANCE:
+            return ' '.join(str(c) for c in rgb)
+        colour_input = input("That's hard to tell apart from "+near_tag+" on the map, enter 'a' for "+suggested+", 'k' to keep it, or another colour: ")
+        if colour_input.lower() == 'k':
+            return ' '.join(str(c) for c in rgb)
+
 def create_character(tag_input, character_input, ideology_input):
     global ideologies, ideologies_sub, ideologies_full, mod_folder_location, history_folder_location
     
-    find_mod_file('/common/characters/'+tag_input+'_characters.txt','characters = {\n',1)
+    find_mod_file('/common/characters/'+tag_input+'_characters.txt','characters = {\n}',True)
     find_mod_file('/localisation/english/'+tag_input+'_l_english.yml','l_english \n ')
     
     character_input_tag = tag_input+'_'+(character_input.replace(' ', '_').lower())
@@ -79,31 +122,50 @@ def create_character(tag_input, character_input, ideology_input):
     else:
         ideology_tag = ideology_input
         
-    with open(str(mod_folder_location)+'/common/characters/'+tag_input+'_characters.txt', "a") as character_file:
-        character_file.write('\t'+character_input_tag+' = { \n\t\tname = '+character_input_tag+'\n\t\tportraits = {\n\t\t\tcivilian = {\n\t\t\t\tlarge = GFX_portrait_'+character_input_tag+'\n\t\t\t}\n\t\t}\n\t\tcountry_leader = {\n\t\t\tideology = '+ideology_tag+'\n\t\t\texpire = "1960.1.1.1"\n\t\t\tid = -1\n\t\t}\n\t}\n}')
+    #goes in before the closing brace without rewriting the rest of the file
+    append_before_close(str(mod_folder_location)+'/common/characters/'+tag_input+'_characters.txt', '\t'+character_input_tag+' = { \n\t\tname = '+character_input_tag+'\n\t\tportraits = {\n\t\t\tcivilian = {\n\t\t\t\tlarge = GFX_portrait_'+character_input_tag+'\n\t\t\t}\n\t\t}\n\t\tcountry_leader = {\n\t\t\tideology = '+ideology_tag+'\n\t\t\texpire = "1960.1.1.1"\n\t\t\tid = -1\n\t\t}\n\t}\n')
     
-    for files in os.listdir(str(mod_folder_location)+'/history/countries'):
-        if (os.path.basename(files))[:3] == tag_input:
-            history_folder_location = str(mod_folder_location)+'/history/countries/'+files
-    
-    with open(history_folder_location, "r") as history_file:
-        history_file_data = history_file.read()
-        history_file_data = history_file_data.replace('set_politics', 'recruit_character = '+character_input_tag+'\nset_politics')
-    with open(history_folder_location, "w") as history_file:
-        history_file.write(history_file_data)
+    from country_registry import country_registry
+    history_folder_location = country_registry(str(mod_folder_location)).history_file(tag_input)
+    if history_folder_location is None:
+        print('No history/countries file for '+tag_input+', recruit_character line not added')
+    else:
+        with open(history_folder_location, "r") as history_file:
+            history_file_data = history_file.read()
+            history_file_data = history_file_data.replace('set_politics', 'recruit_character = '+character_input_tag+'\nset_politics')
+        with open(history_folder_location, "w") as history_file:
+            history_file.write(history_file_data)
     
     with open(str(mod_folder_location)+'/localisation/english/'+tag_input+'_l_english.yml', "a") as loc_file:
         loc_file.write('\n '+character_input_tag+': "'+character_input+'"\n '+character_input_tag+'_desc: "'+character_input+' Description"')
 
 def set_mode(mode):
     global mode_num
-    mode_num = available_modes.index(mode)
+    mode_num = (['0'] + list(MODES)).index(mode)
+
+#menu entries in order, each handler does its own imports so picking a mode only loads what that mode needs
+MODES = {}
+
+def mode(key, name):
+    def register(handler):
+        MODES[key] = (name, handler)
+        return handler
+    return register
 
 def major_function(mode_val):
-    #stuff needed later on
-    global base_path, ideologies, ideologies_sub, ideologies_full, mod_folder_location, history_folder_location
+    if mode_val in MODES:
+        MODES[mode_val][1]()
+
+@mode('1', 'Full Country Creation')
+def full_country_creation():
+    import shutil
+    import tkinter as tk
+    from tkinter import filedialog
+    from flag_pipeline import convert_flag
+    from state_transfer import transfer_states
+    from focus_import import FocusTree, focus_localisation
+    from templates import load_template, history_values, HISTORY_PLACEHOLDERS, NAMES_PLACEHOLDERS
     
-    base_path = pathlib.Path(__file__).parent.resolve()
     character_input = ''
     create_flag_ind = ''
     create_mult_flag_ind = ''
@@ -118,792 +180,558 @@ def major_function(mode_val):
     warning_ind = ''
     history_folder_location = base_path
     common_folder_location = base_path
-    flag_directory = '/'
-
-    #ideology set up
-    ideologies = ['d','c','f','n']
-    ideologies_full = ['democratic', 'communism', 'fascism', 'neutrality']
-    ideologies_sub = ['conservatism', 'marxism', 'gen_nazism', 'despotism']
     
     #various paths to folders needed
     path_array = ["common/country_tags","common/countries","common/characters","history/countries","history/units","localisation/english","gfx/flags/medium","gfx/flags/small","history/states"]
     
     #creates all the folders if they don't exist
-    if mode_val == '1':
-        mod_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select your mod's folder")
-        
-        for i in range(0,9):
-            path_array[i] = mod_folder_location + '/' + path_array[i]
-        
-        for folder in path_array:
-            os.makedirs(folder,exist_ok=True)
-            
-        #choose a tag, keeps going until you input a three character tag where the first is a letter
-        while not len(tag_input)==3 or not tag_input[0:1].isalpha():
-            tag_input = str(input("Choose a tag: ")).upper()
-        
-        #choose a country name, keeps going until you actually enter something
-        while not len(name_input)>0:
-            name_input = str(input("Choose a country name: "))
-            
-        #choose an ideology, keeps going until you enter something within the ideologies array
-        while not ideology_input in ideologies:
-            ideology_input = str(input("Which ideology is your country: Democratic (d); Communism (c); Fascism (f); Neutrality (n)? "))
-            
-        #sets the number of the ideology to be used for full and sub conversion
-        ideology_num = ideologies.index(ideology_input)
-        
-        #opens 02_countries.txt (or creates if it no exist), then adds the country on a new line
-        with open(path_array[0]+'/02_countries.txt', "a") as tag_file:
-            tag_file.seek(0,0)
-            tag_file.write(tag_input+' = "countries/'+name_input+'.txt"\n')
-        
-        #creates a basic countries file called by 02_countries.txt, eastern europe is arbitrary
-        with open(path_array[1]+'/'+name_input+'.txt', "w") as country_file:
-            country_file.write('graphical_culture = eastern_european_gfx \ngraphical_culture_2d = eastern_european_2d\n\ncolor = { 0 0 0 }')
-        
-        #creates a basic characters file with a characters block, may later be amended
+    mod_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select your mod's folder")
+    
+    for i in range(0,9):
+        path_array[i] = mod_folder_location + '/' + path_array[i]
+    
+    for folder in path_array:
+        os.makedirs(folder,exist_ok=True)
+    
+    tags_in_use = load_tag_index(mod_folder_location)
+    
+    #choose a tag, keeps going until you input an unused three character tag where the first is a letter
+    while not len(tag_input)==3 or not tag_input[0:1].isalpha() or tag_input in tags_in_use:
+        tag_input = str(input("Choose a tag: ")).upper()
+        if len(tag_input)==3 and tag_input in tags_in_use:
+            print(tag_input+' is already used by '+str(tags_in_use.where(tag_input) or 'the game')+', free tags: '+', '.join(islice(tags_in_use.free_tags(tag_input[0]),5)))
+    
+    #choose a country name, keeps going until you actually enter something
+    while not len(name_input)>0:
+        name_input = str(input("Choose a country name: "))
+    
+    #choose an ideology, keeps going until you enter something within the ideologies array
+    while not ideology_input in ideologies:
+        ideology_input = str(input("Which ideology is your country: Democratic (d); Communism (c); Fascism (f); Neutrality (n)? "))
+    
+    #sets the number of the ideology to be used for full and sub conversion
+    ideology_num = ideologies.index(ideology_input)
+    
+    #opens 02_countries.txt (or creates if it no exist), then adds the country on a new line
+    with open(path_array[0]+'/02_countries.txt', "a") as tag_file:
+        tag_file.seek(0,0)
+        tag_file.write(tag_input+' = "countries/'+name_input+'.txt"\n')
+    
+    #creates a basic countries file called by 02_countries.txt, eastern europe is arbitrary
+    with open(path_array[1]+'/'+name_input+'.txt', "w") as country_file:
+        country_file.write('graphical_culture = eastern_european_gfx \ngraphical_culture_2d = eastern_european_2d\n\ncolor = { 0 0 0 }')
+    
+    #creates a basic characters file with a characters block, may later be amended
+    with open(path_array[2]+'/'+tag_input+'_characters.txt', "w") as character_file:
+        character_file.write('characters={\n}')
+    
+    #creates a basic history/countries file with capital = 1, 3 research slots, no research and of the ideology chosen
+    #the indexing ensures the ideology you chose has 70% and the others 10%
+    #will be incompatible with more than 4 ideologies
+    base_file_data = load_template('base_history.txt', HISTORY_PLACEHOLDERS).render(history_values(tag_input, 1, ideology_num, ideologies_full))
+    with open(path_array[3]+'/'+tag_input+' - '+name_input+'.txt', "w") as history_file:
+        history_file.write(base_file_data)
+    
+    #creates an essentially empty oob
+    with open(path_array[4]+'/'+tag_input+'_1936.txt', "w") as oob_file:
+        oob_file.write('division_template={\n}\nunits = {\n}')
+    
+    #creates a localisation file and adds country name, DEF and AJG
+    with open(path_array[5]+'/'+tag_input+'_l_english.yml', "w", encoding='utf-8-sig') as loc_file:
+        loc_file.write('l_english:\n '+tag_input+': "'+name_input+'"\n '+tag_input+'_DEF: "'+name_input+'"\n '+tag_input+'_ADJ: "'+name_input+'"')
+    
+    #choose a character name, keeps going until you enter one
+    #character orig is proper case, character input is with _'s and character input tag is full name lowercased with tag at front
+    while len(character_input) == 0:
+        character_input_orig = input("Create a leader?\nEnter 'n' for No, or enter their name: ")
+        character_input = character_input_orig.replace(' ', '_')
+        character_input_tag = tag_input+'_'+(character_input.lower())
+    
+    #if not n (you can't have a leader with n as the name) 
+    #replaces the close bracket in characters file with the basic stuff for a leader, with the right sub ideology
+    #replaces commented out recruit character with recruiting this one
+    #adds leader to loc file
+    if not character_input.lower() == 'n':
+        with open(path_array[2]+'/'+tag_input+'_characters.txt', "r") as character_file:
+            character_file_data = character_file.read()
+            character_file_data = character_file_data.replace('}', '\t'+character_input_tag+' = { \n\t\tname = '+character_input_tag+'\n\t\tportraits = {\n\t\t\tcivilian = {\n\t\t\t\tlarge = GFX_portrait_'+character_input_tag+'\n\t\t\t}\n\t\t}\n\t\tcountry_leader = {\n\t\t\tideology = '+ideologies_sub[ideology_num]+'\n\t\t\texpire = "1960.1.1.1"\n\t\t\tid = -1\n\t\t}\n\t}\n}')
         with open(path_array[2]+'/'+tag_input+'_characters.txt', "w") as character_file:
-            character_file.write('characters={\n}')
-        
-        #creates a basic history/countries file with capital = 1, 3 research slots, no research and of the ideology chosen
-        #the indexing ensures the ideology you chose has 70% and the others 10%
-        #will be incompatible with more than 4 ideologies
-        with open('base_history.txt', "r") as base_history_file:
-            base_file_data = base_history_file.read()
-            base_file_data = base_file_data.replace('CAPITAL_NO', '1')
-            base_file_data = base_file_data.replace('MYTAG', tag_input)
-            base_file_data = base_file_data.replace('MAIN_IDEOLOGY', ideologies_full[ideology_num])
-            base_file_data = base_file_data.replace('OTHER_IDEOLOGY1', ideologies_full[(ideology_num+1)%4])
-            base_file_data = base_file_data.replace('OTHER_IDEOLOGY2', ideologies_full[(ideology_num+2)%4])
-            base_file_data = base_file_data.replace('OTHER_IDEOLOGY3', ideologies_full[(ideology_num+3)%4])
+            character_file.write(character_file_data)
+    
+        with open(path_array[3]+'/'+tag_input+' - '+name_input+'.txt', "r") as history_file:
+            history_file_data = history_file.read()
+        history_file_data = history_file_data.replace('#recruit_character =', 'recruit_character = '+character_input_tag)
         with open(path_array[3]+'/'+tag_input+' - '+name_input+'.txt', "w") as history_file:
-            history_file.write(base_file_data)
-        
-        #creates an essentially empty oob
-        with open(path_array[4]+'/'+tag_input+'_1936.txt', "w") as oob_file:
-            oob_file.write('division_template={\n}\nunits = {\n}')
-        
-        #creates a localisation file and adds country name, DEF and AJG
-        with open(path_array[5]+'/'+tag_input+'_l_english.yml', "w", encoding='utf-8-sig') as loc_file:
-            loc_file.write('l_english:\n '+tag_input+': "'+name_input+'"\n '+tag_input+'_DEF: "'+name_input+'"\n '+tag_input+'_ADJ: "'+name_input+'"')
-        
-        #choose a character name, keeps going until you enter one
-        #character orig is proper case, character input is with _'s and character input tag is full name lowercased with tag at front
-        while len(character_input) == 0:
-            character_input_orig = input("Create a leader?\nEnter 'n' for No, or enter their name: ")
-            character_input = character_input_orig.replace(' ', '_')
-            character_input_tag = tag_input+'_'+(character_input.lower())
-        
-        #if not n (you can't have a leader with n as the name) 
-        #replaces the close bracket in characters file with the basic stuff for a leader, with the right sub ideology
-        #replaces commented out recruit character with recruiting this one
-        #adds leader to loc file
-        if not character_input.lower() == 'n':
-            with open(path_array[2]+'/'+tag_input+'_characters.txt', "r") as character_file:
-                character_file_data = character_file.read()
-                character_file_data = character_file_data.replace('}', '\t'+character_input_tag+' = { \n\t\tname = '+character_input_tag+'\n\t\tportraits = {\n\t\t\tcivilian = {\n\t\t\t\tlarge = GFX_portrait_'+character_input_tag+'\n\t\t\t}\n\t\t}\n\t\tcountry_leader = {\n\t\t\tideology = '+ideologies_sub[ideology_num]+'\n\t\t\texpire = "1960.1.1.1"\n\t\t\tid = -1\n\t\t}\n\t}\n}')
-            with open(path_array[2]+'/'+tag_input+'_characters.txt', "w") as character_file:
-                character_file.write(character_file_data)
-            
-            with open(path_array[3]+'/'+tag_input+' - '+name_input+'.txt', "r") as history_file:
-                history_file_data = history_file.read()
-            history_file_data = history_file_data.replace('#recruit_character =', 'recruit_character = '+character_input_tag)
-            with open(path_array[3]+'/'+tag_input+' - '+name_input+'.txt', "w") as history_file:
-                history_file.write(history_file_data)
-        
-            with open(path_array[5]+'/'+tag_input+'_l_english.yml', "a") as loc_file:
-                loc_file.write('\n '+character_input_tag+': "'+character_input_orig+'"\n '+character_input_tag+'_desc: "'+character_input_orig+' Description"')
-        
-        #choose whether you want a flag, keeps going until you enter y or n
-        while not (create_flag_ind =='y' or create_flag_ind == 'n'):
-            create_flag_ind = input("Use existing .png, .jpg or .tga file to create flags (y/n)? ")
-        
-        #opens file explorer to pick flag
-        #resizes flag to large medium and small and puts them in the right place
-        #tag files are valid (more luck than intentional)
-        if create_flag_ind == 'y':
-            tk.Tk().withdraw()
-            flag_input = filedialog.askopenfilename(initialdir = "/",title = "Select a Flag",filetypes = (("PNG files","*.png*"),("JPG files","*.jpg*"),("TGA files","*.tga*")))
-            flag_orig = Image.open(flag_input)
-            flag_name = (os.path.basename(flag_input))[:-4]
-            
-            flag_large = flag_orig.resize((82, 52))
-            flag_large.save(mod_folder_location+'/gfx/flags/'+flag_name+'.tga')
-            flag_medium = flag_orig.resize((41, 26))
-            flag_medium.save(mod_folder_location+'/gfx/flags/medium/'+flag_name+'.tga')
-            flag_small = flag_orig.resize((10, 7))
-            flag_small.save(mod_folder_location+'/gfx/flags/small/'+flag_name+'.tga')
-        
-            flag_directory = os.path.dirname(flag_input)
-            while not (create_mult_flag_ind =='y' or create_mult_flag_ind == 'n'):
-                create_mult_flag_ind = input("Create up to three more flags for each other ideology (y/n)? ")
-            
-            if create_mult_flag_ind == 'y':
-                for x in range(1,4):
-                    try:
-                        flag_input = filedialog.askopenfilename(initialdir = flag_directory,title = "Select a Flag",filetypes = (("PNG files","*.png*"),("JPG files","*.jpg*"),("TGA files","*.tga*")))
-                        flag_orig = Image.open(flag_input)
-                        flag_name = (os.path.basename(flag_input))[:-4]
-                        
-                        flag_large = flag_orig.resize((82, 52))
-                        flag_large.save(mod_folder_location+'/gfx/flags/'+flag_name+'.tga')
-                        flag_medium = flag_orig.resize((41, 26))
-                        flag_medium.save(mod_folder_location+'/gfx/flags/medium/'+flag_name+'.tga')
-                        flag_small = flag_orig.resize((10, 7))
-                        flag_small.save(mod_folder_location+'/gfx/flags/small/'+flag_name+'.tga')
-                    except ValueError:
-                        print("Ended early")
-        
-        #choose whether you want the extra files, keeps going until you enter y or n
-        while not (create_extras_ind =='y' or create_extras_ind == 'n'):
-            create_extras_ind = input("Create extra files your country may need, including states (y/n)? ")
-        
-        if create_extras_ind == 'y':
-            with open('base_names.txt', "r") as base_name_file:
-                base_name_file_data = base_name_file.read()
-                base_name_file_data = base_name_file_data.replace('MYTAG', tag_input)
-            
-            #only start these if needed
-            extra_path_array = ["common/national_focus","common/ideas","common/decisions","common/decisions/categories","common/scripted_localisation","common/scripted_effects","common/scripted_triggers","common/dynamic_modifiers","common/on_actions","common/country_leader","events","common/names"]
-            extra_file_names = [tag_input+"_focus.txt",tag_input+"_ideas.txt",tag_input+"_decisions.txt",tag_input+"_decision_categories.txt",tag_input+"_scripted_loc.txt",tag_input+"_scripted_effects.txt",tag_input+"_scripted_triggers.txt",tag_input+"_dynamic_modifiers.txt",tag_input+"_on_actions.txt",tag_input+"_traits.txt",tag_input+"_events.txt",tag_input+"_names.txt"]
-            extra_file_inputs = ['focus_tree={\n\n\tid = '+tag_input+'_focus\n\n\tcountry = {\n\t\tfactor = 0\n\t\tmodifier = {\n\t\t\tadd = 10\n\t\t\ttag = '+tag_input+'\n\t\t}\n\t}\n\n\tdefault = no\n\treset_on_civilwar = no\n\n\tcontinuous_focus_position = { x = 1000 y = 1000 }\n\n\t#focus = {}\n}','ideas = {\n\tcountry = {\n\t}\n}','','','','','','','on_actions = {\n}','leader_traits = {\n}','#add_namespace = example\n\n#country_event = {}\n\n#news_event = {}',base_name_file_data]
-            
-            for i in range(0,12):
-                extra_path_array[i] = mod_folder_location + '/' + extra_path_array[i]
-            
-            for folder in extra_path_array:
-                os.makedirs(folder,exist_ok=True)
-                
-                folder_num = extra_path_array.index(folder)
-                #file_name = extra_file_names[folder_num]
-                
-                with open(extra_path_array[folder_num]+'/'+extra_file_names[folder_num], "w") as new_extra_file:
-                    new_extra_file.write(extra_file_inputs[folder_num])
-                
-            #choose whether you want a basic focus tree, keeps going until you enter y or n
-            while not (create_focus_ind =='y' or create_focus_ind == 'n'):
-                create_focus_ind = input("Import a generic focus tree for your country (y/n)? ")       
-                
-            if create_focus_ind == 'y':
-                
-                #because I don't have a better way to do this yet
-                extra_replace_from = ['prerequisite = { focus = '+tag_input+'_bomber_focus focus = fighter_focus }','prerequisite = { focus = '+tag_input+'_flexible_navy focus = large_navy }','prerequisite = { focus = '+tag_input+'_large_navy focus = flexible_navy }','prerequisite = { focus = '+tag_input+'_foreign_expeditions focus = deterrence }','prerequisite = { focus = '+tag_input+'_paramilitarism focus = political_commissars }','prerequisite = { focus = '+tag_input+'_ideological_fanaticism focus = why_we_fight }']
-                extra_replace_to = ['prerequisite = { focus = '+tag_input+'_bomber_focus focus = '+tag_input+'_fighter_focus }','prerequisite = { focus = '+tag_input+'_flexible_navy focus = '+tag_input+'_large_navy }','prerequisite = { focus = '+tag_input+'_large_navy focus = '+tag_input+'_flexible_navy }','prerequisite = { focus = '+tag_input+'_foreign_expeditions focus = '+tag_input+'_deterrence }','prerequisite = { focus = '+tag_input+'_paramilitarism focus = '+tag_input+'_political_commissars }','prerequisite = { focus = '+tag_input+'_ideological_fanaticism focus = '+tag_input+'_why_we_fight }']
-                
-                #choose file
-                tk.Tk().withdraw()
-                common_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the common folder from the base game")
-                
-                #check file is a valid one
+            history_file.write(history_file_data)
+    
+        with open(path_array[5]+'/'+tag_input+'_l_english.yml', "a") as loc_file:
+            loc_file.write('\n '+character_input_tag+': "'+character_input_orig+'"\n '+character_input_tag+'_desc: "'+character_input_orig+' Description"')
+    
+    #choose whether you want a flag, keeps going until you enter y or n
+    while not (create_flag_ind =='y' or create_flag_ind == 'n'):
+        create_flag_ind = input("Use existing .png, .jpg or .tga file to create flags (y/n)? ")
+    
+    #opens file explorer to pick flag
+    #resizes flag to large medium and small and puts them in the right place
+    #tag files are valid (more luck than intentional)
+    if create_flag_ind == 'y':
+        tk.Tk().withdraw()
+        flag_input = filedialog.askopenfilename(initialdir = "/",title = "Select a Flag",filetypes = (("PNG files","*.png*"),("JPG files","*.jpg*"),("TGA files","*.tga*")))
+        #decoded once, all three sizes resampled from it and named after the tag and ideology in the file name
+        convert_flag(flag_input, mod_folder_location+'/gfx/flags', None, ideologies, ideologies_full)
+    
+        flag_directory = os.path.dirname(flag_input)
+        while not (create_mult_flag_ind =='y' or create_mult_flag_ind == 'n'):
+            create_mult_flag_ind = input("Create up to three more flags for each other ideology (y/n)? ")
+    
+        if create_mult_flag_ind == 'y':
+            for x in range(1,4):
                 try:
-                    while not (os.path.basename(common_folder_location) == 'common') or invalid_ind == 1:
-                        if os.path.basename(common_folder_location) == 'common':
-                            with open(common_folder_location+'/national_focus/generic.txt', "r") as generic_file:
-                                generic_file_data = generic_file.read()
-                                generic_file_data = generic_file_data.replace('\t\tid = ','\t\tid = '+tag_input+'_')
-                                generic_file_data = generic_file_data.replace('relative_position_id = ','relative_position_id = '+tag_input+'_')
-                                generic_file_data = generic_file_data.replace('prerequisite = { focus = ','prerequisite = { focus = '+tag_input+'_')
-                                generic_file_data = generic_file_data.replace('mutually_exclusive = { focus = ','mutually_exclusive = { focus = '+tag_input+'_')
-                                for replace_from in extra_replace_from:
-                                    generic_file_data = generic_file_data.replace(replace_from,extra_replace_to[extra_replace_from.index(replace_from)])
-                                
-                                new_focus_file = open(extra_path_array[0]+'/'+extra_file_names[0], "a")
-                                new_focus_file.write(generic_file_data)
-                                new_focus_file.close()
-                                
-                                new_focus_file = open(extra_path_array[0]+'/'+extra_file_names[0], "r")
-                                lines = new_focus_file.readlines()
-                                new_focus_file = open(extra_path_array[0]+'/'+extra_file_names[0], "w")
-                                for number, line in enumerate(lines):
-                                    if number not in range(17,51):
-                                        new_focus_file.write(line)
-                                new_focus_file.close()
-                            invalid_ind = 0
-                        else:
-                            print("INVALID FOLDER, it should be called common")
-                            tk.Tk().withdraw()
-                            common_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the common folder from the base game")
+                    flag_input = filedialog.askopenfilename(initialdir = flag_directory,title = "Select a Flag",filetypes = (("PNG files","*.png*"),("JPG files","*.jpg*"),("TGA files","*.tga*")))
+                    convert_flag(flag_input, mod_folder_location+'/gfx/flags', None, ideologies, ideologies_full)
                 except ValueError:
                     print("Ended early")
-                
-                #open file, get lines with focus id's and then add them to the localisation file
-                new_focus_file = open(extra_path_array[0]+'/'+extra_file_names[0], "r")
-                loc_lines = new_focus_file.readlines()
-                loc_lines_array = []
-                focus_check = '\t\tid = '+tag_input
-                for line in loc_lines:
-                    if focus_check in line and not 'relative_position' in line:
-                        loc_lines_array.append(line[7:])
-                
+    
+    #choose whether you want the extra files, keeps going until you enter y or n
+    while not (create_extras_ind =='y' or create_extras_ind == 'n'):
+        create_extras_ind = input("Create extra files your country may need, including states (y/n)? ")
+    
+    if create_extras_ind == 'y':
+        base_name_file_data = load_template('base_names.txt', NAMES_PLACEHOLDERS).render({'MYTAG': tag_input})
+    
+        #only start these if needed
+        extra_path_array = ["common/national_focus","common/ideas","common/decisions","common/decisions/categories","common/scripted_localisation","common/scripted_effects","common/scripted_triggers","common/dynamic_modifiers","common/on_actions","common/country_leader","events","common/names"]
+        extra_file_names = [tag_input+"_focus.txt",tag_input+"_ideas.txt",tag_input+"_decisions.txt",tag_input+"_decision_categories.txt",tag_input+"_scripted_loc.txt",tag_input+"_scripted_effects.txt",tag_input+"_scripted_triggers.txt",tag_input+"_dynamic_modifiers.txt",tag_input+"_on_actions.txt",tag_input+"_traits.txt",tag_input+"_events.txt",tag_input+"_names.txt"]
+        extra_file_inputs = ['focus_tree={\n\n\tid = '+tag_input+'_focus\n\n\tcountry = {\n\t\tfactor = 0\n\t\tmodifier = {\n\t\t\tadd = 10\n\t\t\ttag = '+tag_input+'\n\t\t}\n\t}\n\n\tdefault = no\n\treset_on_civilwar = no\n\n\tcontinuous_focus_position = { x = 1000 y = 1000 }\n\n\t#focus = {}\n}','ideas = {\n\tcountry = {\n\t}\n}','','','','','','','on_actions = {\n}','leader_traits = {\n}','#add_namespace = example\n\n#country_event = {}\n\n#news_event = {}',base_name_file_data]
+    
+        for i in range(0,12):
+            extra_path_array[i] = mod_folder_location + '/' + extra_path_array[i]
+    
+        for folder in extra_path_array:
+            os.makedirs(folder,exist_ok=True)
+    
+            folder_num = extra_path_array.index(folder)
+            #file_name = extra_file_names[folder_num]
+    
+            with open(extra_path_array[folder_num]+'/'+extra_file_names[folder_num], "w") as new_extra_file:
+                new_extra_file.write(extra_file_inputs[folder_num])
+    
+        #choose whether you want a basic focus tree, keeps going until you enter y or n
+        while not (create_focus_ind =='y' or create_focus_ind == 'n'):
+            create_focus_ind = input("Import a generic focus tree for your country (y/n)? ")       
+    
+        if create_focus_ind == 'y':
+    
+            focus_ids = []
+    
+            #choose file
+            tk.Tk().withdraw()
+            common_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the common folder from the base game")
+    
+            #check file is a valid one
+            try:
+                while not (os.path.basename(common_folder_location) == 'common') or invalid_ind == 1:
+                    if os.path.basename(common_folder_location) == 'common':
+                        #every focus id and every reference to one gets the tag in front, the tree keeps the id of the file made above
+                        generic_tree = FocusTree(common_folder_location+'/national_focus/generic.txt')
+                        focus_tree_data, focus_ids = generic_tree.clone(tag_input, tag_input+'_focus')
+                        with open(extra_path_array[0]+'/'+extra_file_names[0], "w") as new_focus_file:
+                            new_focus_file.write(focus_tree_data)
+                        invalid_ind = 0
+                    else:
+                        print("INVALID FOLDER, it should be called common")
+                        tk.Tk().withdraw()
+                        common_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the common folder from the base game")
+            except ValueError:
+                print("Ended early")
+    
+            #add the focus id's to the localisation file
+            if focus_ids:
                 with open(path_array[5]+'/'+tag_input+'_l_english.yml', "a") as loc_file:
-                    loc_file.write('\n\n #FOCUS LOCALISATIONS')
-                    for loc_line in loc_lines_array:
-                        loc_line_id = loc_line.replace('\n','')
-                        loc_line_loc = loc_line.replace('_',' ').replace(tag_input,'').replace('\n','').title()
-                        loc_file.write('\n '+loc_line_id+': "'+loc_line_loc[1:]+'"')
-                        loc_line_id = loc_line.replace('\n','')
-                        loc_line_loc = loc_line.replace('_',' ').replace(tag_input,'').replace('\n','').title()
-                        loc_file.write('\n '+loc_line_id+'_desc: "'+loc_line_loc[1:]+' Description"')
-                
-                new_focus_file.close()
-               
-            invalid_ind = 1
-            
-            #choose whether you want to assign states, keeps going until you enter y or n
-            while len(create_states_ind)==0:
-                create_states_ind = input("Choose starting states for your nation? \nEnter 'n' for No, or enter state ids separated by commas - the first being your capital (e.g. 123,376,200): ")
-            
-            if not create_states_ind == 'n' and (create_states_ind.replace(',','')).isnumeric():
-                create_states_ind = create_states_ind.replace(' ','')
-                create_states_array = create_states_ind.split(',')
-                
-                warning_ind = input("WARNING, any states you have selected which are already present in your mod will be ovewritten by the game game files \nEnter 'y' to continue: ")
-                if warning_ind.lower()=='y':
-                    if not (os.path.basename(common_folder_location) == 'common' or os.path.basename(history_folder_location)=='states'):
-                        try:
-                            #choose file
-                            tk.Tk().withdraw()
-                            history_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the history folder from the base game") 
-                        except ValueError:
-                            print("Ended early") 
-                            
-                    if os.path.basename(history_folder_location) == 'history':
-                        history_folder_location = history_folder_location+'/states'            
-                    elif os.path.basename(common_folder_location) == 'common':
-                        history_folder_location = os.path.dirname(common_folder_location)+'/history/states'            
-                    
-                    state_file_array = []
-                    for files in os.listdir(history_folder_location):
-                        state_file_array.append(files)
-                        sort_nicely(state_file_array)
-                        
-                    for state in create_states_array:
-                        state_num = int(state) - 1
-                        #shutil.copyfile(history_folder_location+'/'+state_file_array[state_num], mod_folder_location + '/history/states/'+state_file_array[state_num])
-                        with open(mod_folder_location+'/history/states/'+state_file_array[state_num], "r") as state_file:
-                            state_file_data = state_file.read()
-                            state_file_data = state_file_data.replace('#owner = ', 'owner = '+tag_input+' #')
-                            state_file_data = state_file_data.replace('#add_core_of = ', 'add_core_of = '+tag_input+' #',1)
-                        with open(mod_folder_location+'/history/states/'+state_file_array[state_num], "w") as state_file:  
-                            state_file.write(state_file_data)                            
-                    
-                    with open(path_array[3]+'/'+tag_input+' - '+name_input+'.txt', "r") as history_file:
-                        history_file_data = history_file.read()
-                    history_file_data = history_file_data.replace('capital = 1', 'capital = '+create_states_array[0])
-                    with open(path_array[3]+'/'+tag_input+' - '+name_input+'.txt', "w") as history_file:
-                        history_file.write(history_file_data)  
-                    
-            invalid_ind == 1       
-        #choose whether you want to do the colors file, keeps going until you enter y or n
-        while len(create_colour_ind)==0:
-            create_colour_ind = input("Choose a colour for your nation? \nEnter 'n' for No, or enter RGB values separated by commas (e.g. 10,20,30): ")
-            
-        if not create_colour_ind == 'n':
-            create_colour = create_colour_ind.replace(',',' ')
-            
-            if os.path.exists(mod_folder_location + '/common/countries/colors.txt'):
-                with open(mod_folder_location + '/common/countries/colors.txt', "a") as colours_file:
-                    colours_file.write('\n'+tag_input+' = {\n\tcolor = rgb { '+create_colour+' }\n\tcolor_ui = rgb { '+create_colour+' }\n}')
-            elif os.path.basename(common_folder_location) == 'common':
-                shutil.copyfile(common_folder_location+'/countries/colors.txt', mod_folder_location + '/common/countries/colors.txt')
-                with open(mod_folder_location + '/common/countries/colors.txt', "a") as colours_file:
-                    colours_file.write('\n'+tag_input+' = {\n\tcolor = rgb { '+create_colour+' }\n\tcolor_ui = rgb { '+create_colour+' }\n}')
-                invalid_ind = 0
-            elif os.path.basename(history_folder_location) == 'states':
-                history_folder_location = os.path.dirname(os.path.dirname(history_folder_location))+'/common'
-                shutil.copyfile(common_folder_location+'/countries/colors.txt', mod_folder_location + '/common/countries/colors.txt')
-                with open(mod_folder_location + '/common/countries/colors.txt', "a") as colours_file:
-                    colours_file.write('\n'+tag_input+' = {\n\tcolor = rgb { '+create_colour+' }\n\tcolor_ui = rgb { '+create_colour+' }\n}')
-                invalid_ind = 0
-            else:
-                try:
-                    #choose file
-                    tk.Tk().withdraw()
-                    common_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the common folder from the base game") 
-                    while not (os.path.basename(common_folder_location) == 'common') or invalid_ind == 1:
-                        if os.path.basename(common_folder_location) == 'common':
-                            shutil.copyfile(common_folder_location+'/countries/colors.txt', mod_folder_location + '/common/countries/colors.txt')
-                            with open(mod_folder_location + '/common/countries/colors.txt', "a") as colours_file:
-                                colours_file.write('\n'+tag_input+' = {\n\tcolor = rgb { '+create_colour+' }\n\tcolor_ui = rgb { '+create_colour+' }\n}')
-                            invalid_ind = 0
-                        else:
-                           print("INVALID FOLDER, it should be called common")
-                           tk.Tk().withdraw()
-                           common_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the common folder from the base game") 
-                except ValueError:
-                    print("Ended early")
+                    loc_file.write(focus_localisation(tag_input, focus_ids))
+    
+        invalid_ind = 1
+    
+        #choose whether you want to assign states, keeps going until you enter y or n
+        while len(create_states_ind)==0:
+            create_states_ind = input("Choose starting states for your nation? \nEnter 'n' for No, or enter state ids separated by commas - the first being your capital (e.g. 123,376,200): ")
     
-    #flag stuff, almost identical to above
-    elif mode_val == '2':
-        additional_flag_ind = 'y'
-        os.makedirs("gfx/flags/medium",exist_ok=True)
-        os.makedirs("gfx/flags/small",exist_ok=True)
-        while additional_flag_ind == 'y':
+        if not create_states_ind == 'n' and (create_states_ind.replace(',','')).isnumeric():
+            create_states_ind = create_states_ind.replace(' ','')
+            create_states_array = create_states_ind.split(',')
+    
+            warning_ind = input("WARNING, the owner and first core of every state you have selected will be changed, states your mod doesn't have yet are copied from the base game files \nEnter 'y' to continue: ")
+            if warning_ind.lower()=='y':
+                if not (os.path.basename(common_folder_location) == 'common' or os.path.basename(history_folder_location)=='states'):
+                    try:
+                        #choose file
+                        tk.Tk().withdraw()
+                        history_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the history folder from the base game") 
+                    except ValueError:
+                        print("Ended early") 
+    
+                if os.path.basename(history_folder_location) == 'history':
+                    history_folder_location = history_folder_location+'/states'            
+                elif os.path.basename(common_folder_location) == 'common':
+                    history_folder_location = os.path.dirname(common_folder_location)+'/history/states'            
+    
+                #states are found by their id through the state index, not by their position in the folder
+                #states with their owner commented out get one added
+                base_game_folder = os.path.dirname(os.path.dirname(history_folder_location)) if os.path.basename(history_folder_location) == 'states' else None
+                transfer_states(mod_folder_location, {int(state): tag_input for state in create_states_array}, base_game_folder)
+    
+                with open(path_array[3]+'/'+tag_input+' - '+name_input+'.txt', "r") as history_file:
+                    history_file_data = history_file.read()
+                history_file_data = history_file_data.replace('capital = 1', 'capital = '+create_states_array[0])
+                with open(path_array[3]+'/'+tag_input+' - '+name_input+'.txt', "w") as history_file:
+                    history_file.write(history_file_data)  
+    
+        invalid_ind == 1       
+    #choose whether you want to do the colors file, keeps going until you enter y or n
+    while len(create_colour_ind)==0:
+        create_colour_ind = input("Choose a colour for your nation? \nEnter 'n' for No, 'a' to pick one that stands out, or enter RGB values separated by commas (e.g. 10,20,30): ")
+    
+    if not create_colour_ind == 'n':
+        if os.path.exists(mod_folder_location + '/common/countries/colors.txt'):
+            create_colour = pick_colour(create_colour_ind, mod_folder_location + '/common/countries/colors.txt')
+        elif os.path.basename(common_folder_location) == 'common':
+            create_colour = pick_colour(create_colour_ind, common_folder_location+'/countries/colors.txt')
+        else:
+            create_colour = pick_colour(create_colour_ind, None)
+    
+        if os.path.exists(mod_folder_location + '/common/countries/colors.txt'):
+            with open(mod_folder_location + '/common/countries/colors.txt', "a") as colours_file:
+                colours_file.write('\n'+tag_input+' = {\n\tcolor = rgb { '+create_colour+' }\n\tcolor_ui = rgb { '+create_colour+' }\n}')
+        elif os.path.basename(common_folder_location) == 'common':
+            shutil.copyfile(common_folder_location+'/countries/colors.txt', mod_folder_location + '/common/countries/colors.txt')
+            with open(mod_folder_location + '/common/countries/colors.txt', "a") as colours_file:
+                colours_file.write('\n'+tag_input+' = {\n\tcolor = rgb { '+create_colour+' }\n\tcolor_ui = rgb { '+create_colour+' }\n}')
+            invalid_ind = 0
+        elif os.path.basename(history_folder_location) == 'states':
+            history_folder_location = os.path.dirname(os.path.dirname(history_folder_location))+'/common'
+            shutil.copyfile(common_folder_location+'/countries/colors.txt', mod_folder_location + '/common/countries/colors.txt')
+            with open(mod_folder_location + '/common/countries/colors.txt', "a") as colours_file:
+                colours_file.write('\n'+tag_input+' = {\n\tcolor = rgb { '+create_colour+' }\n\tcolor_ui = rgb { '+create_colour+' }\n}')
+            invalid_ind = 0
+        else:
             try:
-                flag_input = filedialog.askopenfilename(initialdir = flag_directory,title = "Select a Flag",filetypes = (("PNG files","*.png*"),("JPG files","*.jpg*"),("TGA files","*.tga*")))
-                flag_orig = Image.open(flag_input)
-                flag_name = (os.path.basename(flag_input))[:-4]
-                
-                flag_large = flag_orig.resize((82, 52))
-                flag_large.save(str(base_path)+'/gfx/flags/'+flag_name+'.tga')
-                flag_medium = flag_orig.resize((41, 26))
-                flag_medium.save(str(base_path)+'/gfx/flags/medium/'+flag_name+'.tga')
-                flag_small = flag_orig.resize((10, 7))
-                flag_small.save(str(base_path)+'/gfx/flags/small/'+flag_name+'.tga')
-                
-                flag_directory = os.path.dirname(flag_input)
+                #choose file
+                tk.Tk().withdraw()
+                common_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the common folder from the base game") 
+                while not (os.path.basename(common_folder_location) == 'common') or invalid_ind == 1:
+                    if os.path.basename(common_folder_location) == 'common':
+                        shutil.copyfile(common_folder_location+'/countries/colors.txt', mod_folder_location + '/common/countries/colors.txt')
+                        with open(mod_folder_location + '/common/countries/colors.txt', "a") as colours_file:
+                            colours_file.write('\n'+tag_input+' = {\n\tcolor = rgb { '+create_colour+' }\n\tcolor_ui = rgb { '+create_colour+' }\n}')
+                        invalid_ind = 0
+                    else:
+                       print("INVALID FOLDER, it should be called common")
+                       tk.Tk().withdraw()
+                       common_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the common folder from the base game") 
             except ValueError:
                 print("Ended early")
-            additional_flag_ind = input("Convert another flag (y/N)? ").lower()
-            
-    elif mode_val == '3':
+
+#flag stuff, almost identical to above
+@mode('2', 'Flag Resizing')
+def flag_resizing():
+    from tkinter import filedialog
+    from flag_pipeline import convert_flag, convert_flags
+    
+    flag_directory = '/'
+    flag_scope_ind = ''
+    
+    #choose one flag at a time or a whole folder, keeps going until you enter 1 or 2
+    while not (flag_scope_ind == '1' or flag_scope_ind == '2'):
+        flag_scope_ind = input("Convert one flag at a time (1) or every flag in a folder (2)? ")
+    
+    if flag_scope_ind == '2':
+        #spread over every core, flags that haven't changed since the last run are skipped
+        source_folder = filedialog.askdirectory(initialdir = "/",title = "Select the folder with your flags")
+        if source_folder:
+            convert_flags(source_folder, str(base_path)+'/gfx/flags', ideologies, ideologies_full)
+        return
+    
+    additional_flag_ind = 'y'
+    os.makedirs("gfx/flags/medium",exist_ok=True)
+    os.makedirs("gfx/flags/small",exist_ok=True)
+    while additional_flag_ind == 'y':
+        try:
+            flag_input = filedialog.askopenfilename(initialdir = flag_directory,title = "Select a Flag",filetypes = (("PNG files","*.png*"),("JPG files","*.jpg*"),("TGA files","*.tga*")))
+            convert_flag(flag_input, str(base_path)+'/gfx/flags', None, ideologies, ideologies_full)
+    
+            flag_directory = os.path.dirname(flag_input)
+        except ValueError:
+            print("Ended early")
+        additional_flag_ind = input("Convert another flag (y/N)? ").lower()
+
+@mode('3', 'Focus Tree Supplementor')
+def focus_tree_supplementor():
+    from tkinter import filedialog
+    from idea_supplement import find_missing_ideas, add_ideas
+    
+    supp_scope_ind = ''
+    supp_ideas_ind = ''
+    focus_files = None
+    
+    #choose what to supplement, keeps going until you enter 1 or 2
+    while not (supp_scope_ind == '1' or supp_scope_ind == '2'):
+        supp_scope_ind = input("Supplement every focus tree in the mod (1) or one national_focus file (2)? ")
+    
+    if supp_scope_ind == '1':
+        common_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the common folder from your mod")
+    else:
         focus_input = filedialog.askopenfilename(initialdir = '/',title = 'Select Your National_Focus File',filetypes = (("Text files","*.txt*"),('All files', '*.*')))
         common_folder_location = os.path.dirname(os.path.dirname(focus_input))
-        mod_name = str(os.path.basename(os.path.dirname(common_folder_location))).replace(' ','').lower()
-        
-        options_array = ["tag = ","add_ideas"]
-        tag_found_ind = False
-        supp_ideas_ind = ''
+        focus_files = [focus_input]
     
-        with open(focus_input, "r") as focus_file:
-            focus_file_data = focus_file.readlines()
+    #choose whether you want to do ideas, keeps going until you enter y or n
+    while not (supp_ideas_ind =='y' or supp_ideas_ind == 'n'):
+        supp_ideas_ind = input("Ideas (y/n)? ")
     
-        for line in focus_file_data:
-            if tag_found_ind == False and options_array[0] in line:
-                tag_input = substring_after(line, '=')
-                tag_found_ind = True
-        
-        #choose whether you want to do ideas, keeps going until you enter y or n
-        while not (supp_ideas_ind =='y' or supp_ideas_ind == 'n'):
-            supp_ideas_ind = input("Ideas (y/n)? ")
-        
-        if supp_ideas_ind == 'y':
-        
-            ideas_array = []
-            ideas_contents = ["\nideas = {\n\tcountry = {\n\t"," = {\n\t\t\t","picture = generic_economic_increase\n\n\t\t\tallowed = { always = no }\n\t\t\tallowed_civil_war = { always = no }\n\t\t\tremoval_cost = -1\n\n\t\t\tmodifier = {}\n\t\t}\n\t","}\n}"]
-            old_idea_ind = False
-            
-            for line in focus_file_data:
-                if options_array[1] in line:
-                    if '{' in line:
-                        print("Invalid Idea Found")
-                    elif substring_after(line, '=') not in ideas_array:
-                        ideas_array.append(substring_after(line, '='))
-            
-            if os.path.exists("saved_additions_"+mod_name+".txt"):
-                with open("saved_additions_"+mod_name+".txt", "r") as save_file:
-                    save_file_data = save_file.readlines()
-                    for old_idea_orig in save_file_data:
-                        old_idea = old_idea_orig.replace('IDEA:','').replace('\n','')
-                        if old_idea in ideas_array:
-                            ideas_array.remove(old_idea)
-                            old_idea_ind = True
-                            
-            if ideas_array:
-                os.makedirs(common_folder_location+"/ideas/",exist_ok=True)
-                os.makedirs(os.path.dirname(common_folder_location)+"/localisation/english/",exist_ok=True)
-                
-                if old_idea_ind == True:
-                    remove_last_line(common_folder_location+"/ideas/"+tag_input+"_ideas.txt")
-                    remove_last_line(common_folder_location+"/ideas/"+tag_input+"_ideas.txt")
-                
-                with open(common_folder_location+"/ideas/"+tag_input+"_ideas.txt", "a") as idea_file:
-                    if old_idea_ind == True:
-                        idea_file.write("\t")
-                    else:
-                        idea_file.write(ideas_contents[0])
-                             
-                    for idea in ideas_array:
-                        idea_file.write("\t"+idea+ideas_contents[1]+ideas_contents[2])
-                    idea_file.write(ideas_contents[3])
-                
-                with open(os.path.dirname(common_folder_location)+"/localisation/english/"+tag_input+"_l_english.yml", "r") as localisation_file:
-                    first_char_loc = localisation_file.read(1)
-                    
-                with open(os.path.dirname(common_folder_location)+"/localisation/english/"+tag_input+"_l_english.yml", "a", encoding='utf-8-sig') as localisation_file:
-                    if not first_char_loc:
-                        localisation_file.write("l_english:")
-                    else:
-                        localisation_file.write("\n")
-                        
-                    for idea in ideas_array:
-                        if idea[:4] == tag_input+'_':
-                            idea_proper = idea.replace(tag_input+'_', '').replace('_',' ').title()
-                        else:
-                            idea_proper = idea.replace('_',' ').title()
-                        localisation_file.write('\n '+idea+': "'+idea_proper+'"')
-                        localisation_file.write('\n '+idea+'_desc: "'+idea_proper+' Description"')
-                
-                if not os.path.exists("saved_additions_"+mod_name+".txt"):
-                    save_file = open("saved_additions_"+mod_name+".txt", "w")
-                    save_file.close()
-                         
-                with open("saved_additions_"+mod_name+".txt", "r") as save_file:
-                    first_char_save = save_file.read(1)
-                
-                with open("saved_additions_"+mod_name+".txt", "a") as save_file:    
-                    if not first_char_save:
-                        save_file.write("#Additions already made by the tool for the mod: "+mod_name+"\n#This avoids duplication so don't remove this or any lines from it!")
-                    for idea in ideas_array:
-                        print("Added idea "+idea+" to '"+tag_input+"_ideas.txt' and '"+tag_input+"_l_english.yml'")
-                        save_file.write("\nIDEA:"+idea)
-    
-    elif mode_val == '4':
-        character_mass_ind = ''
-        
-        while not (character_mass_ind =='1' or character_mass_ind == '2'):
-            character_mass_ind = input("Create a single character (1) or import character_creator.txt (2)? ")
-    
-        if character_mass_ind == '1':
-            #choose a tag, keeps going until you input a three character tag where the first is a letter
-            while not len(tag_input)==3 or not tag_input[0:1].isalpha():
-                tag_input = str(input("Choose a tag to recruit the character: ")).upper()
-                
-            #choose a character name, keeps going until you actually enter something
-            while not len(character_input)>0:
-                character_input = str(input("Enter the name of your character: "))
-                
-            #choose an ideology
-            while not len(ideology_input)>0:
-                ideology_input = str(input("Enter your ideology or sub-ideology (anything not recognised as an ideology will be assumed to be a sub-ideology): ")).lower()
-        
-            find_mod_folder()
-            create_character(tag_input, character_input, ideology_input)
-        
-        if character_mass_ind == '2':
-            file_input = filedialog.askopenfilename(initialdir = '/',title = 'Select your character creator file',filetypes = (("Text files","*.txt*"),('All files', '*.*')))
-            characters = read_without_comments(file_input, 3)
-            find_mod_folder()
-            
-            for character in characters:
-                character_info = character.split(';')
-                print(character_info)
-                
-                tag_input = character_info[0]
-                character_input = character_info[1]
-                ideology_input = character_info[2].replace('\n','')
-                create_character(tag_input, character_input, ideology_input)
-            
-    elif mode_val == '5':
-        
-        states_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the history folder from your mod")
-        victory_points = []
-        indicator = 0
-        
-        for files in os.listdir(states_folder_location+'/states'):
-            with open(states_folder_location+'/states/'+files, "r") as state_file:
-                lines = state_file.readlines()
-                for line in lines:
-                    if indicator == 1:
-                        victory_points.append((line.split(' ')[0].replace('\t', '')))
-                        indicator = 0
-                    if 'victory_points = {' in line:
-                        indicator = 1
-        
-        sort_nicely(victory_points)
-        map_folder_location = os.path.dirname(states_folder_location)+'/map' 
-        
-        with open(map_folder_location+'/supply_nodes_temp.txt', 'a') as supply_node_file:
-            for victory_point in victory_points:
-                supply_node_file.write('1 '+victory_point+'\n')
-                
-    elif mode_val == '6':
-        
-        map_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the map/strategic regions folder from your mod")
-        
-        for files in os.listdir(map_folder_location):
-            lines_array = []
-            indicator = 0
-            with open(map_folder_location+'/'+files, "r") as map_file:
-                lines = map_file.readlines()
-                zero_start = -1
-                zero_end = -1
-                four_start = -1
-                four_end = -1
-                for num, line in enumerate(lines,1):
-                    if '0.0 0.0' in line:
-                        zero_start = num - 1
-                        zero_end = num + 11
-                    if '4.11 21.11' in line:
-                        four_start = num - 1
-                        four_end = num + 11
-                for num, line in enumerate(lines,1):
-                    if not (zero_start <= num <= zero_end or four_start <= num <= four_end):
-                        lines_array.append(line)
-            with open(map_folder_location+'/'+files, "w") as map_file:
-                for line in lines_array:
-                    map_file.write(line)
-                
-    elif mode_val == '7':
-        
-        map_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the map folder from your mod")
-        with open(map_folder_location+'/adjacencies.csv', 'r') as csv_file:
-            csv_file_lines = csv_file.readlines()
-        
-        for num, line in enumerate(csv_file_lines,1):
-            with open('base_adjacency.txt', "r") as base_file:
-                base_file_data = base_file.read()
-            if num > 1:
-                csv_info = line.split(';')
-                if not csv_info[0] == '-1':
-                    print('Added ' + csv_info[8])
-                    base_file_data = base_file_data.replace('NAME_REPLACE', csv_info[8])
-                    base_file_data = base_file_data.replace('ID1', csv_info[0])
-                    base_file_data = base_file_data.replace('ID2', csv_info[1])
-                    base_file_data = base_file_data.replace('ID3', csv_info[3])
-            
-                    with open(map_folder_location+'/adjacency_rules.txt', 'a') as txt_file:
-                        txt_file.write('\n'+base_file_data)
+    if supp_ideas_ind == 'y':
+        base_game_folder = None
+        if input("Also load the base game so ideas it already defines aren't added (y/n)? ").lower() == 'y':
+            base_game_folder = filedialog.askdirectory(initialdir = "/",title = "Select the base game folder")
     
-    elif mode_val == '8':
-       
-        common_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the common folder from your mod")
-        log_folder_location = folder_up(common_folder_location, 4, 'logs')
-        focus_array = []
-        
-        with open(log_folder_location+'/error.log', 'r') as error_file:
-            error_file_lines = error_file.readlines()
-            
-            for line in error_file_lines:
-                if 'has_completed_focus = ' in line:
-                    focus_array.append(substring_after(line, 'has_completed_focus = ').split('(')[0])
-            
-            if focus_array:
-                focus_array = remove_duplicates(focus_array)
-                
-                with open('base_tree.txt', 'r') as base_tree:
-                    base_tree_data = base_tree.read()
-                
-                with open(common_folder_location+'/national_focus/error_focus.txt', 'w') as focus_file:
-                    focus_file.write(base_tree_data)
-                    for focus in focus_array:
-                        with open('base_focus.txt', 'r') as base_focus:
-                            base_focus_data = base_focus.read()
-                            base_focus_data = base_focus_data.replace('FOCUS_ID', focus)
-                            focus_file.write('\n'+base_focus_data)
-                    focus_file.write('\n}')
-               
-        
-    elif mode_val == '9':
+        #each idea goes to the tag of the tree using it, anything already defined in common/ideas is skipped so reruns add nothing twice
+        missing_ideas = find_missing_ideas(os.path.dirname(common_folder_location), base_game_folder, focus_files)
+        if missing_ideas:
+            add_ideas(os.path.dirname(common_folder_location), missing_ideas)
+        else:
+            print("No missing ideas found")
+
+@mode('4', 'Character Creator')
+def character_creator():
+    from tkinter import filedialog
+    from character_importer import read_character_file, import_characters
     
-        common_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the common folder from your mod")
-        log_folder_location = folder_up(common_folder_location, 4, 'logs')
-        idea_array = []    
+    tag_input = 'taggerihardlyknowher' #lmao
+    character_input = ''
+    ideology_input = ''
+    character_mass_ind = ''
     
-        with open(log_folder_location+'/error.log', 'r') as error_file:
-            error_file_lines = error_file.readlines()
-            
-            for line in error_file_lines:
-                if 'has_idea: ' in line:
-                    idea_array.append(substring_after(line, 'has_idea: ').split('isnotAvalidIdea')[0])
-                if 'Invalid idea' in line:
-                    print(substring_after(line, 'Invalid idea: '))
-                    idea_array.append(substring_after(line, 'Invalid idea: ').split('.Ifyouwantedtoreference')[0].split(':ideas')[0])
-            
-            if idea_array:
-                idea_array = remove_duplicates(idea_array)
-                
-                with open(common_folder_location+'/ideas/error_ideas.txt', 'w') as idea_file:
-                    idea_file.write('ideas = { \n\tcountry = {\n')
-                    for idea in idea_array:
-                        with open('base_idea.txt', 'r') as base_idea:
-                            base_idea_data = base_idea.read()
-                            base_idea_data = base_idea_data.replace('IDEA_ID', idea)
-                            idea_file.write('\n'+base_idea_data)
-                    idea_file.write('\n\t}\n}')
-    
-    elif mode_val == '10':
-    
-        history_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the history folder from your mod")
-        log_folder_location = folder_up(common_folder_location, 3, 'logs')
-        tag_array = []
-    
-        with open(log_folder_location+'/error.log', 'r') as error_file:
-            error_file_lines = error_file.readlines()
-            
-            for line in error_file_lines:
-                if 'is missing a history file' in line:
-                    tag_array.append(substring_after(line, ']: ').split('-ismissing')[0])
-                
-            if tag_array:
-                tag_array = remove_duplicates(tag_array)
-                
-                for tag in tag_array:
-                    with open(history_folder_location+'/countries/'+tag+' - Invalid Nation.txt', 'w') as history_file:
-                        history_file.write('capital = 1')
-    
-    elif mode_val == '11':
+    while not (character_mass_ind =='1' or character_mass_ind == '2'):
+        character_mass_ind = input("Create a single character (1) or import character_creator.txt (2)? ")
     
-        common_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the common folder from your mod")
-        log_folder_location = folder_up(common_folder_location, 4, 'logs')
-        trigger_array = []
+    if character_mass_ind == '1':
+        #choose a tag, keeps going until you input a three character tag where the first is a letter
+        while not len(tag_input)==3 or not tag_input[0:1].isalpha():
+            tag_input = str(input("Choose a tag to recruit the character: ")).upper()
     
-        with open(log_folder_location+'/error.log', 'r') as error_file:
-            error_file_lines = error_file.readlines()
-            
-            with open(common_folder_location+'/scripted_triggers/error_triggers.txt', 'a') as trigger_file:
-                for line in error_file_lines:
-                    if 'Unknown trigger-type' in line:
-                        trigger_array.append(substring_after(line, 'Error: "Unknown trigger-type: ').split(',nearline')[0])
-                    if "Invalid trigger '" in line:
-                        trigger_array.append(substring_after(line, "Invalid trigger '").split("'in")[0])
-                
-                if trigger_array:
-                    trigger_array = remove_duplicates(trigger_array)
-                
-                for trigger in trigger_array:
-                    trigger_file.write(trigger +' = {\n\talways = no\n}\n')
-        
-        print('Check common/scripted_triggers/error_triggers.txt for any valid errors it found, i.e. "limit" or "="')
+        #choose a character name, keeps going until you actually enter something
+        while not len(character_input)>0:
+            character_input = str(input("Enter the name of your character: "))
     
-    elif mode_val == '12':
+        #choose an ideology
+        while not len(ideology_input)>0:
+            ideology_input = str(input("Enter your ideology or sub-ideology (anything not recognised as an ideology will be assumed to be a sub-ideology): ")).lower()
     
-        flag_input = filedialog.askopenfilename(initialdir = "/",title = "Select a large flag to use from the gfx/flags folder")
-        flag_name = (os.path.basename(flag_input))
-        flag_folder_location = os.path.dirname(flag_input)
-        medium_flag_location = flag_folder_location + '/medium/' + flag_name
-        small_flag_location = flag_folder_location + '/small/' + flag_name
-        
-        log_folder_location = folder_up(flag_folder_location, 5, 'logs')
-        flags_array = []
+        find_mod_folder()
+        create_character(tag_input, character_input, ideology_input)
     
-        with open(log_folder_location+'/error.log', 'r') as error_file:
-            error_file_lines = error_file.readlines()
-            
-            for line in error_file_lines:
-                if 'File not found' in line and 'Error loading flag for country' in line:
-                    flags_array.append(substring_after(line, 'Error loading flag for country ').split(':Ideology')[0])
-                
-            if flags_array:
-                flags_array = remove_duplicates(flags_array)
-                
-            for country in flags_array:
-                shutil.copyfile(flag_input, flag_folder_location + '/' + country + '.tga')
-                shutil.copyfile(medium_flag_location, flag_folder_location + '/medium/' + country + '.tga')
-                shutil.copyfile(small_flag_location, flag_folder_location + '/small/' + country + '.tga')
-    
-    elif mode_val == '13':
-    
-        base_input = filedialog.askopenfilename(initialdir = '/',title = 'Select your base MIO file from your mod',filetypes = (("Text files","*.txt*"),('All files', '*.*')))
-        mio_folder_location = os.path.dirname(base_input)
-        loc_folder_location = folder_up(mio_folder_location, 4, 'localisation/english')
-        
-        file_input = filedialog.askopenfilename(initialdir = '/',title = 'Select your MIO naming file',filetypes = (("Text files","*.txt*"),('All files', '*.*')))
-        mios = read_without_comments(file_input, 3)
-        
-        with open(base_input, 'r') as base_file:
-            base_input_data = base_file.read()
-        with open(base_input, 'r') as base_file:
-            base_input_lines = base_file.readlines()
-        
-        with open(loc_folder_location+'/'+'auto_mio_names_l_english.yml', 'w', encoding='utf-8-sig') as loc_file:
-            print('Created localisation file')
-        
-        with open(loc_folder_location+'/'+'auto_mio_names_l_english.yml', 'r+', encoding='utf-8-sig') as loc_file:
-            first_char = loc_file.read(1)
-            if not first_char:
-                loc_file.write('l_english:\n')
-        
-        with open(mio_folder_location+'/'+'00_auto_mios.txt', 'w'):
-            print('Created mio file')
-        
-        for mio in mios:
-            i = -1
-            mio_info = mio.split(';')
-            
-            if mio_info[1] in base_input_data:
-                
-                mio_condition = mio_info[0]
-                
-                if len(mio_condition)==3 and mio_condition[0:1].isalpha():
-                    mio_trigger = 'tag = ' + mio_condition
-                
-                    for number, line in enumerate(base_input_lines):
-                        if mio_info[1] in line:
-                            
-                            for icon_line in base_input_lines[number:]:
-                                if 'icon' in icon_line:
-                                    mio_icon = icon_line.split('= ')[1].replace('\n','')
-                                    break
-                            
-                            for allowed_line in base_input_lines[number:]:
-                                i = i + 1
-                                if 'allowed' in allowed_line:
-                                    line_num = number + i
-                                    base_allowed_trigger = allowed_line.replace('allowed = {', 'allowed = { \n\t\tNOT = { ' + mio_trigger + '}')
-                                    base_input_lines[line_num] = base_allowed_trigger
-                                    break
-                            
-                            break
-                    
-                    mio_info[2] = mio_info[2].replace("'", "").replace('"', '').replace('\n','')
-                    mio_loc_key = mio_condition + '_mio_' + mio_info[2].lower().replace(' ', '_')
-                    mio_loc = mio_loc_key + ': "' + mio_info[2] + '"'
-                    
-                    with open(loc_folder_location+'/'+'auto_mio_names_l_english.yml', 'a', encoding='utf-8-sig') as loc_file:
-                        loc_file.write(' ' + mio_loc + '\n')
-                    
-                    with open('base_mio.txt', "r") as base_mio_file:
-                        base_file_data = base_mio_file.read()
-                        base_file_data = base_file_data.replace('MIO_NAME', mio_loc_key)
-                        base_file_data = base_file_data.replace('BASE_MIO', mio_info[1])
-                        base_file_data = base_file_data.replace('MIO_ICON', mio_icon)
-                        base_file_data = base_file_data.replace('MIO_TRIGGER', mio_trigger)
-                    
-                    with open(mio_folder_location+'/'+'00_auto_mios.txt', 'a') as mio_file:
-                        mio_file.write('\n'+base_file_data+'\n')
-                    
-                    with open(base_input, 'w') as base_mio_file:
-                        base_mio_file.writelines(base_input_lines)
-                    
-                else:
-                    print('MIO condition ' + mio_condition + ' for ' + mio_info[2] + ' is invalid.')
-                
-            else:
-                print('Failed to add ' + mio_info[2].replace('\n','') + ' due to missing base mio: ' + mio_info[1])
-                
-    elif mode_val == '14':
-        
-        states_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the history folder from your mod")
-        victory_points = []
-        indicator = 0
-        owner_indicator = 0
-        
-        for files in os.listdir(states_folder_location+'/states'):
-            with open(states_folder_location+'/states/'+files, "r") as state_file:
-                lines = state_file.readlines()
-                for line in lines:
-                    if owner_indicator == 0 and 'owner' in line:
-                        owner_tag = line.split('=')[1].replace('\t', '').replace(' ','').replace('\n','')
-                        owner_indicator = 1
-                for line in lines:
-                    if indicator == 1 and owner_indicator == 0:
-                        victory_points.append((line.split(' ')[0].replace('\t', ''))+';'+str(files.split('-')[0])+';UNOWNED')
-                        indicator = 0
-                    elif indicator == 1:
-                        victory_points.append((line.split(' ')[0].replace('\t', ''))+';'+str(files.split('-')[0])+';'+owner_tag)
-                        indicator = 0
-                    elif 'victory_points = {' in line:
-                        indicator = 1
-                owner_indicator = 0
-        
-        sort_nicely(victory_points)
-        localisation_folder_location = os.path.dirname(states_folder_location)+'/localisation/english' 
-        
-        with open(localisation_folder_location+'/'+'victory_points_l_english.yml', 'r') as orig_file:
-            orig_file_data = orig_file.read()
-            for victory_point in victory_points:
-                if 'VICTORY_POINTS_'+victory_point.split(';')[0] in orig_file_data:
-                    victory_points.remove(victory_point)
-        
-        with open(localisation_folder_location+'/'+'auto_victory_points_l_english.yml', 'a', encoding='utf-8-sig') as loc_file:
-            loc_file.write('l_english:\n')
-            for victory_point in victory_points:
-                loc_file.write(' #VICTORY_POINTS_'+victory_point.split(';')[0]+': "" #STATE_'+victory_point.split(';')[1]+' - owned by '+victory_point.split(';')[2]+'\n')
-                
-            
-        
+    if character_mass_ind == '2':
+        file_input = filedialog.askopenfilename(initialdir = '/',title = 'Select your character creator file',filetypes = (("Text files","*.txt*"),('All files', '*.*')))
+        find_mod_folder()
+        #grouped by tag, so each tag's files are only written once however many characters it gets
+        import_characters(str(mod_folder_location), read_character_file(file_input), ideologies, ideologies_full, ideologies_sub)
+
+@mode('5', 'Victory Points -> Supply Nodes')
+def supply_nodes():
+    from tkinter import filedialog
+    states_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the history folder from your mod")
+    victory_points = []
+    indicator = 0
+    
+    for files in os.listdir(states_folder_location+'/states'):
+        with open(states_folder_location+'/states/'+files, "r") as state_file:
+            lines = state_file.readlines()
+            for line in lines:
+                if indicator == 1:
+                    victory_points.append((line.split(' ')[0].replace('\t', '')))
+                    indicator = 0
+                if 'victory_points = {' in line:
+                    indicator = 1
+    
+    sort_nicely(victory_points)
+    map_folder_location = os.path.dirname(states_folder_location)+'/map' 
+    
+    with open(map_folder_location+'/supply_nodes_temp.txt', 'a') as supply_node_file:
+        for victory_point in victory_points:
+            supply_node_file.write('1 '+victory_point+'\n')
+
+@mode('6', 'Overlapping Temperature Fix')
+def overlapping_temperature_fix():
+    from tkinter import filedialog
+    map_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the map/strategic regions folder from your mod")
+    
+    for files in os.listdir(map_folder_location):
+        #drops the block around the last line holding each overlapping temperature, files without one are left untouched
+        found_lines = line_numbers(map_folder_location+'/'+files, '0.0 0.0', '4.11 21.11')
+        drop_array = []
+        for nums in found_lines.values():
+            if nums:
+                drop_array.extend(range(nums[-1] - 1, nums[-1] + 12))
+        drop_lines(map_folder_location+'/'+files, drop_array)
+
+@mode('7', 'Adjacency CSV to TXT')
+def adjacency_csv():
+    from tkinter import filedialog
+    from templates import load_template, open_output, ADJACENCY_PLACEHOLDERS
+    map_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the map folder from your mod")
+    with open(map_folder_location+'/adjacencies.csv', 'r') as csv_file:
+        csv_file_lines = csv_file.readlines()
+    
+    adjacency_rules = []
+    for line in csv_file_lines[1:]:
+        csv_info = line.split(';')
+        if not csv_info[0] == '-1':
+            print('Added ' + csv_info[8])
+            adjacency_rules.append({'NAME_REPLACE': csv_info[8], 'ID1': csv_info[0], 'ID2': csv_info[1], 'ID3': csv_info[3]})
+    
+    #the template is read once and every rule goes out through one buffered append
+    if adjacency_rules:
+        adjacency_template = load_template('base_adjacency.txt', ADJACENCY_PLACEHOLDERS)
+        with open_output(map_folder_location+'/adjacency_rules.txt', 'a') as txt_file:
+            txt_file.writelines(adjacency_template.render_all(adjacency_rules, '\n'))
+
+@mode('8', 'Missing Focus Errors')
+def missing_focus_errors():
+    from tkinter import filedialog
+    from symbol_table import FOCUS
+    from templates import load_template, open_output, FOCUS_PLACEHOLDERS
+    common_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the common folder from your mod")
+    log_folder_location = folder_up(common_folder_location, 4, 'logs')
+    focus_array = []
+    
+    if input("Scan the mod for missing focuses instead of reading error.log (y/n)? ").lower() == 'y':
+        focus_array = find_missing_symbols(common_folder_location, FOCUS)
+    else:
+        for line in matching_lines(log_folder_location+'/error.log', 'has_completed_focus = '):
+            focus_array.append(substring_after(line, 'has_completed_focus = ').split('(')[0])
+    
+    if focus_array:
+        focus_array = remove_duplicates(focus_array)
+    
+        focus_template = load_template('base_focus.txt', FOCUS_PLACEHOLDERS)
+    
+        with open_output(common_folder_location+'/national_focus/error_focus.txt') as focus_file:
+            focus_file.write(load_template('base_tree.txt').render({}))
+            focus_file.writelines(focus_template.render_all(({'FOCUS_ID': focus} for focus in focus_array), '\n'))
+            focus_file.write('\n}')
+
+@mode('9', 'Missing Idea Errors')
+def missing_idea_errors():
+    from tkinter import filedialog
+    from symbol_table import IDEA
+    from templates import load_template, open_output, IDEA_PLACEHOLDERS
+    common_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the common folder from your mod")
+    log_folder_location = folder_up(common_folder_location, 4, 'logs')
+    idea_array = []    
+    
+    if input("Scan the mod for missing ideas instead of reading error.log (y/n)? ").lower() == 'y':
+        idea_array = find_missing_symbols(common_folder_location, IDEA)
+    else:
+        for line in matching_lines(log_folder_location+'/error.log', 'has_idea: ', 'Invalid idea'):
+            if 'has_idea: ' in line:
+                idea_array.append(substring_after(line, 'has_idea: ').split('isnotAvalidIdea')[0])
+            if 'Invalid idea' in line:
+                print(substring_after(line, 'Invalid idea: '))
+                idea_array.append(substring_after(line, 'Invalid idea: ').split('.Ifyouwantedtoreference')[0].split(':ideas')[0])
+    
+    if idea_array:
+        idea_array = remove_duplicates(idea_array)
+    
+        idea_template = load_template('base_idea.txt', IDEA_PLACEHOLDERS)
+    
+        with open_output(common_folder_location+'/ideas/error_ideas.txt') as idea_file:
+            idea_file.write('ideas = { \n\tcountry = {\n')
+            idea_file.writelines(idea_template.render_all(({'IDEA_ID': idea} for idea in idea_array), '\n'))
+            idea_file.write('\n\t}\n}')
+
+@mode('10', 'Missing History Errors')
+def missing_history_errors():
+    from tkinter import filedialog
+    history_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the history folder from your mod")
+    log_folder_location = folder_up(history_folder_location, 4, 'logs')
+    tag_array = []
+    
+    for line in matching_lines(log_folder_location+'/error.log', 'is missing a history file'):
+        tag_array.append(substring_after(line, ']: ').split('-ismissing')[0])
+    
+    if tag_array:
+        tag_array = remove_duplicates(tag_array)
+    
+        for tag in tag_array:
+            with open(history_folder_location+'/countries/'+tag+' - Invalid Nation.txt', 'w') as history_file:
+                history_file.write('capital = 1')
+
+@mode('11', 'Missing Trigger Ideas')
+def missing_trigger_ideas():
+    from tkinter import filedialog
+    from symbol_table import TRIGGER
+    common_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the common folder from your mod")
+    log_folder_location = folder_up(common_folder_location, 4, 'logs')
+    trigger_array = []
+    
+    if input("Scan the mod for missing scripted triggers instead of reading error.log (y/n)? ").lower() == 'y':
+        trigger_array = find_missing_symbols(common_folder_location, TRIGGER)
+    else:
+        for line in matching_lines(log_folder_location+'/error.log', 'Unknown trigger-type', "Invalid trigger '"):
+            if 'Unknown trigger-type' in line:
+                trigger_array.append(substring_after(line, 'Error: "Unknown trigger-type: ').split(',nearline')[0])
+            if "Invalid trigger '" in line:
+                trigger_array.append(substring_after(line, "Invalid trigger '").split("'in")[0])
+    
+    if trigger_array:
+        trigger_array = remove_duplicates(trigger_array)
+    
+    with open(common_folder_location+'/scripted_triggers/error_triggers.txt', 'a') as trigger_file:
+        for trigger in trigger_array:
+            trigger_file.write(trigger +' = {\n\talways = no\n}\n')
+    
+    print('Check common/scripted_triggers/error_triggers.txt for any valid errors it found, i.e. "limit" or "="')
+
+@mode('12', 'Missing Flags')
+def missing_flags():
+    from tkinter import filedialog
+    from flag_links import fill_missing_flags
+    flag_input = filedialog.askopenfilename(initialdir = "/",title = "Select a large flag to use from the gfx/flags folder")
+    flag_folder_location = os.path.dirname(flag_input)
+    #hardlinked flags share their data, editing one in place changes it for every country linked to it
+    link_flags = input("Link the flags instead of copying them (y/n)? ").lower() == 'y'
+    
+    log_folder_location = folder_up(flag_folder_location, 5, 'logs')
+    flags_array = []
+    
+    for line in matching_lines(log_folder_location+'/error.log', 'Error loading flag for country'):
+        if 'File not found' in line:
+            flags_array.append(substring_after(line, 'Error loading flag for country ').split(':Ideology')[0])
+    
+    if flags_array:
+        flags_array = remove_duplicates(flags_array)
+    
+    fill_missing_flags(flag_input, flags_array, link_flags)
+
+@mode('13', 'MIO Custom Names')
+def mio_custom_names():
+    from tkinter import filedialog
+    from mio_rename import read_naming_file, rename_mios
+    base_input = filedialog.askopenfilename(initialdir = '/',title = 'Select your base MIO file from your mod',filetypes = (("Text files","*.txt*"),('All files', '*.*')))
+    mio_folder_location = os.path.dirname(base_input)
+    loc_folder_location = folder_up(mio_folder_location, 4, 'localisation/english')
+    
+    file_input = filedialog.askopenfilename(initialdir = '/',title = 'Select your MIO naming file',filetypes = (("Text files","*.txt*"),('All files', '*.*')))
+    #the base file is indexed and every edit made in memory, then each file is written once
+    rename_mios(base_input, read_naming_file(file_input), mio_folder_location+'/'+'00_auto_mios.txt', loc_folder_location+'/'+'auto_mio_names_l_english.yml')
+
+@mode('14', 'Victory Point Localisation')
+def victory_point_localisation():
+    from tkinter import filedialog
+    from vp_localisation import add_vp_localisation
+    states_folder_location = filedialog.askdirectory(initialdir = "/",title = "Select the history folder from your mod")
+    #only victory points without a key anywhere in the english localisation are added
+    add_vp_localisation(os.path.dirname(states_folder_location))
+
     #close = input("\nDone? ")
     
     #elif mode_val == '0':
@@ -926,23 +754,58 @@ def major_function(mode_val):
 # main_window.mainloop()
 # =============================================================================
 
-mode_val = '99'
-available_modes = ['0','1','2','3','4','5','6','7','8','9','10','11','12','13','14']
-
-#option to create folders, keeps going until you actually answer y or n
-while not mode_val in available_modes:
-    mode_val = str(input("1 - Full Country Creation\n2 - Flag Resizing\n3 - Focus Tree Supplementor\n4 - Character Creator\n5 - Victory Points -> Supply Nodes\n6 - Overlapping Temperature Fix\n7 - Adjacency CSV to TXT\n8 - Missing Focus Errors\n9 - Missing Idea Errors\n10 - Missing History Errors\n11 - Missing Trigger Ideas\n12 - Missing Flags\n13 - MIO Custom Names\n14 - Victory Point Localisation\n0 - Exit \nWhich mode would you like? "))
-    major_function(mode_val)
-
-
-
-
-
-
-
-
+def batch_focus(args):
+    #copies of the given focus trees for many tags at once, e.g. countrycreation.py focus --tree generic.txt --tags ABC DEF
+    import tkinter as tk
+    from tkinter import filedialog
+    from focus_import import clone_trees
+    mod_folder = args.mod
+    if not mod_folder:
+        tk.Tk().withdraw()
+        mod_folder = filedialog.askdirectory(initialdir = "/",title = "Select your mod's folder")
+    clone_trees(mod_folder, args.tree, [tag.upper() for tag in args.tags])
 
+def batch_create(args):
+    #headless mode 1 for every row of a manifest, e.g. countrycreation.py create --manifest countries.csv
+    import tkinter as tk
+    from tkinter import filedialog
+    from country_batch import load_countries, create_countries
+    from tag_index import build_tag_index
+    mod_folder = args.mod
+    if not mod_folder:
+        tk.Tk().withdraw()
+        mod_folder = filedialog.askdirectory(initialdir = "/",title = "Select your mod's folder")
+    countries = load_countries(args.manifest, ideologies, ideologies_full, build_tag_index(mod_folder, args.base))
+    if not countries:
+        print('No valid countries in '+args.manifest)
+        return
+    create_countries(mod_folder, countries, ideologies_full, ideologies_sub, args.base)
 
+def main():
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest='command')
+    create_parser = commands.add_parser('create', help='create every country listed in a manifest without prompts')
+    create_parser.add_argument('--manifest', required=True, help='CSV or JSON with tag,name,ideology,leader,flag,states,rgb')
+    create_parser.add_argument('--mod', help="mod folder, asked for if not given")
+    create_parser.add_argument('--base', help='base game folder, for states and colors.txt the mod does not have yet')
+    focus_parser = commands.add_parser('focus', help='clone focus trees for many tags, ids prefixed with each tag')
+    focus_parser.add_argument('--tree', required=True, action='append', help='national_focus file to copy, can be given more than once')
+    focus_parser.add_argument('--tags', required=True, nargs='+', help='tags to make copies for')
+    focus_parser.add_argument('--mod', help="mod folder, asked for if not given")
+    args = parser.parse_args()
 
+    if args.command == 'create':
+        batch_create(args)
+    elif args.command == 'focus':
+        batch_focus(args)
+    else:
+        mode_val = '99'
+        available_modes = ['0'] + list(MODES)
 
+        #option to create folders, keeps going until you actually answer y or n
+        while not mode_val in available_modes:
+            mode_val = str(input(''.join(key+' - '+name+'\n' for key, (name, handler) in MODES.items())+'0 - Exit \nWhich mode would you like? '))
+            major_function(mode_val)
 
+if __name__ == '__main__':
+    main()
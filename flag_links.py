@@ -0,0 +1,113 @@
+import os
+import shutil
+import filecmp
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Fills in missing flags with one flag (pwm mode 12). Instead of three full
+# copies per country the targets can be links to the chosen flag: a reflink
+# (copy-on-write clone, so editing one later doesn't touch the others) where
+# the filesystem supports it, otherwise a hardlink, and a plain copy only when
+# neither works, e.g. across drives. Targets that already hold the same bytes
+# are left alone. Every file is independent so they run on a thread pool.
+# Hardlinked flags share one file, so anything that rewrites a flag must
+# replace it rather than write into it (flag_pipeline.save_flag does).
+
+FLAG_FOLDERS = ('', 'medium', 'small')
+
+# linux ioctl that clones a file's extents (btrfs, xfs, ...)
+FICLONE = 0x40049409
+
+REFLINKED = "reflinked"
+LINKED = "hardlinked"
+COPIED = "copied"
+IDENTICAL = "already identical"
+
+MAX_WORKERS = 16
+
+
+def reflink(source, target):
+    """Copy-on-write clone of source at target, OSError where unsupported."""
+    if fcntl is None:
+        raise OSError("reflinks not supported here")
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            os.remove(target)
+            raise
+
+
+def same_content(source, target):
+    if not os.path.exists(target):
+        return False
+    if os.path.samefile(source, target):
+        return True
+    return filecmp.cmp(source, target, shallow=False)
+
+
+def place_flag(source, target, link=True, reflinks=True):
+    """Put source's content at target, returns how it was done."""
+    if same_content(source, target):
+        return IDENTICAL
+    if os.path.lexists(target):
+        os.remove(target)
+    if link and reflinks:
+        try:
+            reflink(source, target)
+            return REFLINKED
+        except OSError:
+            pass
+    if link:
+        try:
+            os.link(source, target)
+            return LINKED
+        except OSError:
+            pass
+    shutil.copyfile(source, target)
+    return COPIED
+
+
+def fill_missing_flags(flag_input, countries, link=True, workers=None):
+    """
+    Give every country in countries the large, medium and small version of
+    flag_input (a flag in gfx/flags). Returns { target path: result }.
+    """
+    if not countries:
+        print('No missing flags found')
+        return {}
+    start = time.perf_counter()
+    flag_name = os.path.basename(flag_input)
+    flag_folder = os.path.dirname(flag_input)
+    jobs = []
+    for folder in FLAG_FOLDERS:
+        source = os.path.join(flag_folder, folder, flag_name)
+        for country in countries:
+            jobs.append((source, os.path.join(flag_folder, folder, country + '.tga')))
+
+    # the first new file shows whether this filesystem can reflink, so the rest don't each try
+    results = {}
+    reflinks = link
+    while jobs and reflinks:
+        source, target = jobs.pop(0)
+        results[target] = place_flag(source, target, link)
+        if results[target] != IDENTICAL:
+            reflinks = results[target] == REFLINKED
+    if jobs:
+        workers = workers or min(MAX_WORKERS, len(jobs))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results.update(zip((target for _, target in jobs),
+                               pool.map(lambda job: place_flag(job[0], job[1], link, reflinks), jobs)))
+
+    counts = {}
+    for result in results.values():
+        counts[result] = counts.get(result, 0) + 1
+    summary = ", ".join(f"{n} {result}" for result, n in counts.items())
+    print(f"{len(countries)} flag(s) filled in {time.perf_counter() - start:.2f}s: {summary}")
+    return results
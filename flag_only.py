@@ -2,7 +2,7 @@ import pathlib
 import os
 import tkinter as tk
 from tkinter import filedialog
-from PIL import Image
+from flag_pipeline import convert_flag, convert_flags
 import shutil
             
 def folder_up(folder, num=1, new_path=''):
@@ -36,34 +36,42 @@ def major_function(mode_val):
     flag_directory = '/'
     
     if 1==1:
+        flag_scope_ind = ''
+        
+        #choose one flag at a time or a whole folder, keeps going until you enter 1 or 2
+        while not (flag_scope_ind == '1' or flag_scope_ind == '2'):
+            flag_scope_ind = input("Convert one flag at a time (1) or every flag in a folder (2)? ")
+        
+        if flag_scope_ind == '2':
+            #spread over every core, flags that haven't changed since the last run are skipped
+            source_folder = filedialog.askdirectory(initialdir = "/",title = "Select the folder with your flags")
+            if source_folder:
+                convert_flags(source_folder, str(base_path)+'/gfx/flags')
+            return
+        
         additional_flag_ind = 'y'
         os.makedirs("gfx/flags/medium",exist_ok=True)
         os.makedirs("gfx/flags/small",exist_ok=True)
         while additional_flag_ind == 'y':
             try:
                 flag_input = filedialog.askopenfilename(initialdir = flag_directory,title = "Select a Flag",filetypes = (("PNG files","*.png*"),("JPG files","*.jpg*"),("TGA files","*.tga*")))
-                flag_orig = Image.open(flag_input)
-                flag_name = (os.path.basename(flag_input))[:-4]
-                
-                flag_large = flag_orig.resize((82, 52))
-                flag_large.save(str(base_path)+'/gfx/flags/'+flag_name+'.tga')
-                flag_medium = flag_orig.resize((41, 26))
-                flag_medium.save(str(base_path)+'/gfx/flags/medium/'+flag_name+'.tga')
-                flag_small = flag_orig.resize((10, 7))
-                flag_small.save(str(base_path)+'/gfx/flags/small/'+flag_name+'.tga')
+                #decoded once, all three sizes resampled from it and named after the tag and ideology in the file name
+                convert_flag(flag_input, str(base_path)+'/gfx/flags')
                 
                 flag_directory = os.path.dirname(flag_input)
             except ValueError:
                 print("Ended early")
             additional_flag_ind = input("Convert another flag (y/N)? ").lower()
 
-mode_val = '99'
-available_modes = ['0','2']
+#guarded so the worker processes converting a folder don't start the menu again when they import this file
+if __name__ == '__main__':
+    mode_val = '99'
+    available_modes = ['0','2']
 
-#option to create folders, keeps going until you actually answer y or n
-while not mode_val in available_modes:
-    mode_val = str(input("2 - Flag Resizing\n0 - Exit \nWhich mode would you like? "))
-    major_function(mode_val)
+    #option to create folders, keeps going until you actually answer y or n
+    while not mode_val in available_modes:
+        mode_val = str(input("2 - Flag Resizing\n0 - Exit \nWhich mode would you like? "))
+        major_function(mode_val)
 
 
 
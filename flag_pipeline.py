@@ -0,0 +1,127 @@
+import os
+import re
+import time
+from functools import partial
+from PIL import Image
+from parallel_walk import walk_files, parallel_map
+from manifest import Manifest
+
+# Flag conversion for whole folders. Each source image is decoded once and
+# the large, medium and small TGAs are all resampled from it with Lanczos.
+# Files are spread over a process pool, named after the tag (and ideology)
+# found in their file name, and sources whose content hash matches the last
+# run are skipped.
+
+FLAG_SIZES = (("", (82, 52)), ("medium", (41, 26)), ("small", (10, 7)))
+SOURCE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tga", ".bmp")
+
+IDEOLOGIES = ['d', 'c', 'f', 'n']
+IDEOLOGIES_FULL = ['democratic', 'communism', 'fascism', 'neutrality']
+
+# e.g. "ABC", "abc_communism", "ABC - fascism", "ABC c"
+FLAG_NAME_PATTERN = re.compile(r"^([A-Za-z][A-Za-z0-9]{2})(?:[ _\-]+([A-Za-z_]+))?$")
+
+# bump when the conversion changes, every flag is then converted again
+TOOL_VERSION = 1
+
+
+def flag_name(file_path, ideologies=IDEOLOGIES, ideologies_full=IDEOLOGIES_FULL):
+    """
+    Name the game looks for: TAG or TAG_ideology when the file name is a tag
+    and optionally an ideology (full or short), otherwise the file name as it is.
+    """
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    m = FLAG_NAME_PATTERN.match(stem.strip())
+    if m is None:
+        return stem
+    tag, ideology = m.group(1).upper(), (m.group(2) or "").lower().strip("_")
+    if not ideology:
+        return tag
+    if ideology in ideologies_full:
+        return tag + "_" + ideology
+    if ideology in ideologies:
+        return tag + "_" + ideologies_full[ideologies.index(ideology)]
+    return stem
+
+
+def flag_targets(flags_folder, name):
+    return [os.path.join(flags_folder, sub_folder, name + ".tga") for sub_folder, _ in FLAG_SIZES]
+
+
+def save_flag(image, target):
+    """
+    Save through a temporary file and os.replace. A target that is a hardlink
+    (flag_links, mode 12) gets a file of its own instead of the new image
+    being written into every flag linked to it.
+    """
+    temp = f"{target}.{os.getpid()}.tmp"
+    try:
+        image.save(temp, format="TGA")
+        os.replace(temp, target)
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+
+
+def convert_flag(flag_path, flags_folder, name=None, ideologies=IDEOLOGIES, ideologies_full=IDEOLOGIES_FULL):
+    """Decode flag_path once and save its three sizes under flags_folder. Returns the name used."""
+    name = name or flag_name(flag_path, ideologies, ideologies_full)
+    flag_orig = Image.open(flag_path)
+    flag_orig.load()
+    if flag_orig.mode not in ("RGB", "RGBA"):
+        # palette and greyscale images would otherwise be resized without filtering
+        flag_orig = flag_orig.convert("RGBA" if "transparency" in flag_orig.info or "A" in flag_orig.getbands() else "RGB")
+    for (sub_folder, size), target in zip(FLAG_SIZES, flag_targets(flags_folder, name)):
+        save_flag(flag_orig.resize(size, Image.LANCZOS), target)
+    return name
+
+
+def convert_worker(flag_path, flags_folder, ideologies, ideologies_full):
+    """(name, error or None) for one flag, run in a worker process."""
+    try:
+        return convert_flag(flag_path, flags_folder, None, ideologies, ideologies_full), None
+    except (OSError, ValueError) as e:
+        return flag_name(flag_path, ideologies, ideologies_full), str(e)
+
+
+def convert_flags(source_folder, flags_folder, ideologies=IDEOLOGIES, ideologies_full=IDEOLOGIES_FULL, workers=None):
+    """
+    Convert every image under source_folder into flags_folder (gfx/flags).
+    Returns { source path: name } for the flags converted this run.
+    """
+    start = time.perf_counter()
+    for sub_folder, _ in FLAG_SIZES:
+        os.makedirs(os.path.join(flags_folder, sub_folder), exist_ok=True)
+    flags_abs = os.path.abspath(flags_folder)
+    sources = [p for p in walk_files(source_folder, SOURCE_EXTENSIONS)
+               if not os.path.abspath(p).startswith(flags_abs + os.sep)]
+
+    manifest = Manifest("flag_pipeline", flags_folder, (FLAG_SIZES, ideologies, ideologies_full), TOOL_VERSION)
+    pending = []
+    names = {}
+    skipped = 0
+    for flag_path in sources:
+        name = flag_name(flag_path, ideologies, ideologies_full)
+        if name in names:
+            print(f"Skipped {os.path.basename(flag_path)}, {os.path.basename(names[name])} is already the {name} flag")
+            continue
+        names[name] = flag_path
+        if not manifest.changed(flag_path) and all(os.path.exists(t) for t in flag_targets(flags_folder, name)):
+            skipped += 1
+            continue
+        pending.append(flag_path)
+
+    results = parallel_map(partial(convert_worker, flags_folder=flags_folder, ideologies=ideologies,
+                                   ideologies_full=ideologies_full), pending, "flag_pipeline", workers)
+    converted = {}
+    for flag_path, (name, error) in results.items():
+        if error is None:
+            manifest.record(flag_path)
+            converted[flag_path] = name
+        else:
+            manifest.forget(flag_path)
+            print(f"Could not convert {os.path.basename(flag_path)}: {error}")
+    manifest.save()
+
+    print(f"{len(converted)} flag(s) converted, {skipped} unchanged in {time.perf_counter() - start:.2f}s")
+    return converted
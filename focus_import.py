@@ -0,0 +1,150 @@
+import os
+import time
+from clausewitz_tokenizer import tokenize, brace_map, KEY, OP, VALUE, OPEN, CLOSE
+from symbol_table import FOCUS_REF_KEYS, FOCUS_LIST_KEYS
+
+# Copies a national_focus tree for a new tag. Every focus id gets the tag as
+# a prefix and so does every reference to one (prerequisite,
+# mutually_exclusive, relative_position_id, has_completed_focus, ...), found
+# from the token stream rather than by matching text, so any tree file works.
+# A tree is tokenized once and the result reused for every tag it's cloned for;
+# each clone is one linear pass splicing the token spans that change.
+
+FOCUS_BLOCK_KEYS = ("focus", "shared_focus")
+
+TREE_WEIGHT = 'country = {\n\t\tfactor = 0\n\t\tmodifier = {\n\t\t\tadd = 10\n\t\t\ttag = TAG\n\t\t}\n\t}'
+
+
+class FocusTree:
+    """A tokenized focus tree file and the focus ids it defines."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "r", encoding="utf-8-sig", errors="ignore") as f:
+            self.text = f.read()
+        self.tokens = list(tokenize(self.text))
+        self.block_ends = brace_map(self.text, self.tokens)
+        self.assignments = list(self._assignments())
+        self.ids = []
+        for parents, key_tok, tok in self.assignments:
+            if key_tok.value == "id" and tok.kind == VALUE and parents and parents[-1] in FOCUS_BLOCK_KEYS:
+                self.ids.append(tok.value)
+        self.id_set = set(self.ids)
+
+    def _assignments(self):
+        """(enclosing keys, key token, value token) for every key = value, blocks included."""
+        parents = []
+        key = None
+        for tok in self.tokens:
+            if tok.kind == KEY:
+                key = tok
+            elif tok.kind == OP:
+                continue
+            elif tok.kind == OPEN:
+                if key is not None:
+                    yield tuple(parents), key, tok
+                parents.append(key.value if key is not None else "")
+                key = None
+            elif tok.kind == CLOSE:
+                if parents:
+                    parents.pop()
+                key = None
+            else:
+                if key is not None:
+                    yield tuple(parents), key, tok
+                key = None
+
+    def clone(self, tag, tree_id=None):
+        """
+        (text, new focus ids) of this tree for tag. Focus ids and references
+        to them get 'TAG_' in front, the tree's id becomes tree_id (TAG_ plus
+        the old one by default), its country weighting picks only tag and it
+        is no longer a default tree.
+        """
+        prefix = tag + "_"
+        edits = []
+        for parents, key_tok, tok in self.assignments:
+            key = key_tok.value
+            parent = parents[-1] if parents else ""
+            if tok.kind == OPEN:
+                if key == "country" and parent == "focus_tree" and len(parents) == 1:
+                    edits.append((key_tok.start, self.block_ends[tok.start], TREE_WEIGHT.replace("TAG", tag)))
+                continue
+            value = tok.value
+            if parent == "focus_tree" and len(parents) == 1:
+                if key == "id":
+                    edits.append((tok.start, tok.end, tree_id or prefix + value))
+                elif key == "default" and value == "yes":
+                    edits.append((tok.start, tok.end, "no"))
+                continue
+            if value not in self.id_set:
+                continue
+            if ((key == "id" and parent in FOCUS_BLOCK_KEYS) or key in FOCUS_REF_KEYS
+                    or (key == "focus" and parent in FOCUS_LIST_KEYS)):
+                edits.append((tok.start, tok.end, prefix + value))
+        return self._splice(edits), [prefix + focus_id for focus_id in self.ids]
+
+    def _splice(self, edits):
+        pieces = []
+        pos = 0
+        for start, end, new_text in sorted(edits):
+            if start < pos:
+                continue  # inside a block that was replaced as a whole
+            pieces.append(self.text[pos:start])
+            pieces.append(new_text)
+            pos = end
+        pieces.append(self.text[pos:])
+        return "".join(pieces)
+
+
+def focus_name(focus_id, tag):
+    """Readable name from an id, e.g. ABC_army_effort -> Army Effort."""
+    if focus_id.startswith(tag + "_"):
+        focus_id = focus_id[len(tag) + 1:]
+    return focus_id.replace("_", " ").title()
+
+
+def focus_localisation(tag, focus_ids):
+    """Localisation lines for focus_ids, name and placeholder description each."""
+    loc = "\n\n #FOCUS LOCALISATIONS"
+    for focus_id in focus_ids:
+        name = focus_name(focus_id, tag)
+        loc += '\n '+focus_id+': "'+name+'"'
+        loc += '\n '+focus_id+'_desc: "'+name+' Description"'
+    return loc
+
+
+def clone_trees(mod_folder, tree_paths, tags):
+    """
+    Give every tag its own copy of every tree in tree_paths, written to
+    common/national_focus/TAG_<tree file>. Each tree is read once whatever
+    the number of tags, and each tag's localisation file gets one append.
+    Returns { tag: [focus ids] }.
+    """
+    start = time.perf_counter()
+    trees = [FocusTree(path) for path in tree_paths]
+    focus_folder = os.path.join(mod_folder, "common", "national_focus")
+    loc_folder = os.path.join(mod_folder, "localisation", "english")
+    os.makedirs(focus_folder, exist_ok=True)
+    os.makedirs(loc_folder, exist_ok=True)
+
+    created = {}
+    for tag in tags:
+        tag_ids = []
+        for tree in trees:
+            text, ids = tree.clone(tag)
+            with open(os.path.join(focus_folder, tag + "_" + os.path.basename(tree.path)), "w", encoding="utf-8") as focus_file:
+                focus_file.write(text)
+            tag_ids.extend(ids)
+        loc_path = os.path.join(loc_folder, tag + "_l_english.yml")
+        if os.path.exists(loc_path):
+            with open(loc_path, "a", encoding="utf-8") as loc_file:
+                loc_file.write(focus_localisation(tag, tag_ids))
+        else:
+            with open(loc_path, "w", encoding="utf-8-sig") as loc_file:
+                loc_file.write("l_english:" + focus_localisation(tag, tag_ids))
+        created[tag] = tag_ids
+
+    focus_count = sum(len(ids) for ids in created.values())
+    print(f"{len(trees)} tree(s) cloned for {len(created)} tag(s), {focus_count} focuses in {time.perf_counter() - start:.2f}s")
+    return created
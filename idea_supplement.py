@@ -0,0 +1,126 @@
+import os
+import time
+from collections import OrderedDict
+from clausewitz_select import Selector, Section
+from parallel_walk import walk_files
+from parse_cache import cached_parse
+from source_file import read_source, append_before_close
+from country_registry import country_registry
+
+# Focus Tree Supplementor for a whole mod. Every common/national_focus file
+# is read (in parallel, unchanged files come from the cache) for the ideas it
+# adds, each credited to the tag the tree is for. Anything not defined under
+# common/ideas gets a placeholder idea and localisation, with one write per
+# tag's ideas file and one per localisation file.
+
+FOCUS_SELECTOR = Selector(
+    "focus_tree.country.**.tag",
+    "**.tag",
+    "**.add_ideas",
+    "**.add_timed_idea.idea",
+    "**.swap_ideas.add_idea",
+)
+IDEA_SELECTOR = Selector("ideas.*.*")
+
+IDEA_BLOCK = ("\t\tIDEA = {\n\t\t\tpicture = generic_economic_increase\n\n\t\t\tallowed = { always = no }\n"
+              "\t\t\tallowed_civil_war = { always = no }\n\t\t\tremoval_cost = -1\n\n\t\t\tmodifier = {}\n\t\t}\n")
+
+# bump when the extract functions change
+EXTRACT_VERSION = 1
+
+
+def extract_focus_ideas(file_path):
+    """(tag the tree is for or None, ideas it adds in file order)."""
+    found = FOCUS_SELECTOR.values_file(file_path)
+    # the tree's own country weighting first, then the first tag = anywhere like mode 3 always used
+    tags = found["focus_tree.country.**.tag"] or found["**.tag"]
+    tag = tags[0].upper() if tags and isinstance(tags[0], str) else None
+    ideas = []
+    for path in ("**.add_ideas", "**.add_timed_idea.idea", "**.swap_ideas.add_idea"):
+        for value in found[path]:
+            ideas.extend(value.values if isinstance(value, Section) else [value])
+    return tag, list(dict.fromkeys(ideas))
+
+
+def extract_defined_ideas(file_path):
+    return [m.path[-1] for m in IDEA_SELECTOR.matches_file(file_path)["ideas.*.*"]]
+
+
+def defined_ideas(root_folder, name):
+    folder = os.path.join(root_folder, "common", "ideas")
+    if not os.path.isdir(folder):
+        return set()
+    found = cached_parse(name, folder, walk_files(folder, (".txt",)), extract_defined_ideas,
+                         version=EXTRACT_VERSION, parallel=True)
+    return {idea for ideas in found.values() for idea in ideas}
+
+
+def find_missing_ideas(mod_folder, base_folder=None, focus_files=None):
+    """
+    { tag: [ideas] } for every idea a focus adds that neither the mod's nor
+    (if given) the base game's common/ideas defines. focus_files defaults to
+    every file in the mod's common/national_focus.
+    """
+    focus_folder = os.path.join(mod_folder, "common", "national_focus")
+    if focus_files is None:
+        focus_files = walk_files(focus_folder, (".txt",)) if os.path.isdir(focus_folder) else []
+    trees = cached_parse("idea_supplement_focus", focus_folder, focus_files, extract_focus_ideas,
+                         version=EXTRACT_VERSION, parallel=True)
+
+    defined = defined_ideas(mod_folder, "idea_supplement_mod_ideas")
+    if base_folder:
+        defined |= defined_ideas(base_folder, "idea_supplement_base_ideas")
+
+    missing = OrderedDict()
+    for file_path, (tag, ideas) in trees.items():
+        if tag is None:
+            if ideas:
+                print(f"No tag found in {os.path.basename(file_path)}, its {len(ideas)} idea(s) skipped")
+            continue
+        for idea in ideas:
+            if idea not in defined:
+                missing.setdefault(tag, OrderedDict())[idea] = None
+    return OrderedDict((tag, list(ideas)) for tag, ideas in missing.items())
+
+
+def idea_name(idea, tag):
+    if idea[:4] == tag+'_':
+        return idea.replace(tag+'_', '').replace('_', ' ').title()
+    return idea.replace('_', ' ').title()
+
+
+def add_ideas(mod_folder, missing):
+    """Write the placeholder ideas and their localisation, one write per file."""
+    start = time.perf_counter()
+    ideas_folder = os.path.join(mod_folder, "common", "ideas")
+    loc_folder = os.path.join(mod_folder, "localisation", "english")
+    os.makedirs(ideas_folder, exist_ok=True)
+    os.makedirs(loc_folder, exist_ok=True)
+    registry = country_registry(mod_folder)
+
+    for tag, ideas in missing.items():
+        blocks = ''.join(IDEA_BLOCK.replace('IDEA', idea) for idea in ideas)
+        ideas_path = os.path.join(ideas_folder, tag+'_ideas.txt')
+        if os.path.exists(ideas_path) and read_source(ideas_path).text.strip():
+            # into the last category block, before its brace and the ideas brace
+            append_before_close(ideas_path, blocks, 2)
+        else:
+            with open(ideas_path, "w", encoding="utf-8") as idea_file:
+                idea_file.write('ideas = {\n\tcountry = {\n'+blocks+'\t}\n}')
+
+        loc = ''.join('\n '+idea+': "'+idea_name(idea, tag)+'"\n '+idea+'_desc: "'+idea_name(idea, tag)+' Description"'
+                      for idea in ideas)
+        # the tag's own localisation file, whatever it's called, before creating TAG_l_english.yml
+        loc_path = registry.localisation_file(tag) or os.path.join(loc_folder, tag+'_l_english.yml')
+        if os.path.exists(loc_path) and os.path.getsize(loc_path):
+            with open(loc_path, "a", encoding="utf-8") as loc_file:
+                loc_file.write('\n'+loc)
+        else:
+            with open(loc_path, "w", encoding="utf-8-sig") as loc_file:
+                loc_file.write('l_english:'+loc)
+            registry.update(tag, localisation_file=loc_path)
+        for idea in ideas:
+            print("Added idea "+idea+" to '"+tag+"_ideas.txt' and '"+os.path.basename(loc_path)+"'")
+
+    total = sum(len(ideas) for ideas in missing.values())
+    print(f"{total} idea(s) added for {len(missing)} tag(s) in {time.perf_counter() - start:.2f}s")
@@ -2,8 +2,11 @@ import os
 import re
 import shutil
 import random
+from functools import partial
 from collections import defaultdict
 from tkinter import Tk, filedialog
+from parse_cache import cached_parse
+from parallel_walk import walk_files, parallel_map
 
 # === CONFIGURATION ===
 
@@ -28,6 +31,9 @@ SCRIPTED_TRIGGER_MAP = {
     "neutrality": "is_neutral"
 }
 
+# Cached scan results are only valid for the config they were made with
+CACHE_VERSION = repr((IDEOLOGY_MAP, SCRIPTED_TRIGGER_MAP, TARGET_EXTENSIONS))
+
 def choose_directory(prompt):
     root = Tk()
     root.withdraw()
@@ -205,6 +211,19 @@ def process_content(content):
     return new_content if changed else content
 
 
+def file_needs_change(file_path):
+    """True if process_content would change the file. Deterministic, so it can be cached."""
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+        content = f.read()
+
+    if process_content(content) == content:
+        # DEBUG: if file contains ideologies but no change was made, alert user
+        if any(ideo in content for ideo in IDEOLOGY_MAP.keys()):
+            print(f"[DEBUG] Potential missed file (contains ideologies but no change): {file_path}")
+        return False
+    return True
+
+
 def process_file(file_path, base_game_path, mod_path):
     if os.path.basename(file_path) in IGNORE_FILES:
         return None
@@ -215,9 +234,6 @@ def process_file(file_path, base_game_path, mod_path):
     new_content = process_content(content)
 
     if new_content == content:
-        # DEBUG: if file contains ideologies but no change was made, alert user
-        if any(ideo in content for ideo in IDEOLOGY_MAP.keys()):
-            print(f"[DEBUG] Potential missed file (contains ideologies but no change): {file_path}")
         return None
 
     rel_path = get_mod_relative_path(file_path, base_game_path)
@@ -253,15 +269,22 @@ def generate_scripted_triggers(mod_path):
 
 
 def process_directory(path, base_game_path, mod_path):
-    modified_files = []
-    for root, _, files in os.walk(path):
-        for file in files:
-            if file.endswith(TARGET_EXTENSIONS):
-                file_path = os.path.join(root, file)
-                result = process_file(file_path, base_game_path, mod_path)
-                if result:
-                    modified_files.append(result)
-    return modified_files
+    """
+    Run process_file over every target file under path. Whether a base-game
+    file needs changing at all is cached between runs (keyed on the file and
+    the ideology config), so files with nothing to transform are not read again.
+    Both the scan and the rewrite are spread over a process pool.
+    """
+    file_paths = walk_files(path, TARGET_EXTENSIONS, IGNORE_FILES)
+
+    needs_change = cached_parse("ideology_fixer", path, file_paths, file_needs_change,
+                                version=CACHE_VERSION, parallel=True)
+    changed_paths = [file_path for file_path, changed in needs_change.items() if changed]
+
+    # ruling parties are picked at random, so each worker gets its own seed
+    results = parallel_map(partial(process_file, base_game_path=base_game_path, mod_path=mod_path),
+                           changed_paths, "ideology_fixer_rewrite", initializer=random.seed)
+    return [result for result in results.values() if result]
 
 
 def print_summary(modified_files, mod_path):
@@ -2,6 +2,11 @@ import os
 import re
 import tkinter as tk
 from tkinter import filedialog
+from clausewitz_cst import parse_file
+from mmap_scan import iter_matches
+
+# Pattern for "invalid database object for effect/trigger: X", kept to one line
+INVALID_OBJECT_PATTERN = re.compile(rb"invalid database object for effect/trigger:[ \t]*([A-Za-z0-9_\-\.]+)")
 
 def main():
     # Hide Tk window
@@ -33,17 +38,12 @@ def main():
 
     print("Reading error.log ...")
 
-    # Pattern for "invalid database object for effect/trigger: X"
-    pattern = r"invalid database object for effect/trigger:\s*([A-Za-z0-9_\-\.]+)"
     invalid_objects = set()
 
-    with open(error_log, "r", encoding="utf-8", errors="ignore") as f:
-        for line in f:
-            m = re.search(pattern, line)
-            if m:
-                tech = m.group(1)
-                tech = tech.rstrip(".,;:")  # strip punctuation
-                invalid_objects.add(tech)
+    # error.log is memory-mapped and searched as bytes, only the names are decoded
+    for tech in iter_matches(error_log, INVALID_OBJECT_PATTERN):
+        tech = tech.rstrip(".,;:")  # strip punctuation
+        invalid_objects.add(tech)
 
     # Start writing the log immediately
     with open(log_path, "w", encoding="utf-8") as log:
@@ -84,36 +84,23 @@ def main():
                     continue
 
                 file_path = os.path.join(rootdir, filename)
+                doc = parse_file(file_path)
 
-                with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                    lines = f.readlines()
-
-                modified = False
-                new_lines = []
-
-                for line in lines:
-                    stripped = line.strip()
-
-                    # Match patterns like: trench_warfare = 1
-                    for invalid_obj in invalid_objects:
-                        if re.match(rf"{re.escape(invalid_obj)}\s*=", stripped):
-                            new_lines.append("# " + line)
-
-                            # Log what was found and where
-                            log.write(f"[{file_path}]\n")
-                            log.write(f"    {line}")
-                            log.write("\n")
+                # Match entries like: trench_warfare = 1, at any depth
+                commented_until = -1
+                for entry in doc.root.walk():
+                    if entry.key in invalid_objects and entry.start >= commented_until:
+                        doc.comment_out(entry)
+                        commented_until = entry.end
 
-                            modified = True
-                            entries_changed += 1
-                            break
-                    else:
-                        new_lines.append(line)
+                        # Log what was found and where
+                        log.write(f"[{file_path}]\n")
+                        log.write(f"    {doc.text[entry.start:entry.end]}\n")
+                        log.write("\n")
 
-                if modified:
-                    with open(file_path, "w", encoding="utf-8") as f:
-                        f.writelines(new_lines)
+                        entries_changed += 1
 
+                if doc.write(file_path):
                     files_changed += 1
                     print("Edited:", file_path)
 
@@ -0,0 +1,99 @@
+import os
+import json
+import hashlib
+from parse_cache import cache_dir, cache_path
+
+# Content-hash manifest for tools that rewrite mod files. Each tool records
+# the hash of every file as it left it; on the next run a file is only
+# processed again if its content, the tool's config or the tool's version
+# changed since. (mtime, size) is checked first so unchanged files are not
+# even read.
+
+
+def file_hash(file_path):
+    h = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class Manifest:
+    def __init__(self, name, folder=None, config=None, version=1):
+        """
+        name identifies the tool, folder the tree it runs on (None for a single
+        per-tool manifest), config anything whose change should redo every file.
+        """
+        if folder is None:
+            self.path = os.path.join(cache_dir(), f"{name}_manifest.json")
+        else:
+            self.path = cache_path(f"{name}_manifest", folder, ".json")
+        self.fingerprint = hashlib.sha1(repr((version, config)).encode("utf-8")).hexdigest()
+        self.files = {}
+        self.dirty = False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("fingerprint") == self.fingerprint:
+                self.files = data.get("files", {})
+        except (OSError, ValueError):
+            pass
+
+    def changed(self, file_path):
+        """True if file_path is new or its content differs from what was recorded."""
+        key = os.path.abspath(file_path)
+        entry = self.files.get(key)
+        if entry is None:
+            return True
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return True
+        if [st.st_mtime_ns, st.st_size] == entry[:2]:
+            return False
+        if st.st_size != entry[1] or file_hash(file_path) != entry[2]:
+            return True
+        # touched but identical, remember the new mtime
+        self.files[key] = [st.st_mtime_ns, st.st_size, entry[2]]
+        self.dirty = True
+        return False
+
+    def unchanged(self, file_paths):
+        """True if exactly these files were recorded and none of them changed."""
+        keys = {os.path.abspath(p) for p in file_paths}
+        if keys != set(self.files):
+            return False
+        return not any(self.changed(p) for p in file_paths)
+
+    def record(self, file_path):
+        """Remember file_path as it is now, call after the tool has written it."""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            self.forget(file_path)
+            return
+        self.files[os.path.abspath(file_path)] = [st.st_mtime_ns, st.st_size, file_hash(file_path)]
+        self.dirty = True
+
+    def forget(self, file_path):
+        if self.files.pop(os.path.abspath(file_path), None) is not None:
+            self.dirty = True
+
+    def reset(self, file_paths=()):
+        """Drop every entry, then record file_paths."""
+        self.files = {}
+        self.dirty = True
+        for p in file_paths:
+            self.record(p)
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"fingerprint": self.fingerprint, "files": self.files}, f)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError as e:
+            print(f"Could not save manifest {self.path}: {e}")
@@ -0,0 +1,85 @@
+import time
+from collections import namedtuple
+from clausewitz_cst import parse, Block
+from source_file import read_source, read_lines
+from templates import load_template
+
+# Country specific names for military industrial organisations (pwm mode 13).
+# The base MIO file is parsed once into an index of its top-level MIOs, the
+# template is compiled once, every row's edits are collected in memory, and
+# the base file, 00_auto_mios.txt and the localisation file are each written
+# once at the end.
+
+MIO_PLACEHOLDERS = ("MIO_NAME", "BASE_MIO", "MIO_ICON", "MIO_TRIGGER")
+
+MioRow = namedtuple("MioRow", ["condition", "base_mio", "name"])
+
+# lines at the top of a naming file explaining its format
+HEADER_LINES = 3
+
+
+def read_naming_file(file_path):
+    """Rows of a MIO naming file (TAG;BASE_MIO;NEW NAME) after its header, '#' lines skipped."""
+    rows = []
+    for line in read_lines(file_path)[HEADER_LINES:]:
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        parts = line.rstrip('\n').split(';')
+        if len(parts) < 3:
+            print('Skipped line without three parts: ' + line.strip())
+            continue
+        rows.append(MioRow(parts[0].strip(), parts[1].strip(), parts[2].replace("'", "").replace('"', '').strip()))
+    return rows
+
+
+def rename_mios(base_path, rows, mio_file_path, loc_file_path):
+    """
+    For each valid row add a renamed copy of the base MIO for that tag to
+    mio_file_path, keep the tag out of the base MIO's allowed block, and add
+    the new name to loc_file_path.
+    """
+    start = time.perf_counter()
+    base_source = read_source(base_path)
+    doc = parse(base_source.text)
+    # name -> entry for every MIO defined at the top of the file
+    index = {entry.key: entry for entry in doc.root.entries() if isinstance(entry.value, Block)}
+    template = load_template('base_mio.txt', MIO_PLACEHOLDERS)
+
+    mios = []
+    loc = []
+    # base MIO entry -> triggers to keep out of it, applied once per MIO after the loop
+    excluded = {}
+    for row in rows:
+        entry = index.get(row.base_mio)
+        if entry is None:
+            print('Failed to add ' + row.name + ' due to missing base mio: ' + row.base_mio)
+            continue
+        if not (len(row.condition) == 3 and row.condition[0:1].isalpha()):
+            print('MIO condition ' + row.condition + ' for ' + row.name + ' is invalid.')
+            continue
+
+        mio_trigger = 'tag = ' + row.condition
+        icon = entry.value.get('icon')
+        excluded.setdefault(entry, []).append(mio_trigger)
+
+        mio_loc_key = row.condition + '_mio_' + row.name.lower().replace(' ', '_')
+        loc.append(' ' + mio_loc_key + ': "' + row.name + '"\n')
+        mios.append('\n' + template.render({'MIO_NAME': mio_loc_key, 'BASE_MIO': row.base_mio,
+                                            'MIO_ICON': icon.text() if icon is not None else '',
+                                            'MIO_TRIGGER': mio_trigger}) + '\n')
+
+    for entry, triggers in excluded.items():
+        nots = ''.join(' \n\t\tNOT = { ' + trigger + '}' for trigger in triggers)
+        allowed = entry.value.get('allowed')
+        if allowed is not None and isinstance(allowed.value, Block):
+            doc.insert(allowed.value.open.end, nots)
+        else:
+            doc.append(entry.value, 'allowed = {' + nots + '\n\t}')
+
+    with open(loc_file_path, 'w', encoding='utf-8-sig') as loc_file:
+        loc_file.write('l_english:\n' + ''.join(loc))
+    with open(mio_file_path, 'w') as mio_file:
+        mio_file.write(''.join(mios))
+    if doc.changed:
+        base_source.write(doc.serialize())
+    print(f'{len(mios)} of {len(rows)} MIO(s) added in {time.perf_counter() - start:.2f}s')
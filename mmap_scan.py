@@ -0,0 +1,120 @@
+import os
+import re
+import mmap
+from contextlib import contextmanager
+
+# Scanning for very large inputs such as error.log. The file is memory-mapped
+# and searched with compiled bytes patterns, only the matched spans are ever
+# decoded, so memory use stays flat however big the file is and the speed is
+# bounded by the disk rather than by building Python strings for every line.
+
+
+@contextmanager
+def mapped(file_path):
+    """Read-only mmap of file_path, or b"" for an empty file (which cannot be mapped)."""
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mm
+        finally:
+            mm.close()
+
+
+def to_pattern(pattern):
+    if isinstance(pattern, str):
+        pattern = pattern.encode("utf-8")
+    if isinstance(pattern, bytes):
+        pattern = re.compile(pattern)
+    return pattern
+
+
+def iter_matches(file_path, pattern, group=1, encoding="utf-8"):
+    """Decoded group of every match of a bytes pattern in file_path, in file order."""
+    pattern = to_pattern(pattern)
+    with mapped(file_path) as mm:
+        for m in pattern.finditer(mm):
+            yield m.group(group).decode(encoding, "ignore")
+
+
+def matching_lines(file_path, *needles, encoding="utf-8"):
+    """
+    Every line containing any of the needles, decoded and without its line
+    ending, in file order. Only the matching lines are decoded.
+    """
+    pattern = re.compile(b"|".join(re.escape(n.encode(encoding)) for n in needles))
+    with mapped(file_path) as mm:
+        size = len(mm)
+        pos = 0
+        while pos < size:
+            m = pattern.search(mm, pos)
+            if m is None:
+                break
+            start = mm.rfind(b"\n", 0, m.start()) + 1
+            end = mm.find(b"\n", m.end())
+            if end == -1:
+                end = size
+            yield mm[start:end].rstrip(b"\r").decode(encoding, "ignore")
+            pos = end + 1
+
+
+def line_numbers(file_path, *needles):
+    """{ needle: [1-based line numbers containing it] }, lines compared as bytes."""
+    encoded = [(n, n.encode("utf-8")) for n in needles]
+    found = {n: [] for n in needles}
+    pattern = re.compile(b"|".join(re.escape(b) for _, b in encoded))
+    with mapped(file_path) as mm:
+        size = len(mm)
+        pos = 0   # start of a line
+        line = 1  # its line number
+        while pos < size:
+            m = pattern.search(mm, pos)
+            if m is None:
+                break
+            # count the lines skipped since pos without copying them
+            nl = mm.find(b"\n", pos, m.start())
+            while nl != -1:
+                line += 1
+                pos = nl + 1
+                nl = mm.find(b"\n", pos, m.start())
+            end = mm.find(b"\n", m.end())
+            end = size if end == -1 else end
+            line_bytes = mm[pos:end]
+            for needle, b in encoded:
+                if b in line_bytes:
+                    found[needle].append(line)
+            pos = end + 1
+            line += 1
+    return found
+
+
+def drop_lines(file_path, drop):
+    """
+    Rewrite file_path without the 1-based line numbers in drop, copying bytes
+    untouched otherwise. Returns True if anything was removed.
+    """
+    drop = set(drop)
+    if not drop:
+        return False
+    tmp_path = file_path + ".tmp"
+    removed = False
+    with mapped(file_path) as mm, open(tmp_path, "wb") as out:
+        size = len(mm)
+        pos = 0
+        line = 1
+        while pos < size:
+            end = mm.find(b"\n", pos)
+            end = size if end == -1 else end + 1
+            if line in drop:
+                removed = True
+            else:
+                out.write(mm[pos:end])
+            pos = end
+            line += 1
+    if removed:
+        os.replace(tmp_path, file_path)
+    else:
+        os.remove(tmp_path)
+    return removed
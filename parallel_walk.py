@@ -0,0 +1,85 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Spread per-file work over every core. Results always come back in the order
+# the paths were given (sorted, when they come from walk_files), so output and
+# logs are the same from run to run whatever the worker count.
+#
+# Functions handed to parallel_map must be picklable: defined at module level
+# (or a functools.partial of one) in a module that can be imported without
+# side effects, since on Windows every worker re-imports it.
+
+# below this many files the pool start-up costs more than it saves
+MIN_PARALLEL_FILES = 32
+
+
+def walk_files(folder, extensions=None, ignore=()):
+    """
+    Every file under folder, sorted. extensions is a tuple such as (".txt", ".yml")
+    matched case-insensitively, ignore a collection of file names to skip.
+    """
+    if extensions is not None:
+        extensions = tuple(ext.lower() for ext in extensions)
+    ignore = set(ignore)
+    paths = []
+    for root_dir, _, files in os.walk(folder):
+        for file in files:
+            if file in ignore:
+                continue
+            if extensions is not None and not file.lower().endswith(extensions):
+                continue
+            paths.append(os.path.join(root_dir, file))
+    paths.sort()
+    return paths
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def parallel_map(func, paths, name="walk", workers=None, initializer=None):
+    """
+    Return { path: func(path) } in the order of paths, running func across a
+    process pool in chunks. Small jobs, or workers=1, run in this process.
+    initializer runs once in each worker, e.g. random.seed so forked workers
+    do not all share the parent's random state.
+    """
+    paths = list(paths)
+    if not paths:
+        return {}
+    workers = workers or default_workers()
+    start = time.perf_counter()
+
+    if workers == 1 or len(paths) < MIN_PARALLEL_FILES:
+        if initializer is not None:
+            initializer()
+        results = [func(p) for p in paths]
+        workers = 1
+    else:
+        workers = min(workers, len(paths))
+        chunksize = max(1, len(paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=initializer) as pool:
+            results = list(pool.map(func, paths, chunksize=chunksize))
+
+    report_throughput(name, paths, time.perf_counter() - start, workers)
+    return dict(zip(paths, results))
+
+
+def parallel_walk(folder, func, extensions=None, ignore=(), name="walk", workers=None, initializer=None):
+    """walk_files + parallel_map: { path: func(path) } for every matching file under folder."""
+    paths = walk_files(folder, extensions, ignore)
+    return parallel_map(func, paths, name, workers, initializer)
+
+
+def report_throughput(name, paths, elapsed, workers):
+    total_bytes = 0
+    for p in paths:
+        try:
+            total_bytes += os.path.getsize(p)
+        except OSError:
+            pass
+    elapsed = max(elapsed, 1e-9)
+    mb = total_bytes / (1024 * 1024)
+    print(f"[{name}] {len(paths)} file(s), {mb:.1f} MB in {elapsed:.2f}s "
+          f"({len(paths) / elapsed:.0f} files/s, {mb / elapsed:.1f} MB/s) on {workers} worker(s)")
@@ -0,0 +1,125 @@
+import os
+import pickle
+import hashlib
+import time
+from parallel_walk import parallel_map
+
+# Results extracted from unchanged files are kept between runs in the user's
+# cache folder, keyed by (mtime, size), so a second run over the same base
+# game only re-parses what a patch actually touched.
+
+CACHE_FOLDER_NAME = "meepazor_country_creation"
+
+
+class Failed:
+    """
+    What an extract function returns for a file it couldn't read. The caller
+    gets result for this run, but nothing is cached, so the file is tried
+    again next run even if it hasn't changed.
+    """
+
+    def __init__(self, result=None):
+        self.result = result
+
+
+def cache_dir():
+    """Per-user cache folder, %LOCALAPPDATA% on Windows, $XDG_CACHE_HOME or ~/.cache elsewhere."""
+    base = (os.environ.get("LOCALAPPDATA")
+            or os.environ.get("XDG_CACHE_HOME")
+            or os.path.join(os.path.expanduser("~"), ".cache"))
+    path = os.path.join(base, CACHE_FOLDER_NAME)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def cache_path(name, folder, ext=".pickle"):
+    folder_hash = hashlib.sha1(os.path.abspath(folder).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(cache_dir(), f"{name}-{folder_hash}{ext}")
+
+
+def load_cache(path, version):
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != version:
+        return {}
+    return data.get("entries", {})
+
+
+def save_cache(path, version, entries):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"version": version, "entries": entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def file_key(file_path):
+    st = os.stat(file_path)
+    return st.st_mtime_ns, st.st_size
+
+
+def cached_parse(name, folder, file_paths, extract, version=1, parallel=False):
+    """
+    Return { file_path: extract(file_path) } for every path in file_paths, in order.
+    Results for files whose mtime and size match the last run come from the
+    cache in the user's cache folder, everything else is extracted again.
+    name identifies the tool/extractor, folder the tree being scanned, and
+    version must change whenever extract would give different results.
+    With parallel=True the files that do need extracting are spread over a
+    process pool, so extract must be a picklable module-level function.
+    """
+    start = time.perf_counter()
+    path = cache_path(name, folder)
+    old_entries = load_cache(path, version)
+    keys = {}
+    stale = []
+
+    for file_path in file_paths:
+        try:
+            key = file_key(file_path)
+        except OSError:
+            continue
+        keys[file_path] = key
+        cached = old_entries.get(file_path)
+        if cached is None or cached[0] != key:
+            stale.append(file_path)
+
+    if parallel:
+        fresh = parallel_map(extract, stale, name)
+    else:
+        fresh = {file_path: extract(file_path) for file_path in stale}
+    parsed = len(fresh)
+
+    new_entries = {}
+    results = {}
+    failed = 0
+    for file_path, key in keys.items():
+        result = fresh[file_path] if file_path in fresh else old_entries[file_path][1]
+        if isinstance(result, Failed):
+            failed += 1
+            results[file_path] = result.result
+            continue
+        new_entries[file_path] = (key, result)
+        results[file_path] = result
+
+    if parsed or len(new_entries) != len(old_entries):
+        try:
+            save_cache(path, version, new_entries)
+        except OSError as e:
+            print(f"Could not save cache {path}: {e}")
+
+    elapsed = time.perf_counter() - start
+    print(f"[{name}] {len(results) - parsed} file(s) from cache, {parsed} parsed in {elapsed:.2f}s")
+    if failed:
+        print(f"[{name}] {failed} file(s) failed and will be parsed again next run")
+    return results
+
+
+def clear_cache(name=None):
+    """Delete every cache file, or only those for one tool."""
+    folder = cache_dir()
+    for fn in os.listdir(folder):
+        if fn.endswith(".pickle") and (name is None or fn.startswith(name + "-")):
+            os.remove(os.path.join(folder, fn))
@@ -0,0 +1,183 @@
+import os
+import bisect
+import codecs
+from collections import OrderedDict
+
+# One way to read mod and game files. Each file is read once into bytes, its
+# BOM and encoding are worked out once, and the text and a line index are
+# both served from that single buffer. Files already read in this run are
+# handed back from memory until their mtime or size changes.
+
+BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+# tried in order when there is no BOM; latin-1 always decodes
+FALLBACK_ENCODINGS = ("utf-8", "cp1252", "latin-1")
+
+MAX_CACHED = 256
+# bytes read per step when searching a file backwards from its end
+TAIL_BLOCK = 4096
+_cache = OrderedDict()
+
+
+def detect_encoding(raw):
+    """(encoding, has_bom) for raw bytes."""
+    for bom, encoding in BOMS:
+        if raw.startswith(bom):
+            return encoding, True
+    for encoding in FALLBACK_ENCODINGS:
+        try:
+            raw.decode(encoding)
+            return encoding, False
+        except UnicodeDecodeError:
+            continue
+    return "latin-1", False
+
+
+class SourceFile:
+    """Bytes, decoded text and line index of one file, all from a single read."""
+
+    def __init__(self, path, raw=None):
+        self.path = path
+        if raw is None:
+            with open(path, "rb") as f:
+                raw = f.read()
+        self.raw = raw
+        self.encoding, self.bom = detect_encoding(raw)
+        self.newline = "\r\n" if b"\r\n" in raw[:4096] else "\n"
+        self._text = None
+        self._lines = None
+        self._line_starts = None
+
+    @property
+    def text(self):
+        """Decoded text with any BOM removed and line endings normalised to \\n."""
+        if self._text is None:
+            text = self.raw.decode(self.encoding)
+            if "\r" in text:
+                text = text.replace("\r\n", "\n").replace("\r", "\n")
+            self._text = text
+        return self._text
+
+    @property
+    def lines(self):
+        """Lines with their trailing \\n, like readlines()."""
+        if self._lines is None:
+            self._lines = self.text.splitlines(keepends=True)
+        return self._lines
+
+    @property
+    def line_starts(self):
+        """Offset into text where each line starts."""
+        if self._line_starts is None:
+            starts = [0]
+            text = self.text
+            i = text.find("\n")
+            while i != -1:
+                starts.append(i + 1)
+                i = text.find("\n", i + 1)
+            self._line_starts = starts
+        return self._line_starts
+
+    def line_of(self, offset):
+        """1-based line number of a text offset."""
+        return bisect.bisect_right(self.line_starts, offset)
+
+    def line(self, number):
+        """Text of a 1-based line number, without its line ending."""
+        starts = self.line_starts
+        start = starts[number - 1]
+        end = starts[number] - 1 if number < len(starts) else len(self.text)
+        return self.text[start:end]
+
+    @property
+    def is_empty(self):
+        return not self.raw
+
+    def write(self, text, path=None):
+        """Write text back in this file's encoding, BOM and line endings."""
+        path = path or self.path
+        with open(path, "w", encoding=self.encoding, newline=self.newline) as f:
+            f.write(text)
+        _cache.pop(os.path.abspath(path), None)
+
+
+def read_source(path):
+    """SourceFile for path, reused while the file is unchanged on disk."""
+    key = os.path.abspath(path)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _cache.get(key)
+    if cached is not None and cached[0] == stamp:
+        _cache.move_to_end(key)
+        return cached[1]
+    source = SourceFile(path)
+    _cache[key] = (stamp, source)
+    if len(_cache) > MAX_CACHED:
+        _cache.popitem(last=False)
+    return source
+
+
+def read_text(path):
+    return read_source(path).text
+
+
+def read_lines(path):
+    return read_source(path).lines
+
+
+def is_empty(path):
+    """True if path is missing or has no bytes, without reading it."""
+    try:
+        return os.path.getsize(path) == 0
+    except OSError:
+        return True
+
+
+def _brace_cut(tail, depth):
+    """Offset in tail of the depth-th '}' from its end, or -1."""
+    cut = len(tail)
+    for _ in range(depth):
+        cut = tail.rfind(b"}", 0, cut)
+        if cut == -1:
+            return -1
+    return cut
+
+
+def append_before_close(path, text, depth=1):
+    """
+    Insert text just before the last depth closing braces of path, e.g. depth=1
+    for a new entry in the outermost block, 2 for one inside the block it holds
+    (ideas = { country = { ... } }). The file is searched backwards from its
+    end and only the bytes after the insertion point are rewritten, however
+    large it is. text goes in at the start of the brace's line, or on a new
+    line if the brace shares its line with anything else.
+    """
+    with open(path, "r+b") as f:
+        pos = f.seek(0, os.SEEK_END)
+        tail = b""
+        while True:
+            cut = _brace_cut(tail, depth)
+            # stop once the brace and the start of its line are both in view
+            if cut != -1 and (pos == 0 or tail.rfind(b"\n", 0, cut) != -1):
+                break
+            if pos == 0:
+                raise ValueError(f"{path} has fewer than {depth} closing brace(s)")
+            start = max(0, pos - TAIL_BLOCK)
+            f.seek(start)
+            tail = f.read(pos - start) + tail
+            pos = start
+
+        newline = "\r\n" if b"\r\n" in tail else "\n"
+        line_start = tail.rfind(b"\n", 0, cut) + 1
+        if tail[line_start:cut].strip(b" \t"):
+            text = "\n" + text
+        else:
+            cut = line_start  # keep the brace's indentation with the brace
+        data = text.replace("\n", newline).encode("utf-8")
+        f.seek(pos + cut)
+        f.truncate()
+        f.write(data + tail[cut:])
+    _cache.pop(os.path.abspath(path), None)
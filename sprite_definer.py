@@ -1,5 +1,9 @@
 import os
 import re
+from manifest import Manifest
+
+# bump when the replacement changes, every character file is then processed again
+TOOL_VERSION = 1
 
 def define_and_replace_sprites(root_dir="."):
     characters_dir = os.path.join(root_dir, "common", "characters")
@@ -13,12 +17,19 @@ def define_and_replace_sprites(root_dir="."):
 
     all_matches = set()
 
+    # character files already converted and not edited since are skipped
+    manifest = Manifest("sprite_definer", characters_dir, path_pattern.pattern, TOOL_VERSION)
+    skipped = 0
+
     # Process every file in common/characters
     for filename in os.listdir(characters_dir):
         if not filename.endswith(".txt"):
             continue
 
         file_path = os.path.join(characters_dir, filename)
+        if not manifest.changed(file_path):
+            skipped += 1
+            continue
 
         with open(file_path, "r", encoding="utf-8") as f:
             data = f.read()
@@ -36,10 +47,15 @@ def define_and_replace_sprites(root_dir="."):
         new_data = path_pattern.sub(replacer, data)
 
         # Save updated file
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(new_data)
+        if new_data != data:
+            with open(file_path, "w", encoding="utf-8") as f:
+                f.write(new_data)
+            print(f"Updated {filename}, replaced {len(matches)} entries.")
+        manifest.record(file_path)
 
-        print(f"Updated {filename}, replaced {len(matches)} entries.")
+    manifest.save()
+    if skipped:
+        print(f"Skipped {skipped} unchanged character file(s).")
 
     # Sort unique sprite tags alphabetically by tag (the filename part, not folder)
     unique_entries = sorted(all_matches, key=lambda x: (x[1], x[0]))
@@ -67,12 +83,15 @@ def define_and_replace_sprites(root_dir="."):
     # Insert before the last }
     if "spriteTypes" not in gfx_data:
         new_gfx_data = "spriteTypes = {\n" + "\n".join(sprite_defs) + "\n}\n"
-    else:
+    elif new_entries:
         new_gfx_data = gfx_data.strip()[:-1] + "\n" + "\n".join(new_entries) + "\n}\n"
+    else:
+        new_gfx_data = gfx_data
 
     # Write updated gfx file
-    with open(gfx_file, "w", encoding="utf-8") as f:
-        f.write(new_gfx_data)
+    if new_gfx_data != gfx_data:
+        with open(gfx_file, "w", encoding="utf-8") as f:
+            f.write(new_gfx_data)
 
     print(f"\nProcessed {len(unique_entries)} unique sprites.")
     print(f"Updated all .txt files in {characters_dir} and {gfx_file}.")
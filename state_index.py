@@ -0,0 +1,404 @@
+import os
+import sys
+import sqlite3
+import argparse
+from clausewitz_select import Selector, Section
+from parse_cache import cache_path, file_key
+from parallel_walk import parallel_map
+
+# One SQLite picture of history/states for the base game and the mod, so
+# state questions ("all states owned by GER with coal > 10") are indexed
+# lookups instead of every tool re-reading the folder with its own regexes.
+#
+# Usage:
+#   python state_index.py build-index --base "<HOI4 folder>" --mod "<mod folder>"
+#   python state_index.py owned-by GER --resource coal --min 10 --mod "<mod folder>"
+
+BASE = "base"
+MOD = "mod"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    source TEXT, path TEXT, mtime_ns INTEGER, size INTEGER, state_id INTEGER,
+    PRIMARY KEY (source, path)
+);
+CREATE TABLE IF NOT EXISTS states (
+    source TEXT, state_id INTEGER, file TEXT, name TEXT, owner TEXT,
+    manpower INTEGER, category TEXT,
+    PRIMARY KEY (source, state_id)
+);
+CREATE TABLE IF NOT EXISTS cores (source TEXT, state_id INTEGER, tag TEXT);
+CREATE TABLE IF NOT EXISTS claims (source TEXT, state_id INTEGER, tag TEXT);
+CREATE TABLE IF NOT EXISTS resources (source TEXT, state_id INTEGER, resource TEXT, amount NUMERIC);
+CREATE TABLE IF NOT EXISTS provinces (source TEXT, state_id INTEGER, province INTEGER);
+CREATE TABLE IF NOT EXISTS victory_points (source TEXT, state_id INTEGER, province INTEGER, value NUMERIC);
+CREATE TABLE IF NOT EXISTS buildings (source TEXT, state_id INTEGER, province INTEGER, building TEXT, level NUMERIC);
+
+CREATE INDEX IF NOT EXISTS states_owner ON states (owner);
+CREATE INDEX IF NOT EXISTS cores_tag ON cores (tag, state_id);
+CREATE INDEX IF NOT EXISTS cores_state ON cores (source, state_id);
+CREATE INDEX IF NOT EXISTS claims_tag ON claims (tag, state_id);
+CREATE INDEX IF NOT EXISTS claims_state ON claims (source, state_id);
+CREATE INDEX IF NOT EXISTS resources_name ON resources (resource, amount);
+CREATE INDEX IF NOT EXISTS resources_state ON resources (source, state_id);
+CREATE INDEX IF NOT EXISTS provinces_province ON provinces (province);
+CREATE INDEX IF NOT EXISTS provinces_state ON provinces (source, state_id);
+CREATE INDEX IF NOT EXISTS vps_state ON victory_points (source, state_id);
+CREATE INDEX IF NOT EXISTS buildings_state ON buildings (source, state_id);
+
+-- the mod's copy of a state replaces the base game's
+CREATE VIEW IF NOT EXISTS effective_states AS
+    SELECT * FROM states WHERE source = 'mod'
+    UNION ALL
+    SELECT * FROM states b WHERE source = 'base'
+        AND NOT EXISTS (SELECT 1 FROM states m WHERE m.source = 'mod' AND m.state_id = b.state_id);
+"""
+
+DETAIL_TABLES = ("cores", "claims", "resources", "provinces", "victory_points", "buildings")
+
+# bump when SCHEMA or parse_state_file changes, older databases are rebuilt
+SCHEMA_VERSION = 2
+
+
+def default_db_path(mod_folder):
+    """Index lives in the user's cache folder, one database per mod."""
+    return cache_path("state_index", mod_folder, ".sqlite")
+
+
+def to_number(value):
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+
+
+STATE_SELECTOR = Selector(
+    "state.id", "state.name", "state.manpower", "state.state_category", "state.resources",
+    "state.provinces", "state.history.owner", "state.history.add_core_of", "state.history.add_claim_by",
+    "state.history.**.victory_points", "state.history.buildings",
+)
+
+
+def parse_state_file(file_path):
+    """
+    Read one history/states file into a dict with id, name, owner, manpower,
+    category, cores, claims, resources, provinces, victory_points and buildings.
+    Returns None if the file has no state = { id = ... } block.
+    Every field comes out of the same single pass over the file.
+    """
+    found = STATE_SELECTOR.values_file(file_path)
+
+    def first(path):
+        values = [v for v in found[path] if isinstance(v, str)]
+        return values[0] if values else None
+
+    state_id = to_number(first("state.id") or "")
+    if state_id is None:
+        return None
+
+    info = {
+        "id": int(state_id),
+        "name": first("state.name"), "owner": None, "manpower": None,
+        "category": first("state.state_category"),
+        "cores": [], "claims": [], "resources": {}, "provinces": [],
+        "victory_points": [], "buildings": [],
+    }
+    if first("state.manpower") is not None:
+        info["manpower"] = to_number(first("state.manpower"))
+
+    for resources in found["state.resources"]:
+        if isinstance(resources, Section):
+            for res, value in resources.entries:
+                amount = to_number(value) if isinstance(value, str) else None
+                if amount is not None:
+                    info["resources"][res] = info["resources"].get(res, 0) + amount
+
+    for provinces in found["state.provinces"]:
+        if isinstance(provinces, Section):
+            info["provinces"] = [int(p) for p in provinces.values if p.isdigit()]
+            break
+
+    owner = first("state.history.owner")
+    if owner:
+        info["owner"] = owner.upper()
+    info["cores"] = [tag.upper() for tag in found["state.history.add_core_of"] if isinstance(tag, str) and tag]
+    info["claims"] = [tag.upper() for tag in found["state.history.add_claim_by"] if isinstance(tag, str) and tag]
+
+    # victory points anywhere in history, first value per province wins
+    seen = set()
+    for vps in found["state.history.**.victory_points"]:
+        if not isinstance(vps, Section):
+            continue
+        nums = vps.values
+        for i in range(0, len(nums) - 1, 2):
+            prov = to_number(nums[i])
+            if prov is None or prov in seen:
+                continue
+            seen.add(prov)
+            info["victory_points"].append((int(prov), to_number(nums[i + 1]) or 0))
+
+    for buildings in found["state.history.buildings"]:
+        if not isinstance(buildings, Section):
+            continue
+        for key, value in buildings.entries:
+            if isinstance(value, Section) and key.isdigit():
+                for building, level in value.entries:
+                    level = to_number(level) if isinstance(level, str) else None
+                    if level is not None:
+                        info["buildings"].append((int(key), building, level))
+            elif isinstance(value, str):
+                level = to_number(value)
+                if level is not None:
+                    info["buildings"].append((None, key, level))
+    return info
+
+
+def connect(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        conn.execute("DROP VIEW IF EXISTS effective_states")
+        for table in ("files", "states") + DETAIL_TABLES:
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def remove_file(conn, source, path):
+    row = conn.execute("SELECT state_id FROM files WHERE source = ? AND path = ?", (source, path)).fetchone()
+    if row is not None and row["state_id"] is not None:
+        # only drop the state if no other file now claims the same id
+        conn.execute("DELETE FROM states WHERE source = ? AND state_id = ? AND file = ?",
+                     (source, row["state_id"], path))
+        if conn.execute("SELECT 1 FROM states WHERE source = ? AND state_id = ?",
+                        (source, row["state_id"])).fetchone() is None:
+            for table in DETAIL_TABLES:
+                conn.execute(f"DELETE FROM {table} WHERE source = ? AND state_id = ?", (source, row["state_id"]))
+    conn.execute("DELETE FROM files WHERE source = ? AND path = ?", (source, path))
+
+
+def insert_state(conn, source, path, info):
+    sid = info["id"]
+    for table in DETAIL_TABLES:
+        conn.execute(f"DELETE FROM {table} WHERE source = ? AND state_id = ?", (source, sid))
+    conn.execute("INSERT OR REPLACE INTO states VALUES (?, ?, ?, ?, ?, ?, ?)",
+                 (source, sid, path, info["name"], info["owner"], info["manpower"], info["category"]))
+    conn.executemany("INSERT INTO cores VALUES (?, ?, ?)", [(source, sid, t) for t in info["cores"]])
+    conn.executemany("INSERT INTO claims VALUES (?, ?, ?)", [(source, sid, t) for t in info["claims"]])
+    conn.executemany("INSERT INTO resources VALUES (?, ?, ?, ?)",
+                     [(source, sid, r, a) for r, a in info["resources"].items()])
+    conn.executemany("INSERT INTO provinces VALUES (?, ?, ?)", [(source, sid, p) for p in info["provinces"]])
+    conn.executemany("INSERT INTO victory_points VALUES (?, ?, ?, ?)",
+                     [(source, sid, p, v) for p, v in info["victory_points"]])
+    conn.executemany("INSERT INTO buildings VALUES (?, ?, ?, ?, ?)",
+                     [(source, sid, p, b, l) for p, b, l in info["buildings"]])
+
+
+def index_folder(conn, source, states_folder):
+    """
+    Bring one source up to date with states_folder. Files whose mtime and size
+    match the last build are skipped. Returns (parsed, skipped, removed).
+    """
+    known = {row["path"]: (row["mtime_ns"], row["size"])
+             for row in conn.execute("SELECT path, mtime_ns, size FROM files WHERE source = ?", (source,))}
+    current = {}
+    skipped = 0
+
+    for fname in sorted(os.listdir(states_folder)):
+        if not fname.endswith(".txt"):
+            continue
+        path = os.path.join(states_folder, fname)
+        current[path] = key = file_key(path)
+        if known.get(path) == key:
+            skipped += 1
+
+    # changed files are parsed across the process pool, the database is only written from here
+    stale = [path for path, key in current.items() if known.get(path) != key]
+    parsed_files = parallel_map(parse_state_file, stale, "state_index_" + source)
+    for path, info in parsed_files.items():
+        key = current[path]
+        if path in known:
+            remove_file(conn, source, path)
+        if info is not None:
+            insert_state(conn, source, path, info)
+        conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                     (source, path, key[0], key[1], info["id"] if info else None))
+
+    removed = 0
+    for path in set(known) - set(current):
+        remove_file(conn, source, path)
+        removed += 1
+    return len(parsed_files), skipped, removed
+
+
+def build_index(mod_folder, base_folder=None, db_path=None):
+    """
+    Index <mod>/history/states and, if given, <base game>/history/states.
+    Rebuilds are incremental. Returns the database path.
+    """
+    db_path = db_path or default_db_path(mod_folder)
+    conn = connect(db_path)
+    with conn:
+        for source, folder in ((BASE, base_folder), (MOD, mod_folder)):
+            if not folder:
+                continue
+            states_folder = os.path.join(folder, "history", "states")
+            if not os.path.isdir(states_folder):
+                print(f"No history/states folder in {folder}")
+                continue
+            parsed, skipped, removed = index_folder(conn, source, states_folder)
+            print(f"{source}: {parsed} parsed, {skipped} unchanged, {removed} removed")
+    conn.close()
+    return db_path
+
+
+class StateIndex:
+    """
+    Read access to a built index. By default queries see the effective state
+    (the mod's file where it has one, otherwise the base game's); pass
+    source='base' or source='mod' to look at one side only.
+    """
+
+    def __init__(self, db_path):
+        self.conn = connect(db_path)
+
+    def close(self):
+        self.conn.close()
+
+    def _states_table(self, source):
+        if source is None:
+            return "effective_states", ()
+        return "(SELECT * FROM states WHERE source = ?)", (source,)
+
+    def query(self, sql, params=()):
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def state(self, state_id, source=None):
+        table, params = self._states_table(source)
+        rows = self.query(f"SELECT * FROM {table} WHERE state_id = ?", params + (state_id,))
+        return rows[0] if rows else None
+
+    def state_file(self, state_id, source=None):
+        row = self.state(state_id, source)
+        return row["file"] if row else None
+
+    def states(self, owner=None, resource=None, min_amount=None, source=None):
+        """
+        States matching every given filter, e.g.
+        states(owner="GER", resource="coal", min_amount=10).
+        """
+        table, params = self._states_table(source)
+        sql = f"SELECT s.* FROM {table} s"
+        where = []
+        if resource is not None:
+            sql += " JOIN resources r ON r.source = s.source AND r.state_id = s.state_id AND r.resource = ?"
+            params += (resource,)
+            if min_amount is not None:
+                where.append("r.amount > ?")
+                params += (min_amount,)
+        if owner is not None:
+            where.append("s.owner = ?")
+            params += (owner.upper(),)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self.query(sql + " ORDER BY s.state_id", params)
+
+    def _details(self, table, columns, state_id, source):
+        table_states, params = self._states_table(source)
+        return self.query(f"SELECT {columns} FROM {table} d JOIN {table_states} s "
+                          f"ON d.source = s.source AND d.state_id = s.state_id "
+                          f"WHERE s.state_id = ?", params + (state_id,))
+
+    def resources(self, state_id, source=None):
+        return {row["resource"]: row["amount"] for row in self._details("resources", "d.resource, d.amount", state_id, source)}
+
+    def provinces(self, state_id, source=None):
+        return [row["province"] for row in self._details("provinces", "d.province", state_id, source)]
+
+    def cores(self, state_id, source=None):
+        return [row["tag"] for row in self._details("cores", "d.tag", state_id, source)]
+
+    def claims(self, state_id, source=None):
+        return [row["tag"] for row in self._details("claims", "d.tag", state_id, source)]
+
+    def buildings(self, state_id, source=None):
+        return self._details("buildings", "d.province, d.building, d.level", state_id, source)
+
+    def victory_points(self, owner=None, state_id=None, source=None):
+        """Rows of state_id, owner, file, province, value in state and file order."""
+        table, params = self._states_table(source)
+        sql = (f"SELECT s.state_id, s.owner, s.file, v.province, v.value FROM victory_points v "
+               f"JOIN {table} s ON v.source = s.source AND v.state_id = s.state_id")
+        where = []
+        if owner is not None:
+            where.append("s.owner = ?")
+            params += (owner.upper(),)
+        if state_id is not None:
+            where.append("s.state_id = ?")
+            params += (state_id,)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self.query(sql + " ORDER BY s.state_id, v.rowid", params)
+
+    def states_with_core(self, tag, source=None):
+        table, params = self._states_table(source)
+        return self.query(f"SELECT s.* FROM {table} s JOIN cores c ON c.source = s.source "
+                          f"AND c.state_id = s.state_id WHERE c.tag = ? ORDER BY s.state_id",
+                          params + (tag.upper(),))
+
+    def state_of_province(self, province, source=None):
+        table, params = self._states_table(source)
+        rows = self.query(f"SELECT s.* FROM {table} s JOIN provinces p ON p.source = s.source "
+                          f"AND p.state_id = s.state_id WHERE p.province = ?", params + (province,))
+        return rows[0] if rows else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index history/states of the base game and a mod into SQLite.")
+    sub = parser.add_subparsers(dest="command")
+
+    build = sub.add_parser("build-index", help="Parse base game and mod states into the index")
+    build.add_argument("--base", help="HOI4 install folder (the one containing history/)")
+    build.add_argument("--mod", help="Mod folder (the one containing history/)")
+    build.add_argument("--db", help="Database path, defaults to the user cache folder")
+
+    owned = sub.add_parser("owned-by", help="List states owned by a tag")
+    owned.add_argument("tag")
+    owned.add_argument("--resource")
+    owned.add_argument("--min", type=float)
+    owned.add_argument("--mod", required=True)
+    owned.add_argument("--db")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build-index":
+        mod_folder = args.mod
+        base_folder = args.base
+        if not mod_folder:
+            import tkinter as tk
+            from tkinter import filedialog
+            tk.Tk().withdraw()
+            mod_folder = filedialog.askdirectory(title="Select your mod's folder")
+            if not mod_folder:
+                print("No folder selected. Exiting.")
+                return
+            base_folder = base_folder or filedialog.askdirectory(title="Select the base game folder (optional)")
+        db_path = build_index(mod_folder, base_folder, args.db)
+        print(f"Index written to: {db_path}")
+
+    elif args.command == "owned-by":
+        index = StateIndex(args.db or default_db_path(args.mod))
+        for row in index.states(owner=args.tag, resource=args.resource, min_amount=args.min):
+            print(f"{row['state_id']}\t{row['source']}\t{os.path.basename(row['file'])}")
+        index.close()
+
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
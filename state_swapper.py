@@ -2,36 +2,39 @@ import os
 import re
 import tkinter as tk
 from tkinter import filedialog
+from functools import partial
+from parallel_walk import parallel_walk
+
+PLACEHOLDER = "__TEMP_TAG_PLACEHOLDER__"
+
+def swap_tags_in_file(path, tag1, tag2):
+    """Swap every whole-word tag1 and tag2 in one file. Returns True if it changed."""
+    pattern_tag1 = re.compile(rf"\b{re.escape(tag1)}\b")
+    pattern_tag2 = re.compile(rf"\b{re.escape(tag2)}\b")
+
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    new_content = content
+    new_content = pattern_tag1.sub(PLACEHOLDER, new_content)
+    new_content = pattern_tag2.sub(tag1, new_content)
+    new_content = new_content.replace(PLACEHOLDER, tag2)
+
+    if new_content != content:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(new_content)
+        return True
+    return False
 
 def swap_tags_in_folder(folder_path, tag1, tag2):
     if not os.path.isdir(folder_path):
         print("Error: Provided path is not a valid folder.")
         return
 
-    pattern_tag1 = re.compile(rf"\b{re.escape(tag1)}\b")
-    pattern_tag2 = re.compile(rf"\b{re.escape(tag2)}\b")
-
-    placeholder = "__TEMP_TAG_PLACEHOLDER__"
-    files_changed = 0
-    modified_files = []
-
-    for root, _, files in os.walk(folder_path):
-        for file in files:
-            if file.lower().endswith(".txt"):
-                path = os.path.join(root, file)
-                with open(path, "r", encoding="utf-8") as f:
-                    content = f.read()
-
-                new_content = content
-                new_content = pattern_tag1.sub(placeholder, new_content)
-                new_content = pattern_tag2.sub(tag1, new_content)
-                new_content = new_content.replace(placeholder, tag2)
-
-                if new_content != content:
-                    with open(path, "w", encoding="utf-8") as f:
-                        f.write(new_content)
-                    files_changed += 1
-                    modified_files.append(file)
+    results = parallel_walk(folder_path, partial(swap_tags_in_file, tag1=tag1, tag2=tag2),
+                            (".txt",), name="state_swapper")
+    modified_files = [os.path.basename(path) for path, changed in results.items() if changed]
+    files_changed = len(modified_files)
 
     print(f"\nCompleted. {files_changed} file(s) modified.")
     if modified_files:
@@ -0,0 +1,110 @@
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from clausewitz_cst import parse_file, Block
+from state_index import build_index, StateIndex, BASE, MOD
+
+# Hands states to new owners. Each state is found by its id = value through
+# the state index (kept between runs, so only changed files are re-read),
+# copied over from the base game if the mod doesn't have it yet, then its
+# owner and first core are changed in a single edit of the parsed file. The
+# files are independent so they are handled on a thread pool.
+
+COPIED = "copied from base game"
+UPDATED = "updated"
+UNCHANGED = "already set"
+MISSING = "not found"
+
+MAX_WORKERS = 16
+
+
+def retag(doc, entry, tag):
+    """Point entry at tag, keeping the old value as a comment like mode 1 always has."""
+    old = entry.text()
+    if old == tag:
+        return False
+    doc.set_value(entry, tag)
+    text = doc.text
+    line_end = text.find("\n", entry.end)
+    line_end = len(text) if line_end == -1 else line_end
+    if not text[entry.end:line_end].strip():
+        doc.insert(entry.end, " #" + old)
+    return True
+
+
+def set_owner(state_path, tag):
+    """
+    Owner (including dated history blocks) and first core of one state file
+    set to tag, either is added if the state has none. Returns True if the file changed.
+    """
+    doc = parse_file(state_path)
+    history = doc.find("state.history")
+    if history is None or not isinstance(history.value, Block):
+        raise ValueError("no history block")
+    changed = False
+    for entry in doc.find_all("owner", history.value):
+        changed |= retag(doc, entry, tag)
+    if history.value.get("owner") is None:
+        # e.g. states shipped with their owner commented out
+        doc.append(history.value, "owner = " + tag)
+        changed = True
+    cores = doc.find_all("add_core_of", history.value)
+    if cores:
+        changed |= retag(doc, cores[0], tag)
+    else:
+        doc.append(history.value, "add_core_of = " + tag)
+        changed = True
+    doc.write(state_path)
+    return changed
+
+
+def transfer_state(state_id, tag, mod_path, base_path, mod_states_folder):
+    """(state_id, result) for one state, run on a worker thread."""
+    result = UPDATED
+    if mod_path is None:
+        if base_path is None:
+            return state_id, MISSING
+        mod_path = os.path.join(mod_states_folder, os.path.basename(base_path))
+        shutil.copyfile(base_path, mod_path)
+        result = COPIED
+    try:
+        changed = set_owner(mod_path, tag)
+    except (OSError, ValueError) as e:
+        return state_id, f"failed: {e}"
+    if result == UPDATED and not changed:
+        result = UNCHANGED
+    return state_id, result
+
+
+def transfer_states(mod_folder, owners, base_folder=None, workers=None):
+    """
+    Give each state in owners ({ state_id: tag }) to its tag, copying it from
+    the base game first if the mod lacks it. Prints a line per state and
+    returns { state_id: result }.
+    """
+    if not owners:
+        return {}
+    start = time.perf_counter()
+    mod_states_folder = os.path.join(mod_folder, "history", "states")
+    os.makedirs(mod_states_folder, exist_ok=True)
+
+    index = StateIndex(build_index(mod_folder, base_folder))
+    jobs = []
+    for state_id, tag in sorted(owners.items()):
+        base_path = index.state_file(state_id, BASE) if base_folder else None
+        jobs.append((state_id, tag, index.state_file(state_id, MOD), base_path, mod_states_folder))
+    index.close()
+
+    workers = workers or min(MAX_WORKERS, len(jobs))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = dict(pool.map(lambda job: transfer_state(*job), jobs))
+
+    for state_id, result in results.items():
+        print(f"State {state_id} ({owners[state_id]}): {result}")
+    counts = {}
+    for result in results.values():
+        counts[result] = counts.get(result, 0) + 1
+    summary = ", ".join(f"{n} {result}" for result, n in counts.items())
+    print(f"{len(results)} state(s) in {time.perf_counter() - start:.2f}s: {summary}")
+    return results
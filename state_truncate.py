@@ -1,10 +1,10 @@
-import os
 import re
 import tkinter as tk
 from tkinter import filedialog
+from parallel_walk import parallel_walk
 
 def trim_last_digit_from_manpower(file_path):
-    """Read a file and trim the last digit from 'manpower =' lines."""
+    """Read a file and trim the last digit from 'manpower =' lines. Returns True if it changed."""
     changed = False
     lines_out = []
 
@@ -23,9 +23,7 @@ def trim_last_digit_from_manpower(file_path):
     if changed:
         with open(file_path, "w", encoding="utf-8") as f:
             f.writelines(lines_out)
-        print(f"Updated: {file_path}")
-    else:
-        print(f"No change: {file_path}")
+    return changed
 
 def main():
     root = tk.Tk()
@@ -36,11 +34,9 @@ def main():
         print("No folder selected. Exiting...")
         return
 
-    for root_dir, _, files in os.walk(folder):
-        for file in files:
-            if file.endswith(".txt"):
-                file_path = os.path.join(root_dir, file)
-                trim_last_digit_from_manpower(file_path)
+    results = parallel_walk(folder, trim_last_digit_from_manpower, (".txt",), name="state_truncate")
+    for file_path, changed in results.items():
+        print(f"{'Updated' if changed else 'No change'}: {file_path}")
 
     print("\nAll state files processed.")
 
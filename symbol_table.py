@@ -0,0 +1,335 @@
+import os
+import sys
+import bisect
+from collections import namedtuple
+from clausewitz_cst import parse_file, Block, Entry
+from parse_cache import cached_parse
+from tag_index import tag_files, extract_tags
+
+# Every definition (focus, idea, scripted trigger/effect, decision, event,
+# character, sprite) and every reference to one, read straight from the mod's
+# files. Dangling references show up without launching the game for error.log.
+
+FOCUS = "focus"
+IDEA = "idea"
+TRIGGER = "scripted_trigger"
+EFFECT = "scripted_effect"
+DECISION = "decision"
+DECISION_CATEGORY = "decision_category"
+EVENT = "event"
+CHARACTER = "character"
+SPRITE = "sprite"
+
+KINDS = (FOCUS, IDEA, TRIGGER, EFFECT, DECISION, DECISION_CATEGORY, EVENT, CHARACTER, SPRITE)
+
+Symbol = namedtuple("Symbol", ["kind", "name", "file", "line"])
+
+# bump when scan_file changes, cached base-game scans are thrown away
+SCAN_VERSION = 1
+
+SCANNED_FOLDERS = ("common", "events", "history", "interface")
+
+FOCUS_REF_KEYS = ("has_completed_focus", "complete_national_focus", "unlock_national_focus",
+                  "relative_position_id", "uncomplete_national_focus")
+FOCUS_LIST_KEYS = ("prerequisite", "mutually_exclusive")
+IDEA_REF_KEYS = ("has_idea", "add_ideas", "remove_ideas")
+IDEA_NESTED_KEYS = {"swap_ideas": ("remove_idea", "add_idea"), "add_timed_idea": ("idea",),
+                    "modify_timed_idea": ("idea",)}
+DECISION_REF_KEYS = ("activate_decision", "activate_mission", "has_active_mission",
+                     "remove_mission", "unlock_decision_tooltip")
+DECISION_CATEGORY_REF_KEYS = ("unlock_decision_category_tooltip",)
+CHARACTER_REF_KEYS = ("recruit_character", "retire_character", "has_character", "promote_character")
+EVENT_KEYS = ("country_event", "news_event", "state_event", "unit_leader_event", "operative_leader_event")
+
+# Blocks whose contents are triggers, anything else with "= yes" is treated as an effect
+TRIGGER_CONTEXT_KEYS = {"limit", "trigger", "available", "allowed", "visible", "bypass", "cancel",
+                        "cancel_trigger", "allow_branch", "is_valid", "potential", "modifier",
+                        "ai_will_do", "ai_chance", "target_trigger", "target_root_trigger",
+                        "remove_trigger", "activation", "enable", "can_be_fired", "trigger_for_progress",
+                        "allowed_civil_war", "visible_when_empty", "select_trigger", "war_with_on_remove",
+                        "AND", "OR", "NOT", "if", "else_if", "custom_trigger_tooltip"}
+
+
+def line_starts(text):
+    starts = [0]
+    i = text.find("\n")
+    while i != -1:
+        starts.append(i + 1)
+        i = text.find("\n", i + 1)
+    return starts
+
+
+def walk_with_parents(block, parents=()):
+    """Yield (entry, tuple of enclosing entry keys) for every entry under block."""
+    for child in block.children:
+        if isinstance(child, Entry):
+            yield child, parents
+            if isinstance(child.value, Block):
+                yield from walk_with_parents(child.value, parents + (child.key,))
+        elif isinstance(child, Block):
+            yield from walk_with_parents(child, parents)
+
+
+def definition_kind(rel_path):
+    """What a file under this mod-relative path defines at its top levels, or None."""
+    parts = rel_path.replace("\\", "/").split("/")
+    if parts[0] == "interface":
+        return SPRITE
+    if parts[0] == "events":
+        return EVENT
+    if parts[0] != "common" or len(parts) < 3:
+        return None
+    folder = parts[1]
+    if folder == "decisions":
+        return DECISION_CATEGORY if parts[2] == "categories" else DECISION
+    return {"national_focus": FOCUS, "ideas": IDEA, "scripted_triggers": TRIGGER,
+            "scripted_effects": EFFECT, "characters": CHARACTER}.get(folder)
+
+
+def scan_file(file_path, rel_path):
+    """
+    One pass over a file. Returns (definitions, references, yes_no_keys) where
+    the first two are lists of Symbol and yes_no_keys is every key used as
+    'key = yes/no' (the vocabulary of built-in triggers and effects).
+    """
+    doc = parse_file(file_path, encoding="utf-8-sig", errors="ignore")
+    starts = line_starts(doc.text)
+    defs = []
+    refs = []
+    yes_no_keys = set()
+    kind = definition_kind(rel_path)
+
+    def add(target, symbol_kind, name, offset):
+        if name:
+            target.append(Symbol(symbol_kind, name, rel_path, bisect.bisect_right(starts, offset)))
+
+    # definitions by file location
+    root = doc.root
+    if kind in (TRIGGER, EFFECT, DECISION_CATEGORY):
+        for entry in root.entries():
+            if isinstance(entry.value, Block):
+                add(defs, kind, entry.key, entry.start)
+    elif kind in (DECISION, CHARACTER):
+        for top in root.entries():
+            if isinstance(top.value, Block):
+                for entry in top.value.entries():
+                    if isinstance(entry.value, Block):
+                        add(defs, kind, entry.key, entry.start)
+    elif kind == IDEA:
+        for top in root.entries("ideas"):
+            if isinstance(top.value, Block):
+                for category in top.value.entries():
+                    if isinstance(category.value, Block):
+                        for entry in category.value.entries():
+                            if isinstance(entry.value, Block):
+                                add(defs, IDEA, entry.key, entry.start)
+    elif kind == EVENT:
+        for entry in root.entries():
+            if entry.key in EVENT_KEYS and isinstance(entry.value, Block):
+                event_id = entry.value.get("id")
+                if event_id is not None:
+                    add(defs, EVENT, event_id.text(), event_id.start)
+
+    for entry, parents in walk_with_parents(root):
+        key = entry.key
+        value = entry.value
+        parent = parents[-1] if parents else None
+
+        if kind == FOCUS and key in ("focus", "shared_focus") and isinstance(value, Block):
+            focus_id = value.get("id")
+            if focus_id is not None:
+                add(defs, FOCUS, focus_id.text(), focus_id.start)
+            continue
+        if kind == SPRITE:
+            if key.lower().endswith("spritetype") and isinstance(value, Block):
+                name = value.get("name")
+                if name is not None:
+                    add(defs, SPRITE, name.text(), name.start)
+            continue
+
+        if isinstance(value, Block):
+            if key in IDEA_REF_KEYS:
+                for tok in value.children:
+                    if not isinstance(tok, (Entry, Block)):
+                        add(refs, IDEA, tok.value, tok.start)
+            elif key in EVENT_KEYS and parents:
+                event_id = value.get("id")
+                if event_id is not None:
+                    add(refs, EVENT, event_id.text(), event_id.start)
+            continue
+
+        text = entry.text()
+        if key in FOCUS_REF_KEYS or (key == "focus" and parent in FOCUS_LIST_KEYS):
+            add(refs, FOCUS, text, entry.start)
+        elif key in IDEA_REF_KEYS or (parent in IDEA_NESTED_KEYS and key in IDEA_NESTED_KEYS[parent]):
+            add(refs, IDEA, text, entry.start)
+        elif key in DECISION_REF_KEYS:
+            add(refs, DECISION, text, entry.start)
+        elif key in DECISION_CATEGORY_REF_KEYS:
+            add(refs, DECISION_CATEGORY, text, entry.start)
+        elif key in CHARACTER_REF_KEYS:
+            add(refs, CHARACTER, text, entry.start)
+        elif key in EVENT_KEYS and parents:
+            add(refs, EVENT, text, entry.start)
+        elif text.startswith("GFX_"):
+            add(refs, SPRITE, text, entry.start)
+        elif text in ("yes", "no") and parents:
+            yes_no_keys.add(key)
+            if any(p in TRIGGER_CONTEXT_KEYS for p in parents) or kind == TRIGGER:
+                add(refs, TRIGGER, key, entry.start)
+            else:
+                add(refs, EFFECT, key, entry.start)
+
+    return defs, refs, yes_no_keys
+
+
+def name_tags(name):
+    """Tags a name can be filed under: TAG_name, and GFX_TAG_name or GFX_kind_TAG_name for sprites."""
+    parts = name.split("_")
+    if parts[0] == "GFX":
+        return [part.upper() for part in parts[1:3]]
+    return [parts[0].upper()]
+
+
+def symbol_files(root_folder):
+    """Mod-relative paths of every file the symbol table reads."""
+    paths = []
+    for folder in SCANNED_FOLDERS:
+        top = os.path.join(root_folder, folder)
+        if not os.path.isdir(top):
+            continue
+        ext = ".gfx" if folder == "interface" else ".txt"
+        for root_dir, _, files in os.walk(top):
+            for file in files:
+                if file.endswith(ext):
+                    paths.append(os.path.relpath(os.path.join(root_dir, file), root_folder))
+    return sorted(paths)
+
+
+class SymbolTable:
+    def __init__(self):
+        self.definitions = {kind: {} for kind in KINDS}
+        self.references = []
+        self.vocabulary = set()
+        self.mod_tags = set()
+        self.has_base = False
+
+    def add_folder(self, root_folder, is_base=False):
+        """
+        Scan a mod or base-game folder. References are only kept for the mod,
+        the base game contributes definitions and the built-in yes/no vocabulary.
+        Base-game scans are cached between runs.
+        """
+        rel_paths = symbol_files(root_folder)
+        full_paths = [os.path.join(root_folder, p) for p in rel_paths]
+
+        def scan(full_path):
+            return scan_file(full_path, os.path.relpath(full_path, root_folder))
+
+        if is_base:
+            results = cached_parse("symbol_table", root_folder, full_paths, scan, version=SCAN_VERSION).values()
+            self.has_base = True
+        else:
+            results = (scan(p) for p in full_paths)
+            for tags_path in tag_files(root_folder):
+                self.mod_tags.update(extract_tags(tags_path)[0])
+
+        for defs, refs, yes_no_keys in results:
+            for symbol in defs:
+                self.definitions[symbol.kind].setdefault(symbol.name, []).append(symbol)
+            if is_base:
+                self.vocabulary |= yes_no_keys
+            else:
+                self.references.extend(refs)
+        return self
+
+    def is_defined(self, kind, name):
+        if name in self.definitions[kind]:
+            return True
+        # scripted triggers and effects share a namespace with the game's own
+        if kind in (TRIGGER, EFFECT):
+            return (name in self.definitions[TRIGGER] or name in self.definitions[EFFECT]
+                    or name in self.vocabulary)
+        return False
+
+    def is_own_name(self, name):
+        """Named after one of the mod's own tags, so the base game can't be what defines it."""
+        return any(tag in self.mod_tags for tag in name_tags(name))
+
+    def is_verified(self, symbol):
+        """
+        Whether an undefined reference is known to be missing. Without the base
+        game only the mod's own TAG_ names are, anything else may be vanilla.
+        """
+        if self.has_base:
+            return True
+        # without the base game there is no way to tell built-in triggers from missing ones
+        if symbol.kind in (TRIGGER, EFFECT):
+            return False
+        return self.is_own_name(symbol.name)
+
+    def undefined(self, kinds=KINDS):
+        for symbol in self.references:
+            if symbol.kind in kinds and not self.is_defined(symbol.kind, symbol.name):
+                yield symbol
+
+    def dangling(self, kinds=KINDS):
+        """References from the mod to something defined nowhere, in file order."""
+        return [symbol for symbol in self.undefined(kinds) if self.is_verified(symbol)]
+
+    def unverified(self, kinds=KINDS):
+        """
+        References the mod doesn't define that only the base game could settle,
+        always empty once it is loaded. Triggers and effects are left out, most
+        of them are built in.
+        """
+        return [symbol for symbol in self.undefined(kinds)
+                if not self.is_verified(symbol) and symbol.kind not in (TRIGGER, EFFECT)]
+
+    def missing(self, kind):
+        """Unique names of undefined kind, in the order they are first referenced."""
+        return list(dict.fromkeys(symbol.name for symbol in self.dangling((kind,))))
+
+    def missing_unverified(self, kind):
+        """Unique names of kind that may be missing or may be in the base game. Never stub these."""
+        return list(dict.fromkeys(symbol.name for symbol in self.unverified((kind,))))
+
+
+def build_symbol_table(mod_folder, base_folder=None):
+    table = SymbolTable()
+    if base_folder:
+        table.add_folder(base_folder, is_base=True)
+    table.add_folder(mod_folder)
+    return table
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        mod_folder = argv[0]
+        base_folder = argv[1] if len(argv) > 1 else None
+    else:
+        import tkinter as tk
+        from tkinter import filedialog
+        tk.Tk().withdraw()
+        mod_folder = filedialog.askdirectory(title="Select your mod's folder")
+        if not mod_folder:
+            print("No folder selected. Exiting.")
+            return
+        base_folder = filedialog.askdirectory(title="Select the base game folder (optional)")
+
+    table = build_symbol_table(mod_folder, base_folder)
+    dangling = table.dangling()
+    for symbol in dangling:
+        print(f"{symbol.file}:{symbol.line}: undefined {symbol.kind} {symbol.name}")
+    if not table.has_base:
+        unverified = table.unverified()
+        for symbol in unverified:
+            print(f"{symbol.file}:{symbol.line}: unverified {symbol.kind} {symbol.name} (may be in the base game)")
+        print(f"{len(unverified)} unverified reference(s), only names under the mod's own tags were checked.")
+        print("Scripted triggers/effects were not checked, give the base game folder to include them.")
+    print(f"{len(dangling)} dangling reference(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import os
+import re
+import string
+from parse_cache import cached_parse
+
+# Every country tag already defined in common/country_tags, base game and mod,
+# dynamic tags (D01, D02, ...) included. Built once, after which clash checks
+# are a set lookup and free tags come straight from a generator, so checking
+# thousands of candidate tags for a batch takes milliseconds.
+
+TAG_PATTERN = re.compile(r"^[ \t]*([A-Za-z][A-Za-z0-9]{2})[ \t]*=", re.MULTILINE)
+DYNAMIC_PATTERN = re.compile(r"^[ \t]*dynamic_tags[ \t]*=[ \t]*yes", re.MULTILINE)
+
+# script keywords the game would read as something other than a tag
+RESERVED_TAGS = frozenset({"AND", "NOT", "NOR"})
+
+FIRST_CHARS = string.ascii_uppercase
+OTHER_CHARS = string.ascii_uppercase + string.digits
+
+# bump when extract_tags changes
+EXTRACT_VERSION = 1
+
+
+def is_valid_tag(tag):
+    """Three characters, a letter followed by letters or digits."""
+    return (len(tag) == 3 and tag[0] in FIRST_CHARS
+            and tag[1] in OTHER_CHARS and tag[2] in OTHER_CHARS)
+
+
+def extract_tags(file_path):
+    """(tags defined in file_path, whether it is a dynamic tags file)."""
+    with open(file_path, "r", encoding="utf-8-sig", errors="ignore") as f:
+        text = f.read()
+    tags = [tag.upper() for tag in TAG_PATTERN.findall(text)]
+    return tags, bool(DYNAMIC_PATTERN.search(text))
+
+
+def tag_files(root_folder):
+    folder = os.path.join(root_folder, "common", "country_tags")
+    if not os.path.isdir(folder):
+        return []
+    return sorted(os.path.join(folder, fn) for fn in os.listdir(folder) if fn.lower().endswith(".txt"))
+
+
+class TagIndex:
+    """Tags in use, with the file each came from."""
+
+    def __init__(self):
+        self.files = {}        # tag -> file it is defined in
+        self.dynamic = set()   # tags from dynamic_tags = yes files
+        self.taken = set(RESERVED_TAGS)
+
+    def add(self, tag, file_path=None, dynamic=False):
+        self.files.setdefault(tag, file_path)
+        self.taken.add(tag)
+        if dynamic:
+            self.dynamic.add(tag)
+
+    def reserve(self, tag):
+        """Mark a tag as used, e.g. once a batch row has been given it."""
+        self.taken.add(tag.upper())
+
+    def __contains__(self, tag):
+        return tag.upper() in self.taken
+
+    def __len__(self):
+        return len(self.files)
+
+    def is_free(self, tag):
+        tag = tag.upper()
+        return is_valid_tag(tag) and tag not in self.taken
+
+    def clashes(self, tags):
+        """The given tags that are already in use."""
+        return {tag.upper() for tag in tags} & self.taken
+
+    def where(self, tag):
+        """File defining tag, or None if it is unused or only reserved."""
+        return self.files.get(tag.upper())
+
+    def free_tags(self, prefix=""):
+        """Unused tags starting with prefix, in alphabetical order."""
+        prefix = prefix.upper()[:3]
+        if prefix and prefix[0] not in FIRST_CHARS:
+            return
+        firsts = prefix[:1] or FIRST_CHARS
+        seconds = prefix[1:2] or OTHER_CHARS
+        thirds = prefix[2:3] or OTHER_CHARS
+        for a in firsts:
+            for b in seconds:
+                for c in thirds:
+                    tag = a + b + c
+                    if tag not in self.taken:
+                        yield tag
+
+    def suggest(self, name, count=5):
+        """Up to count free tags that look like name, best guesses first."""
+        letters = [ch for ch in name.upper() if ch in OTHER_CHARS]
+        suggestions = []
+        candidates = []
+        if letters and letters[0] in FIRST_CHARS:
+            first = letters[0]
+            rest = letters[1:]
+            # first three letters, then first letter with later pairs, e.g. Germany -> GER, GRM, GEY ...
+            candidates.append(first + "".join(rest[:2]))
+            candidates.extend(first + rest[i] + rest[j] for i in range(len(rest)) for j in range(i + 1, len(rest)))
+        for tag in candidates:
+            if len(tag) == 3 and tag not in self.taken and tag not in suggestions:
+                suggestions.append(tag)
+                if len(suggestions) == count:
+                    return suggestions
+        for prefix in (letters[0] if letters else "", ""):
+            for tag in self.free_tags(prefix):
+                if tag not in suggestions:
+                    suggestions.append(tag)
+                    if len(suggestions) == count:
+                        return suggestions
+        return suggestions
+
+
+def build_tag_index(mod_folder, base_folder=None):
+    """TagIndex of every tag in the base game (if given) and the mod."""
+    index = TagIndex()
+    for name, folder in (("tag_index_base", base_folder), ("tag_index_mod", mod_folder)):
+        if not folder:
+            continue
+        for file_path, (tags, dynamic) in cached_parse(name, folder, tag_files(folder), extract_tags,
+                                                        version=EXTRACT_VERSION).items():
+            for tag in tags:
+                index.add(tag, file_path, dynamic)
+    return index
@@ -0,0 +1,83 @@
+import os
+import re
+from functools import lru_cache
+
+# The base_*.txt files are templates with placeholder words (MYTAG, MIO_NAME,
+# ...) in them. A Template splits its text around the placeholders once, so
+# rendering is a single join however many times it's used, and one value can
+# never be mistaken for a placeholder the way chained str.replace calls can.
+# Each template file is read and compiled once per run, and batches of
+# renders go out through one buffered writer instead of a write (or an open)
+# per stub.
+
+SCRIPT_FOLDER = os.path.dirname(os.path.abspath(__file__))
+# the working folder first, like the tools have always opened them, then next to this file
+TEMPLATE_FOLDERS = ("", SCRIPT_FOLDER, os.path.join(SCRIPT_FOLDER, "base things"))
+
+# placeholders of the shipped templates
+HISTORY_PLACEHOLDERS = ("CAPITAL_NO", "MYTAG", "MAIN_IDEOLOGY", "OTHER_IDEOLOGY1", "OTHER_IDEOLOGY2", "OTHER_IDEOLOGY3")
+NAMES_PLACEHOLDERS = ("MYTAG",)
+FOCUS_PLACEHOLDERS = ("FOCUS_ID",)
+IDEA_PLACEHOLDERS = ("IDEA_ID",)
+ADJACENCY_PLACEHOLDERS = ("NAME_REPLACE", "ID1", "ID2", "ID3")
+
+WRITE_BUFFER = 1 << 20
+
+
+def find_template(name):
+    for folder in TEMPLATE_FOLDERS:
+        path = os.path.join(folder, name)
+        if os.path.isfile(path):
+            return path
+    raise FileNotFoundError(f"Template {name} not found in {', '.join(f or '.' for f in TEMPLATE_FOLDERS)}")
+
+
+class Template:
+    """Template text compiled once around its placeholders."""
+
+    def __init__(self, text, placeholders):
+        self.placeholders = tuple(placeholders)
+        if not self.placeholders:
+            self.parts, self.slots = [text], []
+            return
+        # longest first so e.g. OTHER_IDEOLOGY1 wins over a shorter placeholder inside it
+        pattern = re.compile("|".join(re.escape(p) for p in sorted(placeholders, key=len, reverse=True)))
+        self.parts = pattern.split(text)
+        self.slots = pattern.findall(text)
+
+    def render(self, values):
+        """Text with every placeholder replaced by values[placeholder]."""
+        pieces = [self.parts[0]]
+        for slot, part in zip(self.slots, self.parts[1:]):
+            pieces.append(values[slot])
+            pieces.append(part)
+        return "".join(pieces)
+
+    def render_all(self, rows, before=""):
+        """before + render(values) for every values in rows, lazily, for writelines."""
+        for values in rows:
+            yield before + self.render(values)
+
+
+@lru_cache(maxsize=None)
+def load_template(name, placeholders=()):
+    """Compiled template, read from disk the first time it's asked for. placeholders is a tuple."""
+    with open(find_template(name), "r", encoding="utf-8-sig") as f:
+        return Template(f.read(), placeholders)
+
+
+def open_output(file_path, mode="w", encoding=None):
+    """File opened with a large write buffer, so many small writes reach the disk as a few big ones."""
+    return open(file_path, mode, buffering=WRITE_BUFFER, encoding=encoding)
+
+
+def history_values(tag, capital, ideology_num, ideologies_full):
+    """Values for base_history.txt, the chosen ideology at 70% and the others at 10%."""
+    return {
+        "CAPITAL_NO": str(capital),
+        "MYTAG": tag,
+        "MAIN_IDEOLOGY": ideologies_full[ideology_num],
+        "OTHER_IDEOLOGY1": ideologies_full[(ideology_num+1) % 4],
+        "OTHER_IDEOLOGY2": ideologies_full[(ideology_num+2) % 4],
+        "OTHER_IDEOLOGY3": ideologies_full[(ideology_num+3) % 4],
+    }
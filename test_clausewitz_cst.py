@@ -0,0 +1,72 @@
+import os
+import codecs
+import tempfile
+import unittest
+from clausewitz_cst import parse, parse_file
+
+
+def appended(text, path, entry_text):
+    doc = parse(text)
+    doc.append(doc.find(path).value, entry_text)
+    return doc.serialize()
+
+
+class AppendTest(unittest.TestCase):
+    def test_one_line_block_without_spaces(self):
+        self.assertEqual(appended("state={id=5}", "state", "resources = { coal = 12 }"),
+                         "state={id=5 resources = { coal = 12 } }")
+
+    def test_one_line_block_with_spaces(self):
+        self.assertEqual(appended("state={ id=5 resources={oil=1} }", "state.resources", "coal = 12"),
+                         "state={ id=5 resources={oil=1 coal = 12 } }")
+        self.assertEqual(appended("resources = { oil = 1 }", "resources", "coal = 12"),
+                         "resources = { oil = 1 coal = 12 }")
+
+    def test_empty_block(self):
+        self.assertEqual(appended("allowed = {}", "allowed", "tag = ABC"), "allowed = { tag = ABC }")
+
+    def test_result_parses_back(self):
+        doc = parse(appended("state={ id=5 resources={oil=1} }", "state.resources", "coal = 12"))
+        self.assertEqual(doc.find("state.resources.coal").text(), "12")
+        self.assertEqual(doc.find("state.resources.oil").text(), "1")
+
+    def test_set_on_one_line_resources(self):
+        doc = parse("state = {\n\tid = 5\n\tresources = { oil = 1 }\n}\n")
+        doc.set("state.resources.coal", 12)
+        self.assertEqual(doc.serialize(), "state = {\n\tid = 5\n\tresources = { oil = 1 coal = 12 }\n}\n")
+
+    def test_multi_line_block(self):
+        self.assertEqual(appended("state = {\n\tid = 5\n}\n", "state", "owner = ABC"),
+                         "state = {\n\tid = 5\n\towner = ABC\n}\n")
+
+
+class FileTest(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".txt")
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_bom_and_line_endings_kept(self):
+        with open(self.path, "wb") as f:
+            f.write(codecs.BOM_UTF8 + b"state = {\r\n\tid = 5\r\n}\r\n")
+        doc = parse_file(self.path)
+        self.assertEqual(doc.root.get("state").key, "state")
+        doc.append(doc.find("state").value, "owner = ABC")
+        self.assertTrue(doc.write(self.path))
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), codecs.BOM_UTF8 + b"state = {\r\n\tid = 5\r\n\towner = ABC\r\n}\r\n")
+
+    def test_plain_utf8_stays_without_bom(self):
+        with open(self.path, "wb") as f:
+            f.write(b"state = { id = 5 }\n")
+        doc = parse_file(self.path)
+        doc.set("state.id", 6)
+        doc.write(self.path)
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), b"state = { id = 6 }\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
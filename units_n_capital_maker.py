@@ -4,6 +4,8 @@ import re
 import random
 import tkinter as tk
 from tkinter import filedialog
+from state_index import build_index, StateIndex, MOD
+from country_registry import country_registry
 
 # --------------------------
 # CONFIG
@@ -74,59 +76,31 @@ division_template = {
 DIVISION_TYPES = ["Militia Division", "Infantry Division", "Artillery Division", "Cavalry Division"]
 WEIGHTS = [1, 3, 1, 1]
 
-OWNER_PATTERN = re.compile(r'owner\s*=\s*"?([A-Z]{2,3})"?', flags=re.IGNORECASE)
-VP_BLOCK_RE = re.compile(r'victory_points\s*=\s*(\{[^}]*\}|[^\n\r]*)', flags=re.IGNORECASE)
-IDEOLOGY_PATTERN = re.compile(r'ruling_party\s*=\s*([a-zA-Z_]+)', flags=re.IGNORECASE)
-
-def extract_vp_pairs_from_block(block_text):
-    nums = re.findall(r'\d+', block_text)
-    pairs = []
-    for i in range(0, len(nums), 2):
-        prov = int(nums[i])
-        val = int(nums[i+1]) if (i + 1) < len(nums) else 0
-        pairs.append((prov, val))
-    return pairs
-
 def parse_states(states_folder):
+    """
+    Owned state files per tag and victory points per state file, read from
+    the SQLite state index (refreshed incrementally for files that changed).
+    """
+    mod_folder = os.path.dirname(os.path.dirname(os.path.abspath(states_folder)))
+    index = StateIndex(build_index(mod_folder))
+
     tag_states = {}
     state_vps = {}
-    for fname in os.listdir(states_folder):
-        if not fname.endswith(".txt"):
-            continue
-        path = os.path.join(states_folder, fname)
-        with open(path, "r", encoding="utf-8") as f:
-            text = f.read()
-
-        owner_m = OWNER_PATTERN.search(text)
-        if not owner_m:
+    for row in index.states(source=MOD):
+        if not row["owner"]:
             continue
-        tag = owner_m.group(1).upper()
-        tag_states.setdefault(tag, []).append(fname)
-
-        vps = []
-        for vp_match in VP_BLOCK_RE.finditer(text):
-            block = vp_match.group(1)
-            vps.extend(extract_vp_pairs_from_block(block))
-
-        seen = set()
-        unique_pairs = []
-        for prov, val in vps:
-            if prov not in seen:
-                seen.add(prov)
-                unique_pairs.append((prov, val))
-        state_vps[fname] = unique_pairs
+        fname = os.path.basename(row["file"])
+        tag_states.setdefault(row["owner"], []).append(fname)
+        state_vps[fname] = []
+    for row in index.victory_points(source=MOD):
+        fname = os.path.basename(row["file"])
+        if fname in state_vps:
+            state_vps[fname].append((row["province"], int(row["value"])))
+    index.close()
     return tag_states, state_vps
 
-def get_tag_ideology(countries_folder, tag):
-    for fname in os.listdir(countries_folder):
-        if fname.startswith(f"{tag} - "):
-            path = os.path.join(countries_folder, fname)
-            with open(path, "r", encoding="utf-8") as f:
-                text = f.read()
-            m = IDEOLOGY_PATTERN.search(text)
-            if m:
-                return m.group(1).lower()
-    return None
+def get_tag_ideology(registry, tag):
+    return registry.ruling_party(tag)
 
 def state_filename_to_id(fname):
     m = re.match(r'\s*(\d+)', fname)
@@ -152,11 +126,10 @@ def write_units_file(units_folder, tag, vp_provinces):
         f.write("}\n")
     print(f"Created OOB for {tag}: {out_path} ({len(vp_provinces)} divisions).")
 
-def update_country_history(countries_folder, tag, owned_state_files, state_vps):
-    for fname in os.listdir(countries_folder):
-        if not fname.startswith(f"{tag} - "):
-            continue
-        path = os.path.join(countries_folder, fname)
+def update_country_history(registry, tag, owned_state_files, state_vps):
+    path = registry.history_file(tag)
+    if path is not None:
+        fname = os.path.basename(path)
         with open(path, "r", encoding="utf-8") as f:
             text = f.read()
 
@@ -206,7 +179,8 @@ def main():
 
     states_folder = os.path.join(mod_folder, "history", "states")
     units_folder = os.path.join(mod_folder, "history", "units")
-    countries_folder = os.path.join(mod_folder, "history", "countries")
+    # every country's history file and ruling party, read once rather than listed per tag
+    registry = country_registry(mod_folder)
 
     tag_states, state_vps = parse_states(states_folder)
     for tag, state_files in tag_states.items():
@@ -216,14 +190,14 @@ def main():
         if not provs:
             continue
 
-        ideology = get_tag_ideology(countries_folder, tag) if os.path.exists(countries_folder) else None
+        ideology = get_tag_ideology(registry, tag)
         pct = VP_PERCENTAGE.get(ideology, DEFAULT_PERCENTAGE)
         sample_size = max(1, int(len(provs) * pct))
         selected = random.sample(provs, sample_size)
 
         write_units_file(units_folder, tag, selected)
-        if os.path.exists(countries_folder):
-            update_country_history(countries_folder, tag, state_files, state_vps)
+        registry.update(tag, oob=os.path.join(units_folder, f"{tag}_1936.txt"))
+        update_country_history(registry, tag, state_files, state_vps)
 
     print("Done: OOBs and country files updated.")
 
@@ -0,0 +1,66 @@
+import os
+import time
+from mmap_scan import iter_matches
+from parallel_walk import walk_files
+from parse_cache import cached_parse
+from state_index import build_index, StateIndex, MOD
+
+# Victory point localisation for pwm mode 14. The mod's states come from the
+# state index (changed files re-parsed in parallel, the rest from the last
+# run) and every VICTORY_POINTS_<province> key already in the English
+# localisation, commented out or not, is collected into a set. Only the
+# victory points without a key are appended, so running it again adds nothing.
+
+AUTO_FILE = "auto_victory_points_l_english.yml"
+
+# the mode writes its keys commented out, those count as present too
+VP_KEY_PATTERN = rb"(?m)^[ \t]*#?[ \t]*VICTORY_POINTS_(\d+)[ \t]*:"
+
+# bump when extract_vp_keys changes
+EXTRACT_VERSION = 1
+
+
+def extract_vp_keys(file_path):
+    return [int(province) for province in iter_matches(file_path, VP_KEY_PATTERN)]
+
+
+def existing_vp_keys(loc_folder):
+    """Province ids with a VICTORY_POINTS_ key in any .yml under loc_folder."""
+    if not os.path.isdir(loc_folder):
+        return set()
+    found = cached_parse("vp_localisation_keys", loc_folder, walk_files(loc_folder, (".yml",)),
+                         extract_vp_keys, version=EXTRACT_VERSION, parallel=True)
+    return {province for provinces in found.values() for province in provinces}
+
+
+def missing_victory_points(mod_folder):
+    """(province, state_id, owner) for every victory point in the mod without localisation."""
+    loc_folder = os.path.join(mod_folder, "localisation", "english")
+    known = existing_vp_keys(loc_folder)
+    index = StateIndex(build_index(mod_folder))
+    missing = {}
+    for row in index.victory_points(source=MOD):
+        if row["province"] not in known and row["province"] not in missing:
+            missing[row["province"]] = (row["province"], row["state_id"], row["owner"] or "UNOWNED")
+    index.close()
+    return [missing[province] for province in sorted(missing)]
+
+
+def add_vp_localisation(mod_folder):
+    """Append placeholder keys for every unlocalised victory point, one write."""
+    start = time.perf_counter()
+    missing = missing_victory_points(mod_folder)
+    if missing:
+        lines = ''.join(' #VICTORY_POINTS_'+str(province)+': "" #STATE_'+str(state_id)+' - owned by '+owner+'\n'
+                        for province, state_id, owner in missing)
+        loc_folder = os.path.join(mod_folder, "localisation", "english")
+        os.makedirs(loc_folder, exist_ok=True)
+        loc_path = os.path.join(loc_folder, AUTO_FILE)
+        if os.path.exists(loc_path) and os.path.getsize(loc_path):
+            with open(loc_path, "a", encoding="utf-8") as loc_file:
+                loc_file.write(lines)
+        else:
+            with open(loc_path, "w", encoding="utf-8-sig") as loc_file:
+                loc_file.write('l_english:\n' + lines)
+    print(f"{len(missing)} victory point(s) added to '{AUTO_FILE}' in {time.perf_counter() - start:.2f}s")
+    return missing